@@ -14,7 +14,8 @@ import sys
 import asyncio
 import argparse
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
 
 import yaml
 from loguru import logger
@@ -22,6 +23,8 @@ from loguru import logger
 from src.bronze import BronzeIngester
 from src.silver import SilverProcessor
 from src.gold import GoldProcessor
+from src.gold.processor import OOM_FALLBACK
+from src.utils.config import FeatureEngineeringConfig, ValidationConfig
 from src.utils.quality_report import generate_quality_report
 
 
@@ -74,6 +77,10 @@ def run_pipeline(
     layers: list[str] = None,
     verbose: bool = False,
     fresh: bool = False,
+    sources: list[str] = None,
+    revalidate_children: bool = False,
+    incremental_gold: bool = False,
+    profile_gold: bool = False,
 ) -> dict:
     """
     Run the medallion pipeline.
@@ -82,6 +89,12 @@ def run_pipeline(
         layers: Specific layers to run (bronze, silver, gold, graph), or None for all
         verbose: Enable verbose logging
         fresh: Delete existing outputs and start fresh
+        sources: Restrict Bronze/Silver to these sources (FK parents resolved automatically)
+        revalidate_children: Also re-validate Silver sources that depend on `sources`
+        incremental_gold: Fold only new fact rows into the Gold state and
+            recompute only the keys they touch (also `duckdb.incremental`)
+        profile_gold: Profile each Gold feature query into `duckdb.profile_dir`
+            (also `duckdb.profile`)
         
     Returns:
         Dictionary with pipeline results
@@ -128,6 +141,8 @@ def run_pipeline(
     log.info("MEDALLION PIPELINE")
     log.info("=" * 70)
     log.info(f"Layers: {', '.join(layers)}")
+    if sources:
+        log.info(f"Sources: {', '.join(sources)}")
     log.info(f"Tech: Polars (Bronze/Silver) → DuckDB SQL (Gold) → SurrealDB (Graph)")
     
     try:
@@ -138,7 +153,7 @@ def run_pipeline(
                 input_dir=Path(pipeline_config["paths"]["input_dir"]),
                 output_dir=Path(pipeline_config["paths"]["output_dir"]),
             )
-            bronze_results_raw = ingester.ingest_all()
+            bronze_results_raw = ingester.ingest_all(sources=sources)
             results["layers"]["bronze"] = bronze_results_raw
         
         # Silver Layer (Polars + Pydantic + Dedup + FK)
@@ -149,8 +164,12 @@ def run_pipeline(
                 cleaning_rules=configs["cleaning_rules"],
                 bronze_dir=Path(pipeline_config["paths"]["output_dir"]) / "bronze",
                 output_dir=Path(pipeline_config["paths"]["output_dir"]),
+                validation=ValidationConfig(**pipeline_config.get("validation", {})),
+            )
+            silver_results_raw = processor.process_all(
+                sources=sources,
+                revalidate_children=revalidate_children,
             )
-            silver_results_raw = processor.process_all()
             results["layers"]["silver"] = {
                 name: {
                     "valid": r.valid_records,
@@ -158,33 +177,63 @@ def run_pipeline(
                     "duplicates_removed": r.duplicates_removed,
                     "orphaned_records": r.orphaned_records,
                     "pass_rate": r.pass_rate,
+                    "breach": r.breach,
+                    "skipped": r.skipped,
                 }
                 for name, r in silver_results_raw.items()
             }
         
+        # Sources aborted by the quarantine circuit breaker
+        skipped_sources = sorted(
+            name for name, r in silver_results_raw.items() if r.skipped
+        )
+        
         # Gold Layer (DuckDB SQL)
         if "gold" in layers:
-            db_path = Path(pipeline_config.get("duckdb", {}).get(
-                "database_path", "outputs/pipeline.duckdb"
-            ))
-            gold_processor = GoldProcessor(
-                silver_dir=Path(pipeline_config["paths"]["output_dir"]) / "silver",
-                output_dir=Path(pipeline_config["paths"]["output_dir"]),
-                db_path=db_path,
+            redis_config = pipeline_config.get("redis", {})
+            gold_processor = build_gold_processor(
+                pipeline_config,
+                incremental=incremental_gold,
+                keep_arrow=redis_config.get("enabled", False),
+                profile=profile_gold,
             )
-            gold_results_raw = gold_processor.process_all()
+            gold_results_raw = gold_processor.process_all(skip_sources=skipped_sources)
             gold_processor.close()
             
+            # Optional Redis feature cache
+            if redis_config.get("enabled", False):
+                from src.serving import SERVING_TABLES
+                from src.serving.redis_cache import RedisFeaturePublisher, connect
+                
+                publisher = RedisFeaturePublisher(
+                    connect(redis_config.get("url", "redis://localhost:6379/0")),
+                    prefix=redis_config.get("prefix", "features"),
+                    batch_size=redis_config.get("batch_size", 1000),
+                    keep_versions=redis_config.get("keep_versions", 1),
+                )
+                results["layers"]["redis"] = {
+                    "version": publisher.publish_results(
+                        gold_results_raw,
+                        pipeline_config.get("serving", {}).get("tables") or SERVING_TABLES,
+                    )
+                }
+            
             results["layers"]["gold"] = {
                 name: {
                     "rows": r.row_count,
                     "features": len(r.columns),
+                    "cached": r.cached,
                 }
                 for name, r in gold_results_raw.items()
             }
         
         # Graph Layer (SurrealDB)
-        if "graph" in layers:
+        if "graph" in layers and skipped_sources:
+            log.warning(f"Graph load skipped: Silver skipped {', '.join(skipped_sources)}")
+            results["layers"]["graph"] = {
+                "error": f"Silver sources skipped by circuit breaker: {', '.join(skipped_sources)}"
+            }
+        elif "graph" in layers:
             try:
                 from src.graph import GraphLoader
 
@@ -217,7 +266,7 @@ def run_pipeline(
         results["status"] = "success"
         
         # Generate quality report
-        if bronze_results_raw and silver_results_raw and gold_results_raw:
+        if bronze_results_raw and silver_results_raw and "gold" in layers:
             report_path = output_dir / "quality_report.md"
             generate_quality_report(
                 bronze_results=bronze_results_raw,
@@ -241,15 +290,232 @@ def run_pipeline(
     return results
 
 
+def build_gold_processor(
+    pipeline_config: dict,
+    incremental: bool = False,
+    keep_arrow: bool = False,
+    profile: bool = False,
+) -> GoldProcessor:
+    """GoldProcessor configured from the ``duckdb`` and ``feature_engineering`` sections."""
+    duckdb_config = pipeline_config.get("duckdb", {})
+    db_path = Path(duckdb_config.get("database_path", "outputs/pipeline.duckdb"))
+    export_formats = duckdb_config.get("export_formats", ["csv", "parquet", "arrow"])
+    if not duckdb_config.get("export_csv", True):
+        export_formats = [f for f in export_formats if f != "csv"]
+    feature_config = FeatureEngineeringConfig(**pipeline_config.get("feature_engineering", {}))
+    return GoldProcessor(
+        silver_dir=Path(pipeline_config["paths"]["output_dir"]) / "silver",
+        output_dir=Path(pipeline_config["paths"]["output_dir"]),
+        db_path=db_path,
+        incremental=incremental or duckdb_config.get("incremental", False),
+        max_concurrent_queries=duckdb_config.get("max_concurrent_queries", 4),
+        threads_per_query=duckdb_config.get("threads_per_query"),
+        export_formats=export_formats,
+        reference_date=feature_config.reference_date,
+        parquet_row_group_size=duckdb_config.get("parquet_row_group_size", 122_880),
+        keep_arrow=keep_arrow,
+        profile_dir=(
+            Path(duckdb_config.get("profile_dir", "outputs/profiles"))
+            if profile or duckdb_config.get("profile", False) else None
+        ),
+        duckdb_settings=duckdb_config.get("settings"),
+        oom_fallback=duckdb_config.get("oom_fallback", OOM_FALLBACK),
+        sketches=(
+            feature_config.sketches.model_dump(exclude={"enabled"})
+            if feature_config.sketches.enabled else None
+        ),
+        rolling_windows=feature_config.rolling_windows,
+        memoize=duckdb_config.get("memoize", True),
+        export_interactions=duckdb_config.get("export_interactions", False),
+    )
+
+
+def backfill_gold(
+    dates: Optional[list[date]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    interval: str = "1 month",
+    verbose: bool = False,
+) -> dict:
+    """
+    Compute point-in-time Gold features for a list or range of as-of dates.
+
+    Reads the Silver outputs of an earlier run; the result is written under
+    ``gold/backfill/<table>/as_of=<date>/``.
+
+    Args:
+        dates: Explicit as-of dates
+        start: First as-of date of a range
+        end: Last as-of date of a range (inclusive)
+        interval: Step of the range (DuckDB interval, e.g. "1 month")
+        verbose: Enable verbose logging
+
+    Returns:
+        Dictionary of row counts and output directory per feature table
+    """
+    project_dir = Path(__file__).parent
+    configs = load_configs(project_dir / "config")
+    pipeline_config = configs["pipeline"]
+    setup_logging(project_dir / "outputs" / "logs", verbose)
+
+    processor = build_gold_processor(pipeline_config)
+    try:
+        results = processor.backfill(dates=dates, start=start, end=end, interval=interval)
+    finally:
+        processor.close()
+    return {
+        name: {"rows": r.row_count, "path": str(r.files["parquet"])}
+        for name, r in results.items()
+    }
+
+
+def serve_features(port: Optional[int] = None, verbose: bool = False) -> None:
+    """
+    Serve Gold features by key over HTTP until interrupted.
+
+    Reads the ``<table>.arrow`` exports of the last Gold run and hot-swaps
+    them when a new run finishes (see ``src/serving``).
+
+    Args:
+        port: Port to listen on (default: ``serving.port``)
+        verbose: Enable verbose logging
+    """
+    from src.serving import FeatureStore, make_server
+
+    project_dir = Path(__file__).parent
+    configs = load_configs(project_dir / "config")
+    pipeline_config = configs["pipeline"]
+    setup_logging(project_dir / "outputs" / "logs", verbose)
+    serving_config = pipeline_config.get("serving", {})
+
+    store = FeatureStore(
+        Path(pipeline_config["paths"]["output_dir"]) / "gold",
+        tables=serving_config.get("tables"),
+    )
+    server = make_server(
+        store,
+        host=serving_config.get("host", "127.0.0.1"),
+        port=port or serving_config.get("port", 8765),
+        refresh_interval=serving_config.get("refresh_interval", 5.0),
+    )
+    host, bound_port = server.server_address[:2]
+    logger.bind(component="FeatureServer").info(f"Serving Gold features on http://{host}:{bound_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def replay_quarantine(sources: list[str], verbose: bool = False) -> dict:
+    """
+    Re-validate quarantined Silver records under the current rules.
+
+    Rows that now pass are merged into Silver by primary key and the
+    quarantine store keeps only the rows that still fail.
+
+    Args:
+        sources: Silver sources whose quarantine store is replayed
+        verbose: Enable verbose logging
+
+    Returns:
+        Dictionary of replay counts per source
+    """
+    project_dir = Path(__file__).parent
+    configs = load_configs(project_dir / "config")
+    pipeline_config = configs["pipeline"]
+    setup_logging(project_dir / "outputs" / "logs", verbose)
+
+    processor = SilverProcessor(
+        sources_config=configs["sources"],
+        schemas_config=configs["schemas"],
+        cleaning_rules=configs["cleaning_rules"],
+        bronze_dir=Path(pipeline_config["paths"]["output_dir"]) / "bronze",
+        output_dir=Path(pipeline_config["paths"]["output_dir"]),
+    )
+    return {
+        name: {
+            "replayed": r.total_records,
+            "rescued": r.valid_records,
+            "remaining": r.quarantined_records,
+        }
+        for name, r in processor.replay_quarantine(sources).items()
+    }
+
+
 def main():
     """CLI entry point."""
     parser = argparse.ArgumentParser(description="Run Medallion Pipeline")
+    commands = parser.add_subparsers(dest="command")
+    replay_parser = commands.add_parser(
+        "replay-quarantine",
+        help="Re-validate quarantined records and merge rescued rows into Silver",
+    )
+    replay_parser.add_argument("sources", nargs="+", help="Sources to replay")
+    replay_parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Enable verbose logging",
+    )
+    backfill_parser = commands.add_parser(
+        "backfill",
+        help="Compute Gold features as of past dates (point-in-time, partitioned by as_of)",
+    )
+    backfill_dates = backfill_parser.add_mutually_exclusive_group(required=True)
+    backfill_dates.add_argument(
+        "--dates", nargs="+", type=date.fromisoformat, help="As-of dates (YYYY-MM-DD)"
+    )
+    backfill_dates.add_argument(
+        "--start", type=date.fromisoformat, help="First as-of date of a range (with --end)"
+    )
+    backfill_parser.add_argument(
+        "--end", type=date.fromisoformat, help="Last as-of date of a range (inclusive)"
+    )
+    backfill_parser.add_argument(
+        "--interval", default="1 month", help="Step of the range (default: 1 month)"
+    )
+    backfill_parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Enable verbose logging",
+    )
+    serve_parser = commands.add_parser(
+        "serve",
+        help="Serve Gold features by key over HTTP (hot-swapped after each Gold run)",
+    )
+    serve_parser.add_argument("--port", type=int, help="Port (default: serving.port)")
+    serve_parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Enable verbose logging",
+    )
     parser.add_argument(
         "--layers",
         nargs="+",
         choices=["bronze", "silver", "gold", "graph"],
         help="Specific layers to run",
     )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        help="Process only these sources (FK parents are reused from Silver or recomputed)",
+    )
+    parser.add_argument(
+        "--revalidate-children",
+        action="store_true",
+        help="With --sources, also re-validate sources that reference them",
+    )
+    parser.add_argument(
+        "--incremental-gold",
+        action="store_true",
+        help="Fold only new transactions, reviews and invoices into the Gold state",
+    )
+    parser.add_argument(
+        "--profile-gold",
+        action="store_true",
+        help="Write a DuckDB profile of each Gold feature query to outputs/profiles/",
+    )
     parser.add_argument(
         "--fresh",
         action="store_true",
@@ -263,10 +529,43 @@ def main():
     
     args = parser.parse_args()
     
+    if args.command == "replay-quarantine":
+        replayed = replay_quarantine(args.sources, verbose=args.verbose)
+        print("\n✓ Quarantine replay complete")
+        for name, counts in replayed.items():
+            print(
+                f"  {name}: {counts['rescued']}/{counts['replayed']} rescued, "
+                f"{counts['remaining']} still quarantined"
+            )
+        return
+    
+    if args.command == "serve":
+        serve_features(port=args.port, verbose=args.verbose)
+        return
+    
+    if args.command == "backfill":
+        if bool(args.start) != bool(args.end):
+            parser.error("backfill: --start and --end go together")
+        backfilled = backfill_gold(
+            dates=args.dates,
+            start=args.start,
+            end=args.end,
+            interval=args.interval,
+            verbose=args.verbose,
+        )
+        print("\n✓ Gold backfill complete")
+        for name, counts in backfilled.items():
+            print(f"  {name}: {counts['rows']} rows → {counts['path']}")
+        return
+    
     results = run_pipeline(
         layers=args.layers,
         verbose=args.verbose,
         fresh=args.fresh,
+        sources=args.sources,
+        revalidate_children=args.revalidate_children,
+        incremental_gold=args.incremental_gold,
+        profile_gold=args.profile_gold,
     )
     
     # Print summary
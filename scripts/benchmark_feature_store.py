@@ -0,0 +1,81 @@
+"""
+Latency benchmark for the online feature store.
+
+Loads the Gold Arrow exports and times single-key and batch lookups in
+process, and optionally through the HTTP endpoint:
+
+    python scripts/benchmark_feature_store.py [--gold-dir DIR] [--http]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+# Add project root to Python path so we can import 'src'
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from loguru import logger
+
+from src.serving import FeatureStore, make_server
+
+
+def percentiles(samples_ns: list) -> str:
+    samples = sorted(samples_ns)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] / 1000
+    return f"p50 {pick(0.5):8.1f} us   p99 {pick(0.99):8.1f} us   max {samples[-1] / 1000:8.1f} us"
+
+
+def timed(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature store lookups")
+    parser.add_argument("--gold-dir", type=Path, default=project_root / "outputs" / "processed" / "gold")
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--http", action="store_true", help="Also time lookups over HTTP")
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    start = time.perf_counter()
+    store = FeatureStore(args.gold_dir)
+    print(f"Loaded {store.metrics()['tables']} in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+    rng = random.Random(42)
+
+    for table, features in store._snapshot.tables.items():
+        keys = list(features.index)
+        single = timed(lambda: store.get_one(table, rng.choice(keys)), args.iterations)
+        batch = timed(
+            lambda: store.get(table, rng.sample(keys, min(args.batch_size, len(keys)))),
+            max(1, args.iterations // 10),
+        )
+        print(f"{table:<20} get_one      {percentiles(single)}")
+        print(f"{'':<20} get x{args.batch_size:<6} {percentiles(batch)}")
+
+    if args.http:
+        server = make_server(store, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+        keys = list(store._snapshot.tables["customer_features"].index)
+        url = f"http://{host}:{port}/features/customer_features?key="
+        samples = timed(lambda: urlopen(url + rng.choice(keys)).read(), args.iterations // 10)
+        print(f"\n{'HTTP customer':<20} get_one      {percentiles(samples)}")
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ Flattens nested structures and outputs to CSV.
 
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 import polars as pl
@@ -45,10 +45,13 @@ class BronzeIngester:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logger.bind(component="BronzeIngester")
     
-    def ingest_all(self) -> Dict[str, Dict[str, Any]]:
+    def ingest_all(self, sources: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
         """
         Ingest all configured sources into Bronze layer.
         
+        Args:
+            sources: Optional subset of source names to ingest (default: all).
+        
         Returns:
             Dictionary with ingestion results per source.
         """
@@ -60,6 +63,8 @@ class BronzeIngester:
         load_timestamp = datetime.now().isoformat()
         
         for source_name, config in self.sources.items():
+            if sources is not None and source_name not in sources:
+                continue
             try:
                 result = self._ingest_source(source_name, config, load_timestamp)
                 results[source_name] = result
@@ -0,0 +1,323 @@
+"""
+Incremental Gold State.
+
+Customer, product and vendor features are derived from additive aggregate
+state kept in DuckDB (``gold_state_*`` tables) instead of being aggregated
+over the full fact history on every run:
+
+    gold_state_customer_transactions   counts, sums, first/last purchase
+    gold_state_product_transactions    counts, quantities, revenue, first/last sale
+    gold_state_product_customers       distinct (product, customer) pairs
+    gold_state_product_reviews         review count, rating sum/count
+    gold_state_vendor_invoices         invoice counts and amounts
+
+Each fact table has a ledger (``gold_ledger_<fact>``) of the rows already
+folded in, keyed by natural id with a hash of the columns the state reads.
+A run folds only rows missing from the ledger. If a folded row changed or
+disappeared, the state of that fact cannot be corrected additively (MIN/MAX
+are not reversible), so it is rebuilt from the full table instead.
+
+Keys touched by the folded rows are written to ``_changed_<entity>_sk``
+tables; the feature SQL recomputes only those rows.
+
+Each fact table is scanned once per run. New transactions are rolled up
+into the customer x product x day intermediate
+(``sql/intermediate/txn_daily.sql``), from which all transaction states
+are folded; invoice features read the product state as well. One of those
+states is ``txn_daily`` itself, the intermediate over the full history,
+which the rolling-window features read instead of the fact table.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+from loguru import logger
+
+
+STATE_SQL_DIR = Path(__file__).parent / "sql" / "state"
+INTERMEDIATE_SQL_DIR = Path(__file__).parent / "sql" / "intermediate"
+
+
+def intermediate_sql(name: str, source: str) -> str:
+    """SELECT of the intermediate ``name`` over the rows of ``source``."""
+    return (INTERMEDIATE_SQL_DIR / f"{name}.sql").read_text().format(source=source)
+
+
+@dataclass(frozen=True)
+class FactSource:
+    """
+    A Silver fact table folded into state, and the columns its state reads.
+
+    With ``intermediate`` set, the delta is first aggregated by
+    ``sql/intermediate/<intermediate>.sql`` and every state table of the
+    fact is built from that shared aggregate instead of the raw rows.
+    """
+    table: str
+    id_column: str
+    columns: Tuple[str, ...]
+    intermediate: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class StateTable:
+    """An aggregate state table and how two partial aggregates combine."""
+    name: str
+    fact: str
+    sql_file: str
+    keys: Tuple[str, ...]
+    sums: Tuple[str, ...] = ()
+    mins: Tuple[str, ...] = ()
+    maxs: Tuple[str, ...] = ()
+    # Record the keys touched by each fold in _changed_<key>
+    track_changes: bool = True
+
+
+FACTS: Dict[str, FactSource] = {
+    "transactions": FactSource(
+        "transactions", "transaction_id",
+        ("customer_sk", "product_sk", "quantity", "total_amount", "transaction_date"),
+        intermediate="txn_daily",
+    ),
+    "reviews": FactSource("reviews", "review_id", ("product_sk", "rating")),
+    "invoices": FactSource(
+        "invoices", "invoice_id",
+        ("vendor_sk", "total_amount", "payment_status", "payment_date", "due_date"),
+    ),
+}
+
+STATE_TABLES: List[StateTable] = [
+    StateTable(
+        "gold_state_customer_transactions", "transactions", "customer_transactions.sql",
+        keys=("customer_sk",),
+        sums=("total_orders", "return_count", "total_revenue", "gross_revenue",
+              "return_amount", "amount_count"),
+        mins=("first_purchase",),
+        maxs=("last_purchase",),
+    ),
+    StateTable(
+        "gold_state_product_transactions", "transactions", "product_transactions.sql",
+        keys=("product_sk",),
+        sums=("times_sold", "total_quantity_sold", "total_revenue"),
+        mins=("first_sale",),
+        maxs=("last_sale",),
+    ),
+    StateTable(
+        "gold_state_product_customers", "transactions", "product_customers.sql",
+        keys=("product_sk", "customer_sk"),
+    ),
+    StateTable(
+        "gold_state_product_reviews", "reviews", "product_reviews.sql",
+        keys=("product_sk",),
+        sums=("review_count", "rating_sum", "rating_count"),
+    ),
+    StateTable(
+        "gold_state_vendor_invoices", "invoices", "vendor_invoices.sql",
+        keys=("vendor_sk",),
+        sums=("total_invoices", "total_invoice_amount", "amount_count",
+              "paid_on_time_invoices", "total_outstanding_balance"),
+    ),
+    StateTable(
+        "txn_daily", "transactions", "txn_daily.sql",
+        keys=("customer_sk", "product_sk", "transaction_date"),
+        sums=("transactions", "return_count", "quantity", "total_amount",
+              "gross_amount", "return_amount", "amount_count"),
+        track_changes=False,
+    ),
+]
+
+
+def state_sql_files(name: str) -> List[Path]:
+    """SQL a state table is built from: its own file and its fact's intermediate, if any."""
+    state = next((s for s in STATE_TABLES if s.name == name), None)
+    if state is None:
+        raise ValueError(
+            f"Unknown Gold state table {name}. Expected one of {[s.name for s in STATE_TABLES]}"
+        )
+    files = [STATE_SQL_DIR / state.sql_file]
+    intermediate = FACTS[state.fact].intermediate
+    if intermediate:
+        files.append(INTERMEDIATE_SQL_DIR / f"{intermediate}.sql")
+    return files
+
+
+class IncrementalState:
+    """Maintains the Gold aggregate state and ledgers in a DuckDB connection."""
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self.conn = conn
+        self.logger = logger.bind(component="IncrementalState")
+
+    def fold(self, full: bool = False) -> Dict[str, int]:
+        """
+        Fold new fact rows into every state table.
+
+        Args:
+            full: Discard existing state and ledgers and fold every row.
+
+        Returns:
+            Rows folded per fact table. Keys of the state rows touched are
+            left in ``_changed_<key>`` tables (e.g. ``_changed_customer_sk``).
+        """
+        folded = {}
+        self._reset_changed_keys()
+        for fact in FACTS.values():
+            if not self._table_exists(fact.table):
+                self.logger.warning(f"State {fact.table}: no Silver table, state dropped")
+                self.conn.execute(f"DROP TABLE IF EXISTS gold_ledger_{fact.table}")
+                self._drop_state(fact)
+                continue
+            self._snapshot(fact)
+            rebuild = full or self._ledger_diverged(fact)
+            if rebuild:
+                self._reset(fact)
+            delta = self._stage_delta(fact)
+            source = self._build_intermediate(fact, delta)
+            for state in (s for s in STATE_TABLES if s.fact == fact.table):
+                self._merge(state, source)
+            self.conn.execute(f"INSERT INTO gold_ledger_{fact.table} SELECT row_id, row_hash FROM {delta}")
+            folded[fact.table] = self.conn.execute(f"SELECT COUNT(*) FROM {delta}").fetchone()[0]
+            # TEMP tables stay in memory (they only spill with a temp_directory),
+            # so the full snapshot is not kept around for the feature queries
+            self.conn.execute(f"DROP TABLE _current_{fact.table}")
+            mode = "rebuilt" if rebuild else "folded"
+            self.logger.info(f"State {fact.table}: {folded[fact.table]} rows {mode}")
+        self.conn.execute("DROP TABLE IF EXISTS _partial")
+        self.conn.execute("DROP TABLE IF EXISTS _combined")
+        return folded
+
+    # ------------------------------------------------------------------
+    # Ledger
+    # ------------------------------------------------------------------
+
+    def _row_hash(self, fact: FactSource) -> str:
+        return f"hash({', '.join(fact.columns)})"
+
+    def _snapshot(self, fact: FactSource) -> None:
+        """
+        Create the ledger if needed and snapshot the current rows of ``fact``.
+
+        This is the only scan of the Silver table: the row hashes and the
+        columns the state reads are copied once, and the delta is cut from
+        the snapshot.
+        """
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS gold_ledger_{fact.table} (
+                row_id VARCHAR PRIMARY KEY,
+                row_hash UBIGINT
+            )
+        """)
+        self.conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE _current_{fact.table} AS
+            SELECT
+                CAST({fact.id_column} AS VARCHAR) as row_id,
+                {self._row_hash(fact)} as row_hash,
+                {', '.join(fact.columns)}
+            FROM {fact.table}
+        """)
+
+    def _ledger_diverged(self, fact: FactSource) -> bool:
+        """True if a folded row was changed or removed since it was folded."""
+        diverged = self.conn.execute(f"""
+            SELECT COUNT(*)
+            FROM gold_ledger_{fact.table} l
+            LEFT JOIN _current_{fact.table} c USING (row_id)
+            WHERE c.row_hash IS DISTINCT FROM l.row_hash
+        """).fetchone()[0]
+        if diverged:
+            self.logger.warning(
+                f"{diverged} folded {fact.table} rows changed or removed, rebuilding state"
+            )
+        return diverged > 0
+
+    def _table_exists(self, name: str) -> bool:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_schema = 'main' AND table_name = ?",
+            [name],
+        ).fetchone()[0] > 0
+
+    def _drop_state(self, fact: FactSource) -> None:
+        """Drop the state tables fed by ``fact``."""
+        for state in (s for s in STATE_TABLES if s.fact == fact.table):
+            self.conn.execute(f"DROP TABLE IF EXISTS {state.name}")
+
+    def _reset(self, fact: FactSource) -> None:
+        """Start the state of ``fact`` over from an empty ledger."""
+        self.conn.execute(f"DELETE FROM gold_ledger_{fact.table}")
+        self._drop_state(fact)
+        # Every key of the dependent features has to be re-derived
+        self.conn.execute(f"INSERT INTO _rebuilt_facts VALUES ('{fact.table}')")
+
+    def _stage_delta(self, fact: FactSource) -> str:
+        """Materialize the fact rows not yet in the ledger; returns the temp table name."""
+        delta = f"_delta_{fact.table}"
+        self.conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE {delta} AS
+            SELECT * FROM _current_{fact.table}
+            ANTI JOIN gold_ledger_{fact.table} USING (row_id)
+        """)
+        return delta
+
+    def _build_intermediate(self, fact: FactSource, delta: str) -> str:
+        """
+        Materialize the shared intermediate of ``fact`` over the delta, if it has one.
+
+        Returns the temp table name (``_delta_<intermediate>``).
+        """
+        if not fact.intermediate:
+            return delta
+        sql = intermediate_sql(fact.intermediate, delta)
+        self.conn.execute(f"CREATE OR REPLACE TEMP TABLE _delta_{fact.intermediate} AS {sql}")
+        return f"_delta_{fact.intermediate}"
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _merge(self, state: StateTable, source: str) -> None:
+        """Aggregate ``source`` and combine it into ``state`` key by key."""
+        sql = (STATE_SQL_DIR / state.sql_file).read_text().format(source=source)
+        self.conn.execute(f"CREATE OR REPLACE TEMP TABLE _partial AS {sql}")
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {state.name} AS SELECT * FROM _partial LIMIT 0")
+
+        keys = ", ".join(state.keys)
+        for key in state.keys if state.track_changes else ():
+            self.conn.execute(f"INSERT INTO _changed_{key} SELECT DISTINCT {key} FROM _partial")
+
+        if not (state.sums or state.mins or state.maxs):
+            self.conn.execute(f"""
+                INSERT INTO {state.name}
+                SELECT * FROM _partial ANTI JOIN {state.name} USING ({keys})
+            """)
+            return
+
+        combined = [f"p.{k}" for k in state.keys]
+        combined += [f"COALESCE(s.{c} + p.{c}, s.{c}, p.{c}) as {c}" for c in state.sums]
+        combined += [f"LEAST(s.{c}, p.{c}) as {c}" for c in state.mins]
+        combined += [f"GREATEST(s.{c}, p.{c}) as {c}" for c in state.maxs]
+        self.conn.execute(f"""
+            CREATE OR REPLACE TEMP TABLE _combined AS
+            SELECT {', '.join(combined)}
+            FROM _partial p
+            LEFT JOIN {state.name} s USING ({keys})
+        """)
+        self.conn.execute(f"DELETE FROM {state.name} WHERE ({keys}) IN (SELECT {keys} FROM _partial)")
+        self.conn.execute(f"INSERT INTO {state.name} BY NAME SELECT * FROM _combined")
+
+    def _reset_changed_keys(self) -> None:
+        """
+        Fresh, empty ``_changed_*`` key tables for this run.
+
+        Regular tables, not TEMP: the feature queries read them from their
+        own cursors.
+        """
+        keys = {k for s in STATE_TABLES if s.track_changes for k in s.keys}
+        for key in sorted(keys):
+            self.conn.execute(f"CREATE OR REPLACE TABLE _changed_{key} ({key} INTEGER)")
+        self.conn.execute("CREATE OR REPLACE TEMP TABLE _rebuilt_facts (fact VARCHAR)")
+
+    def rebuilt_facts(self) -> List[str]:
+        """Facts whose state was rebuilt from scratch during the last fold."""
+        return [r[0] for r in self.conn.execute("SELECT fact FROM _rebuilt_facts").fetchall()]
@@ -0,0 +1,154 @@
+"""
+Customer x Product Interaction Matrix.
+
+Recommenders train on a sparse customer x product matrix. Gold builds it
+once per run with a single DuckDB group-by over the Silver transactions and
+writes it in CSR form as ``.npy`` files, which ``np.load(path,
+mmap_mode="r")`` maps without reading or re-aggregating anything:
+
+    indptr.npy        int64[n_customers + 1]  row i is indptr[i]:indptr[i + 1]
+    indices.npy       int32[nnz]              product column of each entry
+    counts.npy        int32[nnz]              transactions (returns included)
+    quantity.npy      int64[nnz]              net quantity (returns are negative)
+    revenue.npy       float64[nnz]            net total_amount
+    customer_ids.npy  str[n_customers]        customer_id of each row
+    product_ids.npy   str[n_products]         product_id of each column
+
+Rows and columns are dense indices over every customer and product in
+surrogate-key order, so customers and products without transactions are
+empty rows and columns. Columns are ascending within a row. The ID
+dictionaries are fixed-width unicode arrays, so they memory-map as well.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+import duckdb
+import numpy as np
+
+
+# Silver tables the matrix is built from
+INTERACTION_SOURCES = ("customers", "products", "transactions")
+
+# Value arrays sharing indptr/indices, and their dtypes
+INTERACTION_VALUES = {"counts": np.int32, "quantity": np.int64, "revenue": np.float64}
+
+INTERACTIONS_SQL = """
+    WITH customer_index AS (
+        SELECT customer_sk, ROW_NUMBER() OVER (ORDER BY customer_sk) - 1 as row_index
+        FROM customers
+        WHERE customer_sk IS NOT NULL
+    ),
+    product_index AS (
+        SELECT product_sk, ROW_NUMBER() OVER (ORDER BY product_sk) - 1 as column_index
+        FROM products
+        WHERE product_sk IS NOT NULL
+    )
+    SELECT
+        c.row_index,
+        CAST(p.column_index AS INTEGER) as column_index,
+        CAST(COUNT(*) AS INTEGER) as counts,
+        CAST(SUM(COALESCE(t.quantity, 0)) AS BIGINT) as quantity,
+        CAST(SUM(COALESCE(t.total_amount, 0)) AS DOUBLE) as revenue
+    FROM transactions t
+    JOIN customer_index c ON t.customer_sk = c.customer_sk
+    JOIN product_index p ON t.product_sk = p.product_sk
+    GROUP BY c.row_index, p.column_index
+    ORDER BY c.row_index, p.column_index
+"""
+
+
+@dataclass
+class InteractionMatrix:
+    """CSR customer x product matrix with one value array per measure."""
+    indptr: np.ndarray
+    indices: np.ndarray
+    values: Dict[str, np.ndarray]
+    customer_ids: np.ndarray
+    product_ids: np.ndarray
+
+    @property
+    def shape(self):
+        return len(self.customer_ids), len(self.product_ids)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def save(self, directory: Path) -> Dict[str, Path]:
+        """
+        Write every array as ``<name>.npy`` under ``directory``.
+
+        Each file is written aside and renamed over the old one, so a reader
+        holding a memory map of the previous run keeps a consistent file.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "indptr": self.indptr,
+            "indices": self.indices,
+            **self.values,
+            "customer_ids": self.customer_ids,
+            "product_ids": self.product_ids,
+        }
+        files = {}
+        for name, array in arrays.items():
+            path = directory / f"{name}.npy"
+            tmp = path.with_name(f".{path.name}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, path)
+            files[name] = path
+        return files
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "InteractionMatrix":
+        """Read a saved matrix; with ``mmap`` every array is a read-only memory map."""
+        directory = Path(directory)
+        mode = "r" if mmap else None
+
+        def read(name: str) -> np.ndarray:
+            return np.load(directory / f"{name}.npy", mmap_mode=mode)
+
+        return cls(
+            indptr=read("indptr"),
+            indices=read("indices"),
+            values={name: read(name) for name in INTERACTION_VALUES},
+            customer_ids=read("customer_ids"),
+            product_ids=read("product_ids"),
+        )
+
+
+def _ids(conn: duckdb.DuckDBPyConnection, table: str, natural_key: str, sk: str) -> np.ndarray:
+    """Natural keys of ``table`` in surrogate-key order, as a fixed-width unicode array."""
+    column = conn.execute(
+        f"SELECT CAST({natural_key} AS VARCHAR) as id FROM {table} WHERE {sk} IS NOT NULL ORDER BY {sk}"
+    ).fetchnumpy()["id"]
+    return np.asarray(column, dtype=np.str_) if len(column) else np.array([], dtype="<U1")
+
+
+def build_interactions(conn: duckdb.DuckDBPyConnection) -> InteractionMatrix:
+    """
+    Aggregate the transactions per (customer, product) into a CSR matrix.
+
+    DuckDB groups and sorts the entries by (row, column); indptr is the
+    running total of the entries per row.
+    """
+    customer_ids = _ids(conn, "customers", "customer_id", "customer_sk")
+    product_ids = _ids(conn, "products", "product_id", "product_sk")
+    entries = conn.execute(INTERACTIONS_SQL).fetchnumpy()
+    rows = np.asarray(entries["row_index"], dtype=np.int64)
+    indptr = np.zeros(len(customer_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(customer_ids)), out=indptr[1:])
+    return InteractionMatrix(
+        indptr=indptr,
+        indices=np.asarray(entries["column_index"], dtype=np.int32),
+        values={
+            name: np.asarray(entries[name], dtype=dtype)
+            for name, dtype in INTERACTION_VALUES.items()
+        },
+        customer_ids=customer_ids,
+        product_ids=product_ids,
+    )
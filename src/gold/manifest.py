@@ -0,0 +1,123 @@
+"""
+Gold Feature Manifest.
+
+``src/gold/sql/manifest.yaml`` declares every Gold feature table: its SQL
+file, its inputs (Silver sources or other Gold tables) and how it is
+published. GoldProcessor schedules the tables from it, so a new feature
+table is a SQL file plus a manifest entry.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import yaml
+
+
+SQL_DIR = Path(__file__).parent / "sql"
+MANIFEST_PATH = SQL_DIR / "manifest.yaml"
+
+
+@dataclass(frozen=True)
+class IncrementalSpec:
+    """Keys of a feature table maintained from the incremental state."""
+    key: str
+    sk: str
+    dimension: str
+
+
+@dataclass(frozen=True)
+class Fragment:
+    """SQL substituted into a placeholder, with a fallback if a table is missing."""
+    sql: str
+    requires: Optional[str] = None
+    fallback: Optional[str] = None
+    # Repeated for every rolling window, with {days} set to its length
+    per_window: bool = False
+
+
+@dataclass
+class FeatureSpec:
+    """One Gold feature table from the manifest."""
+    name: str
+    sql: str
+    inputs: List[str]
+    # Incremental state tables the SQL reads (see ``src.gold.incremental``);
+    # the feature table is not computed while one is missing
+    state: List[str] = field(default_factory=list)
+    # Table the SQL reads that only exists when an optional feature is on;
+    # without it the feature table is not computed
+    requires: Optional[str] = None
+    incremental: Optional[IncrementalSpec] = None
+    uses_reference_date: bool = False
+    fragments: Dict[str, Fragment] = field(default_factory=dict)
+    # Point-in-time SQL over the gold_as_of date spine, and its fragments
+    # where they differ from ``fragments``
+    backfill: Optional[str] = None
+    backfill_fragments: Dict[str, Fragment] = field(default_factory=dict)
+
+
+def _fragments(raw: Optional[dict]) -> Dict[str, Fragment]:
+    return {placeholder: Fragment(**fragment) for placeholder, fragment in (raw or {}).items()}
+
+
+class GoldManifest:
+    """Feature tables in manifest order, with their dependency graph."""
+
+    def __init__(self, tables: Dict[str, FeatureSpec], sql_dir: Path = SQL_DIR):
+        self.tables = tables
+        self.sql_dir = Path(sql_dir)
+        self._check_acyclic()
+
+    @classmethod
+    def load(cls, path: Path = MANIFEST_PATH) -> "GoldManifest":
+        """Read a manifest; its SQL files are resolved next to it."""
+        path = Path(path)
+        with open(path) as f:
+            raw = yaml.safe_load(f) or {}
+        tables = {}
+        for name, entry in (raw.get("tables") or {}).items():
+            entry = entry or {}
+            incremental = entry.get("incremental")
+            tables[name] = FeatureSpec(
+                name=name,
+                sql=entry.get("sql", f"{name}.sql"),
+                inputs=list(entry.get("inputs", [])),
+                state=list(entry.get("state", [])),
+                requires=entry.get("requires"),
+                incremental=IncrementalSpec(**incremental) if incremental else None,
+                uses_reference_date=bool(entry.get("uses_reference_date", False)),
+                fragments=_fragments(entry.get("fragments")),
+                backfill=entry.get("backfill"),
+                backfill_fragments=_fragments(entry.get("backfill_fragments")),
+            )
+        return cls(tables, sql_dir=path.parent)
+
+    def gold_inputs(self, name: str) -> List[str]:
+        """Inputs of ``name`` that are themselves Gold tables."""
+        return [i for i in self.tables[name].inputs if i in self.tables]
+
+    def silver_inputs(self, name: str) -> Set[str]:
+        """Silver sources ``name`` reads, directly or through other Gold tables."""
+        sources = set()
+        for i in self.tables[name].inputs:
+            sources |= self.silver_inputs(i) if i in self.tables else {i}
+        return sources
+
+    def _check_acyclic(self) -> None:
+        done: Set[str] = set()
+        visiting: Set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Gold manifest has a dependency cycle through {name}")
+            visiting.add(name)
+            for dep in self.gold_inputs(name):
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.tables:
+            visit(name)
@@ -0,0 +1,87 @@
+"""
+Gold Query Profiling.
+
+With profiling on, each feature table's SQL runs with DuckDB's detailed
+JSON profiler enabled on its cursor. The profile (the optimized physical
+plan with per-operator timings and cardinalities, plus planner/optimizer
+timings, peak buffer memory and temp-directory use) is written to
+``<profile_dir>/<table>.json``. A QueryProfile summary is kept on the
+FeatureResult for the run log and the quality report.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import duckdb
+
+
+@dataclass
+class QueryProfile:
+    """Summary of one profiled feature query."""
+    feature_table: str
+    latency_s: float
+    cpu_time_s: float
+    rows_scanned: int
+    peak_memory_bytes: int
+    # Bytes spilled to DuckDB's temp directory (0 when the query fit in memory)
+    spill_bytes: int
+    # Slowest operators: (operator, seconds, output rows)
+    top_operators: List[Tuple[str, float, int]] = field(default_factory=list)
+    path: Optional[Path] = None
+
+    def summary(self) -> str:
+        slowest = ", ".join(
+            f"{name} {seconds * 1000:.1f} ms ({rows:,} rows)"
+            for name, seconds, rows in self.top_operators[:2]
+        )
+        return (
+            f"{self.latency_s * 1000:.1f} ms, peak {self.peak_memory_bytes / 2**20:.1f} MB, "
+            f"spill {self.spill_bytes / 2**20:.1f} MB; slowest: {slowest or 'n/a'}"
+        )
+
+
+def enable(cursor: duckdb.DuckDBPyConnection) -> None:
+    """Profile the following queries of ``cursor`` (profiling is per connection)."""
+    cursor.execute("PRAGMA enable_profiling = 'no_output'")
+    cursor.execute("SET profiling_mode = 'detailed'")
+
+
+def disable(cursor: duckdb.DuckDBPyConnection) -> None:
+    cursor.execute("PRAGMA disable_profiling")
+
+
+def _operators(node: dict) -> List[dict]:
+    found = [node] if "operator_type" in node else []
+    for child in node.get("children", []):
+        found.extend(_operators(child))
+    return found
+
+
+def capture(
+    cursor: duckdb.DuckDBPyConnection, feature_table: str, profile_dir: Path, top: int = 5
+) -> QueryProfile:
+    """Write the profile of the last query on ``cursor`` and summarize it."""
+    profile = json.loads(cursor.get_profiling_information(format="json"))
+    profile_dir = Path(profile_dir)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    path = profile_dir / f"{feature_table}.json"
+    path.write_text(json.dumps(profile, indent=2))
+
+    operators = sorted(
+        _operators(profile), key=lambda op: op.get("operator_timing", 0.0), reverse=True
+    )
+    return QueryProfile(
+        feature_table=feature_table,
+        latency_s=profile.get("latency", 0.0),
+        cpu_time_s=profile.get("cpu_time", 0.0),
+        rows_scanned=profile.get("cumulative_rows_scanned", 0),
+        peak_memory_bytes=profile.get("system_peak_buffer_memory", 0),
+        spill_bytes=profile.get("system_peak_temp_dir_size", 0),
+        top_operators=[
+            (op["operator_name"], op.get("operator_timing", 0.0), op.get("operator_cardinality", 0))
+            for op in operators[:top]
+        ],
+        path=path,
+    )
@@ -0,0 +1,83 @@
+"""
+Gold Run Marker.
+
+Every export is renamed into place as soon as its table is done, so the
+files in the Gold directory belong to a mix of runs while Gold is running.
+Once all exports are written, Gold writes ``_gold_run.json``:
+
+    {"version": 3, "completed_at": "2026-10-18T09:30:00",
+     "files": {"customer_features.arrow": [inode, size, mtime_ns], ...}}
+
+Readers that need a consistent set of files (the feature store) act only
+when the marker changes and check that the files they opened are still
+the ones it lists. The marker itself is replaced atomically.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+RUN_MARKER = "_gold_run.json"
+
+
+@dataclass(frozen=True)
+class GoldRun:
+    """A finished Gold run: its number and the (inode, size, mtime_ns) of each file."""
+    version: int
+    completed_at: str
+    files: Dict[str, Tuple[int, int, int]]
+
+    def changed_files(self, directory: Path, names: Iterable[str]) -> List[str]:
+        """Files among ``names`` that are missing or differ from this run's."""
+        changed = []
+        for name in names:
+            path = Path(directory) / name
+            expected = self.files.get(name)
+            if expected is None or not path.exists() or _stat(path) != expected:
+                changed.append(name)
+        return changed
+
+
+def _stat(path: Path) -> Tuple[int, int, int]:
+    # Exports are renamed into place, so a new file always has a new inode
+    stat = path.stat()
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def read_run_marker(directory: Path) -> Optional[GoldRun]:
+    """The last finished run in ``directory``, or None if there is none."""
+    path = Path(directory) / RUN_MARKER
+    if not path.exists():
+        return None
+    with open(path) as f:
+        marker = json.load(f)
+    return GoldRun(
+        version=marker["version"],
+        completed_at=marker["completed_at"],
+        files={name: tuple(stat) for name, stat in marker["files"].items()},
+    )
+
+
+def write_run_marker(directory: Path, paths: Iterable[Path]) -> GoldRun:
+    """Record ``paths`` (under ``directory``) as the files of a finished run."""
+    directory = Path(directory)
+    previous = read_run_marker(directory)
+    run = GoldRun(
+        version=(previous.version + 1) if previous else 1,
+        completed_at=datetime.now().isoformat(timespec="seconds"),
+        files={
+            Path(path).relative_to(directory).as_posix(): _stat(Path(path))
+            for path in sorted(paths)
+        },
+    )
+    marker = directory / RUN_MARKER
+    tmp = marker.with_name(f".{marker.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": run.version, "completed_at": run.completed_at,
+                   "files": {name: list(stat) for name, stat in run.files.items()}}, f, indent=2)
+    os.replace(tmp, marker)
+    return run
@@ -0,0 +1,41 @@
+-- Point-in-time customer_features for every date in gold_as_of: transactions
+-- dated on or before as_of, customers registered by as_of. The formulas are
+-- the fragments shared with customer_features.sql, with as_of in place of
+-- the reference date.
+CREATE OR REPLACE TEMP TABLE customer_features_backfill AS
+WITH daily AS (
+    SELECT *, COALESCE(TRY_CAST(transaction_date AS DATE), '-infinity'::DATE) as known_from
+    FROM txn_daily_history
+),
+transaction_stats AS (
+    SELECT 
+        s.as_of,
+        d.customer_sk,
+        CAST(SUM(d.transactions) AS BIGINT) as total_orders,
+        CAST(SUM(d.return_count) AS BIGINT) as return_count,
+        SUM(d.total_amount) as total_revenue,
+        SUM(d.gross_amount) as gross_revenue,
+        SUM(d.return_amount) as return_amount,
+        SUM(d.total_amount) / NULLIF(SUM(d.amount_count), 0) as avg_order_value,
+        MIN(d.transaction_date) as first_purchase,
+        MAX(d.transaction_date) as last_purchase
+    FROM gold_as_of s
+    JOIN daily d ON d.known_from <= s.as_of
+    WHERE d.customer_sk IS NOT NULL
+    GROUP BY s.as_of, d.customer_sk
+),
+-- RFM scoring
+rfm_raw AS (
+    SELECT 
+        s.as_of,
+        {customer_rfm_columns}
+    FROM gold_as_of s
+    JOIN customers c
+        ON COALESCE(TRY_CAST(c.registration_date AS DATE), '-infinity'::DATE) <= s.as_of
+    LEFT JOIN transaction_stats t ON t.as_of = s.as_of AND t.customer_sk = c.customer_sk
+),
+{customer_rfm_scored}
+SELECT
+    as_of,
+    {customer_columns}
+FROM rfm_scored
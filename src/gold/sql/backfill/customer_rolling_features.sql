@@ -0,0 +1,33 @@
+-- Point-in-time customer_rolling_features for every date in gold_as_of:
+-- customers registered by as_of get an empty row on each as-of date, and
+-- the windows ending on that date are read off it. Same frames as
+-- customer_rolling_features.sql; all dates come out of the one sorted pass.
+CREATE OR REPLACE TEMP TABLE customer_rolling_features_backfill AS
+WITH activity AS (
+    SELECT customer_sk as window_key, product_sk,
+           TRY_CAST(transaction_date AS DATE) as activity_date,
+           transactions, return_count, total_amount, false as is_as_of
+    FROM txn_daily_history
+    WHERE customer_sk IS NOT NULL AND TRY_CAST(transaction_date AS DATE) IS NOT NULL
+    UNION ALL
+    SELECT c.customer_sk, NULL, s.as_of, 0, 0, 0, true
+    FROM gold_as_of s
+    JOIN customers c
+        ON COALESCE(TRY_CAST(c.registration_date AS DATE), '-infinity'::DATE) <= s.as_of
+    WHERE c.customer_sk IS NOT NULL
+),
+windowed AS (
+    SELECT
+        window_key,
+        activity_date,
+        is_as_of,
+        {window_columns}
+    FROM activity
+    WINDOW {window_frames}
+)
+SELECT
+    w.activity_date as as_of,
+    c.customer_id,
+    w.* EXCLUDE (window_key, activity_date, is_as_of)
+FROM customers c
+JOIN windowed w ON w.window_key = c.customer_sk AND w.is_as_of
@@ -0,0 +1,30 @@
+-- Point-in-time invoice_features for every date in gold_as_of: invoices
+-- issued on or before as_of, with payments recorded after as_of treated as
+-- not yet made. The formulas are the fragments shared with
+-- invoice_features.sql. The line-item fallback reads the current product
+-- state and is not point-in-time.
+CREATE OR REPLACE TEMP TABLE invoice_features_backfill AS
+WITH {line_items_cte},
+invoices_as_of AS (
+    SELECT
+        s.as_of,
+        i.* REPLACE (
+            CASE WHEN TRY_CAST(i.payment_date AS DATE) > s.as_of THEN NULL ELSE i.payment_date END as payment_date,
+            CASE WHEN TRY_CAST(i.payment_date AS DATE) > s.as_of THEN 'pending' ELSE i.payment_status END as payment_status
+        )
+    FROM gold_as_of s
+    JOIN invoices i
+        ON COALESCE(TRY_CAST(i.invoice_date AS DATE), '-infinity'::DATE) <= s.as_of
+),
+base_invoice AS (
+    SELECT 
+        s.as_of,
+        {invoice_base_columns}
+    FROM gold_as_of s
+    JOIN invoices_as_of i ON i.as_of = s.as_of
+)
+SELECT 
+    b.as_of,
+    {invoice_columns}
+FROM base_invoice b
+LEFT JOIN line_item_stats lis ON b.invoice_sk = lis.invoice_sk
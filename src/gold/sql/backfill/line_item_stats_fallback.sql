@@ -0,0 +1,18 @@
+-- Fallback without line items: approximate from all sales per vendor
+-- (full history, not point-in-time)
+line_item_stats AS (
+    SELECT 
+        i2.invoice_sk,
+        COALESCE(v_stats.unique_products, 0) as unique_products,
+        COALESCE(v_stats.expected_cost, 0) as line_items_total  
+    FROM invoices i2
+    LEFT JOIN (
+        SELECT 
+            p.vendor_sk,
+            COUNT(DISTINCT d.product_sk) as unique_products,
+            SUM(TRY_CAST(p.cost AS DOUBLE) * d.quantity) as expected_cost
+        FROM txn_daily_history d
+        JOIN products p ON d.product_sk = p.product_sk
+        GROUP BY p.vendor_sk
+    ) v_stats ON i2.vendor_sk = v_stats.vendor_sk
+)
@@ -0,0 +1,43 @@
+-- Point-in-time product_features for every date in gold_as_of: sales and
+-- reviews dated on or before as_of. The formulas are the fragments shared
+-- with product_features.sql.
+CREATE OR REPLACE TEMP TABLE product_features_backfill AS
+WITH daily AS (
+    SELECT *, COALESCE(TRY_CAST(transaction_date AS DATE), '-infinity'::DATE) as known_from
+    FROM txn_daily_history
+),
+transaction_stats AS (
+    SELECT 
+        s.as_of,
+        d.product_sk,
+        CAST(SUM(d.transactions) AS BIGINT) as times_sold,
+        SUM(d.quantity) as total_quantity_sold,
+        SUM(d.total_amount) as total_revenue,
+        COUNT(DISTINCT d.customer_sk) as unique_customers,
+        MIN(d.transaction_date) as first_sale,
+        MAX(d.transaction_date) as last_sale
+    FROM gold_as_of s
+    JOIN daily d ON d.known_from <= s.as_of
+    WHERE d.product_sk IS NOT NULL
+    GROUP BY s.as_of, d.product_sk
+),
+review_stats AS (
+    SELECT
+        s.as_of,
+        r.product_sk,
+        COUNT(*) as review_count,
+        SUM(TRY_CAST(r.rating AS FLOAT)) / NULLIF(COUNT(TRY_CAST(r.rating AS FLOAT)), 0) as avg_rating
+    FROM gold_as_of s
+    JOIN reviews r
+        ON COALESCE(TRY_CAST(r.review_date AS DATE), '-infinity'::DATE) <= s.as_of
+    WHERE r.product_sk IS NOT NULL
+    GROUP BY s.as_of, r.product_sk
+)
+SELECT 
+    s.as_of,
+    {product_columns}
+FROM gold_as_of s
+CROSS JOIN products p
+LEFT JOIN transaction_stats t ON t.as_of = s.as_of AND p.product_sk = t.product_sk
+LEFT JOIN review_stats r ON r.as_of = s.as_of AND p.product_sk = r.product_sk
+LEFT JOIN vendors v ON p.vendor_sk = v.vendor_sk
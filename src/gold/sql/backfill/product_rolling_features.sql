@@ -0,0 +1,31 @@
+-- Point-in-time product_rolling_features for every date in gold_as_of: every
+-- product gets an empty row on each as-of date, and the windows ending on
+-- that date are read off it. Same frames as product_rolling_features.sql.
+CREATE OR REPLACE TEMP TABLE product_rolling_features_backfill AS
+WITH activity AS (
+    SELECT product_sk as window_key, customer_sk,
+           TRY_CAST(transaction_date AS DATE) as activity_date,
+           transactions, return_count, total_amount, false as is_as_of
+    FROM txn_daily_history
+    WHERE product_sk IS NOT NULL AND TRY_CAST(transaction_date AS DATE) IS NOT NULL
+    UNION ALL
+    SELECT pr.product_sk, NULL, s.as_of, 0, 0, 0, true
+    FROM gold_as_of s
+    CROSS JOIN products pr
+    WHERE pr.product_sk IS NOT NULL
+),
+windowed AS (
+    SELECT
+        window_key,
+        activity_date,
+        is_as_of,
+        {window_columns}
+    FROM activity
+    WINDOW {window_frames}
+)
+SELECT
+    w.activity_date as as_of,
+    pr.product_id,
+    w.* EXCLUDE (window_key, activity_date, is_as_of)
+FROM products pr
+JOIN windowed w ON w.window_key = pr.product_sk AND w.is_as_of
@@ -0,0 +1,60 @@
+-- Point-in-time vendor_features for every date in gold_as_of: invoices
+-- issued on or before as_of, with payments recorded after as_of treated
+-- as not yet made, and sales dated on or before as_of. The formulas are the
+-- fragments shared with vendor_features.sql.
+CREATE OR REPLACE TEMP TABLE vendor_features_backfill AS
+WITH {vendor_product_stats},
+invoices_as_of AS (
+    SELECT
+        s.as_of,
+        i.vendor_sk,
+        i.total_amount,
+        i.due_date,
+        CASE WHEN TRY_CAST(i.payment_date AS DATE) > s.as_of THEN NULL ELSE i.payment_date END as payment_date,
+        CASE WHEN TRY_CAST(i.payment_date AS DATE) > s.as_of THEN 'pending' ELSE i.payment_status END as payment_status
+    FROM gold_as_of s
+    JOIN invoices i
+        ON COALESCE(TRY_CAST(i.invoice_date AS DATE), '-infinity'::DATE) <= s.as_of
+    WHERE i.vendor_sk IS NOT NULL
+),
+invoice_stats AS (
+    SELECT 
+        as_of,
+        vendor_sk,
+        COUNT(*) as total_invoices,
+        SUM(TRY_CAST(total_amount AS DOUBLE)) as total_invoice_amount,
+        AVG(TRY_CAST(total_amount AS DOUBLE)) as average_invoice_value,
+        COUNT(CASE
+            WHEN payment_status = 'paid'
+                AND TRY_CAST(payment_date AS DATE) IS NOT NULL
+                AND TRY_CAST(due_date AS DATE) IS NOT NULL
+                AND TRY_CAST(payment_date AS DATE) <= TRY_CAST(due_date AS DATE)
+            THEN 1
+        END) as paid_on_time_invoices,
+        SUM(CASE 
+            WHEN payment_status != 'paid' 
+            THEN COALESCE(TRY_CAST(total_amount AS DOUBLE), 0) 
+            ELSE 0 
+        END) as total_outstanding_balance
+    FROM invoices_as_of
+    GROUP BY as_of, vendor_sk
+),
+transaction_revenue AS (
+    SELECT 
+        s.as_of,
+        p.vendor_sk,
+        SUM(TRY_CAST(d.total_amount AS DOUBLE)) as revenue_generated
+    FROM gold_as_of s
+    JOIN txn_daily_history d
+        ON COALESCE(TRY_CAST(d.transaction_date AS DATE), '-infinity'::DATE) <= s.as_of
+    JOIN products p ON d.product_sk = p.product_sk
+    GROUP BY s.as_of, p.vendor_sk
+)
+SELECT 
+    s.as_of,
+    {vendor_columns}
+FROM gold_as_of s
+CROSS JOIN vendors v
+LEFT JOIN product_stats p ON v.vendor_sk = p.vendor_sk
+LEFT JOIN invoice_stats i ON i.as_of = s.as_of AND v.vendor_sk = i.vendor_sk
+LEFT JOIN transaction_revenue tr ON tr.as_of = s.as_of AND v.vendor_sk = tr.vendor_sk
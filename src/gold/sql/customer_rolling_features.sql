@@ -0,0 +1,34 @@
+-- Trailing-window activity per customer as of the reference date, one set of
+-- columns per window in feature_engineering.rolling_windows (each window is
+-- the N days ending on the reference date).
+-- The customer x product x day rows of txn_daily (the full-history
+-- intermediate kept with the incremental state) get one empty row per
+-- customer at the reference date. Every window is a RANGE frame over the
+-- same (customer, day) order, so DuckDB sorts once and computes all windows
+-- in a single WINDOW operator instead of a self-join per window; the
+-- features are read off the reference-date rows.
+CREATE OR REPLACE TABLE customer_rolling_features AS
+WITH activity AS (
+    SELECT customer_sk as window_key, product_sk,
+           TRY_CAST(transaction_date AS DATE) as activity_date,
+           transactions, return_count, total_amount, false as is_as_of
+    FROM txn_daily
+    WHERE customer_sk IS NOT NULL AND TRY_CAST(transaction_date AS DATE) IS NOT NULL
+    UNION ALL
+    SELECT c.customer_sk, NULL, p.reference_date, 0, 0, 0, true
+    FROM customers c, gold_params p
+    WHERE c.customer_sk IS NOT NULL
+),
+windowed AS (
+    SELECT
+        window_key,
+        is_as_of,
+        {window_columns}
+    FROM activity
+    WINDOW {window_frames}
+)
+SELECT
+    c.customer_id,
+    w.* EXCLUDE (window_key, is_as_of)
+FROM customers c
+JOIN windowed w ON w.window_key = c.customer_sk AND w.is_as_of
@@ -0,0 +1,26 @@
+customer_id,
+    full_name,
+    segment,
+    total_spend,
+    total_orders,
+    return_count,
+    total_revenue,
+    gross_revenue,
+    return_amount,
+    avg_order_value AS average_order_value,
+    first_purchase,
+    last_purchase,
+    days_since_last_purchase,
+    customer_tenure_months,
+    purchase_frequency,
+    -- CLV: total_spend adjusted for tenure
+    CASE 
+        WHEN customer_tenure_months > 0 
+        THEN (total_revenue / customer_tenure_months) * 12
+        ELSE total_revenue
+    END as customer_lifetime_value,
+    -- RFM composite score (weighted average)
+    ROUND((recency_score * 0.35 + frequency_score * 0.35 + monetary_score * 0.30)::NUMERIC, 2) as customer_segment_score,
+    recency_score,
+    frequency_score,
+    monetary_score
\ No newline at end of file
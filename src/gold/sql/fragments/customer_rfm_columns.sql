@@ -0,0 +1,19 @@
+c.customer_id,
+        c.full_name,
+        c.segment,
+        COALESCE(c.total_spend, 0) as total_spend,
+        COALESCE(t.total_orders, 0) as total_orders,
+        COALESCE(t.return_count, 0) as return_count,
+        COALESCE(t.total_revenue, 0) as total_revenue,
+        COALESCE(t.gross_revenue, 0) as gross_revenue,
+        COALESCE(t.return_amount, 0) as return_amount,
+        COALESCE(t.avg_order_value, 0) as avg_order_value,
+        t.first_purchase,
+        t.last_purchase,
+        DATEDIFF('day', TRY_CAST(t.last_purchase AS DATE), s.as_of) as days_since_last_purchase,
+        DATEDIFF('month', TRY_CAST(c.registration_date AS DATE), s.as_of) as customer_tenure_months,
+        CASE 
+            WHEN DATEDIFF('month', TRY_CAST(c.registration_date AS DATE), s.as_of) > 0 
+            THEN t.total_orders::FLOAT / DATEDIFF('month', TRY_CAST(c.registration_date AS DATE), s.as_of)
+            ELSE COALESCE(t.total_orders, 0)
+        END as purchase_frequency
\ No newline at end of file
@@ -0,0 +1,30 @@
+-- RFM scores (1-5) of the rfm_raw rows
+rfm_scored AS (
+    SELECT *,
+        -- Recency score (1-5, lower days = higher score)
+        CASE 
+            WHEN days_since_last_purchase IS NULL THEN 1
+            WHEN days_since_last_purchase <= 30 THEN 5
+            WHEN days_since_last_purchase <= 90 THEN 4
+            WHEN days_since_last_purchase <= 180 THEN 3
+            WHEN days_since_last_purchase <= 365 THEN 2
+            ELSE 1
+        END as recency_score,
+        -- Frequency score (1-5)
+        CASE 
+            WHEN total_orders = 0 THEN 1
+            WHEN total_orders <= 2 THEN 2
+            WHEN total_orders <= 5 THEN 3
+            WHEN total_orders <= 10 THEN 4
+            ELSE 5
+        END as frequency_score,
+        -- Monetary score (1-5)
+        CASE 
+            WHEN total_revenue = 0 THEN 1
+            WHEN total_revenue <= 100 THEN 2
+            WHEN total_revenue <= 500 THEN 3
+            WHEN total_revenue <= 1000 THEN 4
+            ELSE 5
+        END as monetary_score
+    FROM rfm_raw
+)
\ No newline at end of file
@@ -0,0 +1,31 @@
+i.invoice_id,
+        i.invoice_sk,
+        i.vendor_id,
+        i.invoice_date,
+        i.due_date,
+        i.payment_date,
+        TRY_CAST(i.total_amount AS DOUBLE) as total_amount,
+        i.payment_status,
+        i.payment_terms,
+        -- Extract NET days from payment_terms (NET15→15, NET30→30, etc.)
+        TRY_CAST(REGEXP_EXTRACT(i.payment_terms, '\\d+') AS INT) as terms_days,
+        -- payment_terms_days from dates
+        DATEDIFF('day', TRY_CAST(i.invoice_date AS DATE), TRY_CAST(i.due_date AS DATE)) as payment_terms_days,
+        -- days_to_payment
+        CASE 
+            WHEN i.payment_date IS NOT NULL 
+            THEN DATEDIFF('day', TRY_CAST(i.invoice_date AS DATE), CAST(i.payment_date AS DATE))
+            ELSE NULL
+        END as days_to_payment,
+        -- days_overdue
+        CASE 
+            WHEN i.payment_status != 'paid' AND TRY_CAST(i.due_date AS DATE) < s.as_of
+            THEN DATEDIFF('day', TRY_CAST(i.due_date AS DATE), s.as_of)
+            ELSE 0
+        END as days_overdue,
+        -- is_overdue
+        CASE 
+            WHEN i.payment_status != 'paid' AND TRY_CAST(i.due_date AS DATE) < s.as_of
+            THEN true
+            ELSE false
+        END as is_overdue
\ No newline at end of file
@@ -0,0 +1,30 @@
+b.invoice_id,
+    b.vendor_id,
+    b.invoice_date,
+    b.due_date,
+    b.payment_date,
+    b.total_amount,
+    b.payment_status,
+    b.payment_terms,
+    COALESCE(b.payment_terms_days, b.terms_days) as payment_terms_days,
+    b.days_to_payment,
+    b.days_overdue,
+    b.is_overdue,
+    -- line_item_diversity: unique products per invoice (from parsed line_items_json)
+    COALESCE(lis.unique_products, 0) as line_item_diversity,
+    -- discount_rate_achieved: % of payment window saved by paying early
+    -- e.g., paid in 10 days on NET30 = 1 - (10/30) = 0.667 (saved 66.7% of window)
+    CASE 
+        WHEN b.days_to_payment IS NOT NULL AND b.terms_days > 0
+        THEN ROUND((1.0 - b.days_to_payment::FLOAT / b.terms_days::FLOAT)::NUMERIC, 3)
+        ELSE NULL
+    END as discount_rate_achieved,
+    -- reconciliation_flag: does invoice total match sum of line items?
+    CASE 
+        WHEN lis.line_items_total IS NOT NULL 
+            AND ABS(b.total_amount - lis.line_items_total) / 
+                GREATEST(ABS(b.total_amount), 0.01) > 0.1
+        THEN 'MISMATCH'
+        WHEN lis.line_items_total IS NULL THEN 'NO_REFERENCE'
+        ELSE 'OK'
+    END as reconciliation_flag
\ No newline at end of file
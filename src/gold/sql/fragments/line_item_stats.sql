@@ -0,0 +1,9 @@
+-- Unique products and line total per invoice from parsed line items
+line_item_stats AS (
+    SELECT 
+        invoice_sk,
+        COUNT(DISTINCT product_sk) as unique_products,
+        SUM(TRY_CAST(line_total AS DOUBLE)) as line_items_total
+    FROM invoice_line_items
+    GROUP BY invoice_sk
+)
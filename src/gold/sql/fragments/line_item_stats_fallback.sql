@@ -0,0 +1,17 @@
+-- Fallback without line items: approximate from per-product sales state per vendor
+line_item_stats AS (
+    SELECT 
+        i2.invoice_sk,
+        COALESCE(v_stats.unique_products, 0) as unique_products,
+        COALESCE(v_stats.expected_cost, 0) as line_items_total  
+    FROM invoices i2
+    LEFT JOIN (
+        SELECT 
+            p.vendor_sk,
+            COUNT(DISTINCT s.product_sk) as unique_products,
+            SUM(TRY_CAST(p.cost AS DOUBLE) * s.total_quantity_sold) as expected_cost
+        FROM gold_state_product_transactions s
+        JOIN products p ON s.product_sk = p.product_sk
+        GROUP BY p.vendor_sk
+    ) v_stats ON i2.vendor_sk = v_stats.vendor_sk
+)
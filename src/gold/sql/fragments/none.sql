@@ -0,0 +1 @@
+-- Nothing: substituted for a fragment whose optional table does not exist
@@ -0,0 +1,4 @@
+CAST(SUM(transactions) OVER w{days} AS BIGINT) as orders_{days}d,
+        SUM(total_amount) OVER w{days} as revenue_{days}d,
+        CAST(SUM(return_count) OVER w{days} AS BIGINT) as returns_{days}d,
+        COUNT(DISTINCT customer_sk) OVER w{days} as distinct_customers_{days}d
@@ -0,0 +1 @@
+LEFT JOIN gold_sketch_products sk ON p.product_sk = sk.product_sk
@@ -0,0 +1,4 @@
+w{days} AS (
+        PARTITION BY window_key ORDER BY activity_date
+        RANGE BETWEEN INTERVAL ({days} - 1) DAY PRECEDING AND CURRENT ROW
+    )
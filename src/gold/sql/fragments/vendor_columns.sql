@@ -0,0 +1,26 @@
+v.vendor_id,
+    v.vendor_name,
+    v.country,
+    v.region,
+    TRY_CAST(v.reliability_score AS DOUBLE) as reliability_score,
+    v.status,
+    COALESCE(p.total_products_supplied, 0) as total_products_supplied,
+    COALESCE(p.avg_product_price, 0) as avg_product_price,
+    COALESCE(p.product_quality_score, 0) as product_quality_score,
+    COALESCE(i.total_invoices, 0) as total_invoices,
+    COALESCE(i.total_invoice_amount, 0) as total_invoice_amount,
+    COALESCE(i.average_invoice_value, 0) as average_invoice_value,
+    COALESCE(tr.revenue_generated, 0) as revenue_generated,
+    COALESCE(i.total_outstanding_balance, 0) as total_outstanding_balance,
+    -- invoice_payment_rate
+    CASE 
+        WHEN COALESCE(i.total_invoices, 0) > 0 
+        THEN ROUND((COALESCE(i.paid_on_time_invoices, 0)::FLOAT / i.total_invoices)::NUMERIC, 3)
+        ELSE 0 
+    END as invoice_payment_rate,
+    -- revenue per product
+    CASE 
+        WHEN COALESCE(p.total_products_supplied, 0) > 0 
+        THEN COALESCE(tr.revenue_generated, 0) / p.total_products_supplied 
+        ELSE 0 
+    END as revenue_per_product
\ No newline at end of file
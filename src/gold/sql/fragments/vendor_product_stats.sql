@@ -0,0 +1,10 @@
+-- Catalogue stats per vendor (current product state)
+product_stats AS (
+    SELECT 
+        vendor_sk,
+        COUNT(*) as total_products_supplied,
+        AVG(TRY_CAST(price AS DOUBLE)) as avg_product_price,
+        AVG(TRY_CAST(rating AS DOUBLE)) as product_quality_score
+    FROM products
+    GROUP BY vendor_sk
+)
\ No newline at end of file
@@ -0,0 +1,3 @@
+,
+    -- Approximate features from the mergeable sketches (src/gold/sketches.py)
+    sk.* EXCLUDE (vendor_sk, customers_hll, order_values)
@@ -0,0 +1 @@
+LEFT JOIN gold_sketch_vendors sk ON v.vendor_sk = sk.vendor_sk
@@ -0,0 +1,16 @@
+-- Customer x product x day transaction aggregate. Built once per run from the
+-- transaction delta; every transaction-derived Gold state reads it instead
+-- of the raw rows.
+SELECT
+    customer_sk,
+    product_sk,
+    transaction_date,
+    COUNT(*) as transactions,
+    COUNT(*) FILTER (WHERE COALESCE(total_amount, 0) < 0) as return_count,
+    SUM(quantity) as quantity,
+    SUM(total_amount) as total_amount,
+    SUM(CASE WHEN COALESCE(total_amount, 0) >= 0 THEN total_amount ELSE 0 END) as gross_amount,
+    SUM(CASE WHEN COALESCE(total_amount, 0) < 0 THEN total_amount ELSE 0 END) as return_amount,
+    COUNT(total_amount) as amount_count
+FROM {source}
+GROUP BY customer_sk, product_sk, transaction_date
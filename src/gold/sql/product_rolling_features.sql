@@ -0,0 +1,29 @@
+-- Trailing-window sales per product as of the reference date, one set of
+-- columns per window in feature_engineering.rolling_windows. Same single
+-- sorted pass over txn_daily as customer_rolling_features.sql, partitioned
+-- by product.
+CREATE OR REPLACE TABLE product_rolling_features AS
+WITH activity AS (
+    SELECT product_sk as window_key, customer_sk,
+           TRY_CAST(transaction_date AS DATE) as activity_date,
+           transactions, return_count, total_amount, false as is_as_of
+    FROM txn_daily
+    WHERE product_sk IS NOT NULL AND TRY_CAST(transaction_date AS DATE) IS NOT NULL
+    UNION ALL
+    SELECT pr.product_sk, NULL, p.reference_date, 0, 0, 0, true
+    FROM products pr, gold_params p
+    WHERE pr.product_sk IS NOT NULL
+),
+windowed AS (
+    SELECT
+        window_key,
+        is_as_of,
+        {window_columns}
+    FROM activity
+    WINDOW {window_frames}
+)
+SELECT
+    pr.product_id,
+    w.* EXCLUDE (window_key, is_as_of)
+FROM products pr
+JOIN windowed w ON w.window_key = pr.product_sk AND w.is_as_of
@@ -0,0 +1,15 @@
+-- Per customer segment, from the segment sketches (only with sketches enabled):
+-- approximate distinct buying customers and order value quantiles
+CREATE OR REPLACE TABLE segment_features AS
+WITH segments AS (
+    SELECT segment, COUNT(*) as customer_count
+    FROM customers
+    WHERE segment IS NOT NULL
+    GROUP BY segment
+)
+SELECT
+    s.segment,
+    s.customer_count,
+    sk.* EXCLUDE (segment, customers_hll, order_values)
+FROM segments s
+LEFT JOIN gold_sketch_segments sk ON s.segment = sk.segment
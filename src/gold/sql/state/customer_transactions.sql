@@ -0,0 +1,14 @@
+-- Additive per-customer transaction state (one row per customer_sk), from txn_daily
+SELECT
+    customer_sk,
+    CAST(SUM(transactions) AS BIGINT) as total_orders,
+    CAST(SUM(return_count) AS BIGINT) as return_count,
+    SUM(total_amount) as total_revenue,
+    SUM(gross_amount) as gross_revenue,
+    SUM(return_amount) as return_amount,
+    CAST(SUM(amount_count) AS BIGINT) as amount_count,
+    MIN(transaction_date) as first_purchase,
+    MAX(transaction_date) as last_purchase
+FROM {source}
+WHERE customer_sk IS NOT NULL
+GROUP BY customer_sk
@@ -0,0 +1,6 @@
+-- Distinct (product, customer) pairs from txn_daily; unique_customers is their count per product
+SELECT DISTINCT
+    product_sk,
+    customer_sk
+FROM {source}
+WHERE product_sk IS NOT NULL AND customer_sk IS NOT NULL
@@ -0,0 +1,9 @@
+-- Additive per-product review state (one row per product_sk)
+SELECT
+    product_sk,
+    COUNT(*) as review_count,
+    SUM(TRY_CAST(rating AS FLOAT)) as rating_sum,
+    COUNT(TRY_CAST(rating AS FLOAT)) as rating_count
+FROM {source}
+WHERE product_sk IS NOT NULL
+GROUP BY product_sk
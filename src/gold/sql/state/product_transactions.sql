@@ -0,0 +1,11 @@
+-- Additive per-product sales state (one row per product_sk), from txn_daily
+SELECT
+    product_sk,
+    CAST(SUM(transactions) AS BIGINT) as times_sold,
+    SUM(quantity) as total_quantity_sold,
+    SUM(total_amount) as total_revenue,
+    MIN(transaction_date) as first_sale,
+    MAX(transaction_date) as last_sale
+FROM {source}
+WHERE product_sk IS NOT NULL
+GROUP BY product_sk
@@ -0,0 +1,4 @@
+-- The customer x product x day intermediate over the full transaction history
+-- (one row per customer_sk, product_sk, transaction_date), read by the
+-- rolling-window features
+SELECT * FROM {source}
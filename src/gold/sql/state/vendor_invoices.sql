@@ -0,0 +1,21 @@
+-- Additive per-vendor invoice state (one row per vendor_sk)
+SELECT
+    vendor_sk,
+    COUNT(*) as total_invoices,
+    SUM(TRY_CAST(total_amount AS DOUBLE)) as total_invoice_amount,
+    COUNT(TRY_CAST(total_amount AS DOUBLE)) as amount_count,
+    COUNT(CASE
+        WHEN payment_status = 'paid'
+            AND TRY_CAST(payment_date AS DATE) IS NOT NULL
+            AND TRY_CAST(due_date AS DATE) IS NOT NULL
+            AND TRY_CAST(payment_date AS DATE) <= TRY_CAST(due_date AS DATE)
+        THEN 1
+    END) as paid_on_time_invoices,
+    SUM(CASE 
+        WHEN payment_status != 'paid' 
+        THEN COALESCE(TRY_CAST(total_amount AS DOUBLE), 0) 
+        ELSE 0 
+    END) as total_outstanding_balance
+FROM {source}
+WHERE vendor_sk IS NOT NULL
+GROUP BY vendor_sk
@@ -0,0 +1,15 @@
+"""
+Serving Layer - Online lookup of Gold features by entity key.
+"""
+
+from .http import make_server
+from .redis_cache import RedisFeatureClient, RedisFeaturePublisher
+from .store import FeatureStore, SERVING_TABLES
+
+__all__ = [
+    "FeatureStore",
+    "SERVING_TABLES",
+    "make_server",
+    "RedisFeatureClient",
+    "RedisFeaturePublisher",
+]
@@ -0,0 +1,116 @@
+"""
+HTTP endpoint for the feature store (standard library only).
+
+    GET  /features/<table>?key=K1&key=K2[&features=f1,f2]
+    GET  /metrics
+    GET  /health
+    POST /reload
+
+Lookups answer ``{"version": n, "rows": [...]}`` with ``null`` for unknown
+keys. ``/reload`` swaps in a new snapshot if the Gold exports changed.
+"""
+
+import json
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+from src.serving.store import FeatureStore
+
+
+def json_default(value):
+    """JSON encoding of the non-JSON values in feature rows (decimals, dates)."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+class FeatureRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the ``store`` of its server."""
+
+    server_version = "FeatureStore/1.0"
+
+    def _send(self, status: int, body: dict) -> None:
+        payload = json.dumps(body, default=json_default).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        store: FeatureStore = self.server.store
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts == ["health"]:
+            self._send(200, {"status": "ok", "version": store.version})
+        elif parts == ["metrics"]:
+            self._send(200, store.metrics())
+        elif len(parts) == 2 and parts[0] == "features":
+            query = parse_qs(url.query)
+            keys = query.get("key", [])
+            features = [f for v in query.get("features", []) for f in v.split(",") if f]
+            if not keys:
+                self._send(400, {"error": "at least one key= parameter is required"})
+                return
+            try:
+                rows = store.get(parts[1], keys, features or None)
+            except KeyError as e:
+                self._send(404, {"error": str(e.args[0])})
+                return
+            self._send(200, {"version": store.version, "rows": rows})
+        else:
+            self._send(404, {"error": f"no route for {url.path}"})
+
+    def do_POST(self) -> None:
+        store: FeatureStore = self.server.store
+        if urlparse(self.path).path.strip("/") != "reload":
+            self._send(404, {"error": f"no route for {self.path}"})
+            return
+        reloaded = store.refresh()
+        self._send(200, {"reloaded": reloaded, "version": store.version})
+
+    def log_message(self, format: str, *args) -> None:
+        logger.bind(component="FeatureServer").debug(format % args)
+
+
+def make_server(
+    store: FeatureStore,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    refresh_interval: Optional[float] = None,
+) -> ThreadingHTTPServer:
+    """
+    Build a threaded HTTP server for ``store`` (call ``serve_forever()``).
+
+    With ``refresh_interval`` a daemon thread checks the Gold exports every
+    that many seconds and hot-swaps the store when a new run has finished.
+    """
+    server = ThreadingHTTPServer((host, port), FeatureRequestHandler)
+    server.daemon_threads = True
+    server.store = store
+    if refresh_interval:
+        def watch() -> None:
+            while not stopped.wait(refresh_interval):
+                try:
+                    store.refresh()
+                except Exception as e:
+                    logger.bind(component="FeatureServer").warning(f"Refresh failed: {e}")
+
+        stopped = threading.Event()
+        threading.Thread(target=watch, name="feature-store-refresh", daemon=True).start()
+        close = server.server_close
+
+        def server_close() -> None:
+            stopped.set()
+            close()
+
+        server.server_close = server_close
+    return server
@@ -0,0 +1,233 @@
+"""
+Redis Feature Cache.
+
+Publishes Gold feature tables to Redis (the optional cache in
+docker-compose.yml) and reads them back through a local LRU cache.
+
+Key layout under ``prefix`` (default ``features``)::
+
+    features:v<N>:<table>:<entity id>   hash {feature: JSON value}
+    features:current                    N, the version readers use
+    features:version_seq                last version number handed out
+
+A publish writes every row of every table under a new version with
+pipelined HSETs, then points ``current`` at it with a single SET, so
+readers switch from one complete Gold run to the next in one step. The
+previous version is kept for readers still using it; older ones are
+deleted.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+from loguru import logger
+
+from src.serving.http import json_default
+
+try:
+    import redis
+except ImportError:
+    redis = None  # Optional: only needed when the Redis cache is enabled
+
+
+def connect(url: str = "redis://localhost:6379/0"):
+    """Redis client for ``url`` (string responses)."""
+    if redis is None:
+        raise ImportError(
+            "redis package not installed. "
+            "Install with: pip install redis>=5.0.0"
+        )
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+class RedisFeaturePublisher:
+    """
+    Bulk-publishes feature tables to Redis under a new version.
+
+    Args:
+        client: Redis client (``decode_responses=True``)
+        prefix: Key namespace
+        batch_size: Rows per pipeline round trip
+        keep_versions: Published versions kept besides the current one
+    """
+
+    def __init__(self, client, prefix: str = "features", batch_size: int = 1000, keep_versions: int = 1):
+        self.client = client
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.keep_versions = keep_versions
+        self.logger = logger.bind(component="RedisPublisher")
+
+    def publish(self, tables: Dict[str, Tuple[str, pa.Table]]) -> int:
+        """
+        Write ``{table: (key column, rows)}`` as a new version and make it current.
+
+        Returns:
+            The published version.
+        """
+        version = int(self.client.incr(f"{self.prefix}:version_seq"))
+        for table_name, (key, table) in tables.items():
+            start = time.perf_counter()
+            self._write_table(version, table_name, key, table)
+            self.logger.info(
+                f"✓ {table_name}: {table.num_rows} rows → v{version} "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        self.client.set(f"{self.prefix}:current", version)
+        self.logger.info(f"Redis features v{version} is current")
+        self._drop_old_versions(version)
+        return version
+
+    def publish_results(self, results: dict, keys: Dict[str, str]) -> Optional[int]:
+        """
+        Publish the Arrow tables of a Gold run (``GoldProcessor(keep_arrow=True)``).
+
+        Args:
+            results: FeatureResults by table name
+            keys: Tables to publish and their entity key column
+
+        Returns:
+            The published version, or None when a table was not computed
+            this run (the current version is then left in place).
+        """
+        missing = [t for t in keys if t not in results or results[t].table is None]
+        if missing:
+            self.logger.warning(f"Redis publish skipped: no rows for {', '.join(missing)}")
+            return None
+        return self.publish({t: (key, results[t].table) for t, key in keys.items()})
+
+    def _write_table(self, version: int, table_name: str, key: str, table: pa.Table) -> None:
+        namespace = f"{self.prefix}:v{version}:{table_name}"
+        pipe = self.client.pipeline(transaction=False)
+        # One round trip per batch of batch_size rows
+        for batch in table.to_batches(max_chunksize=self.batch_size):
+            columns = batch.to_pydict()
+            for i, entity in enumerate(columns[key]):
+                pipe.hset(
+                    f"{namespace}:{entity}",
+                    mapping={
+                        name: json.dumps(values[i], default=json_default)
+                        for name, values in columns.items()
+                    },
+                )
+            pipe.execute()
+
+    def _drop_old_versions(self, current: int) -> None:
+        oldest_kept = current - self.keep_versions
+        stale = []
+        for name in self.client.scan_iter(match=f"{self.prefix}:v*", count=self.batch_size):
+            version = name[len(self.prefix) + 2:].split(":", 1)[0]
+            if version.isdigit() and int(version) < oldest_kept:
+                stale.append(name)
+        for i in range(0, len(stale), self.batch_size):
+            self.client.unlink(*stale[i:i + self.batch_size])
+        if stale:
+            self.logger.debug(f"Removed {len(stale)} keys of versions before v{oldest_kept}")
+
+
+class RedisFeatureClient:
+    """
+    Read-through feature lookups: local LRU first, then Redis.
+
+    The current version is re-read from Redis at most every
+    ``version_ttl`` seconds. Cached rows are keyed by version, so rows of
+    an older version are never served once the pointer moves.
+
+    Args:
+        client: Redis client (``decode_responses=True``)
+        prefix: Key namespace used by the publisher
+        cache_size: Rows kept in the local LRU cache
+        version_ttl: Seconds between reads of the current version
+    """
+
+    def __init__(self, client, prefix: str = "features", cache_size: int = 10_000, version_ttl: float = 1.0):
+        self.client = client
+        self.prefix = prefix
+        self.cache_size = cache_size
+        self.version_ttl = version_ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[tuple, Optional[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._version_read_at = float("-inf")
+
+    @property
+    def version(self) -> Optional[str]:
+        now = time.monotonic()
+        if now - self._version_read_at >= self.version_ttl:
+            self._version = self.client.get(f"{self.prefix}:current")
+            self._version_read_at = now
+        return self._version
+
+    def _cached(self, key: tuple):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return True, self._cache[key]
+            self.misses += 1
+            return False, None
+
+    def _store(self, key: tuple, row: Optional[dict]) -> None:
+        with self._lock:
+            self._cache[key] = row
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _decode(raw: dict) -> Optional[dict]:
+        return {name: json.loads(value) for name, value in raw.items()} if raw else None
+
+    @staticmethod
+    def _select(row: Optional[dict], feature_names: Optional[Sequence[str]]) -> Optional[dict]:
+        if row is None:
+            return None
+        # Copies, so callers cannot modify the cached row
+        return {f: row.get(f) for f in (feature_names or row)}
+
+    def get_one(
+        self, table: str, key: str, feature_names: Optional[Sequence[str]] = None
+    ) -> Optional[dict]:
+        """Features of one entity, or None if unknown (or nothing is published)."""
+        return self.get(table, [key], feature_names)[0]
+
+    def get(
+        self, table: str, keys: Sequence[str], feature_names: Optional[Sequence[str]] = None
+    ) -> List[Optional[dict]]:
+        """Features of several entities; cache misses are fetched in one pipeline."""
+        version = self.version
+        if version is None:
+            return [None] * len(keys)
+        rows: List[Optional[dict]] = [None] * len(keys)
+        missing = []
+        for i, key in enumerate(keys):
+            found, row = self._cached((version, table, key))
+            if found:
+                rows[i] = row
+            else:
+                missing.append(i)
+        if missing:
+            pipe = self.client.pipeline(transaction=False)
+            for i in missing:
+                pipe.hgetall(f"{self.prefix}:v{version}:{table}:{keys[i]}")
+            for i, raw in zip(missing, pipe.execute()):
+                rows[i] = self._decode(raw)
+                self._store((version, table, keys[i]), rows[i])
+        return [self._select(row, feature_names) for row in rows]
+
+    def metrics(self) -> dict:
+        """Cache hit/miss counts and size."""
+        lookups = self.hits + self.misses
+        return {
+            "version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "cached_rows": len(self._cache),
+        }
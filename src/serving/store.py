@@ -0,0 +1,247 @@
+"""
+Online Feature Store.
+
+Serves Gold feature rows by entity key from the ``<table>.arrow`` files the
+Gold layer exports. Each file is memory-mapped and read as an Arrow table
+without copying, so the store costs little beyond the OS page cache; the
+only Python-side structure is a ``{key: row}`` dict per table.
+
+A loaded set of tables is an immutable snapshot of one finished Gold run,
+as recorded by Gold's run marker (``src.gold.runs``). ``refresh()`` loads
+only when the marker changes, checks that the files it mapped are still
+those of that run, and swaps the new snapshot in with one reference
+assignment, so lookups running concurrently see either the old or the new
+Gold run, never a mix. Gold replaces its export files atomically, which
+keeps the maps of an older snapshot valid until it is dropped.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pyarrow as pa
+from loguru import logger
+
+from src.gold.runs import GoldRun, read_run_marker
+
+
+# Feature tables served by default and their entity key column
+SERVING_TABLES = {
+    "customer_features": "customer_id",
+    "product_features": "product_id",
+    "vendor_features": "vendor_id",
+    "invoice_features": "invoice_id",
+}
+
+
+class FeatureTable:
+    """One Gold table memory-mapped from its Arrow IPC file, indexed by key."""
+
+    def __init__(self, name: str, key: str, path: Path):
+        self.name = name
+        self.key = key
+        self.path = Path(path)
+        # Kept open for the life of the table; its buffers point into the map
+        self._source = pa.memory_map(str(self.path), "r")
+        table = pa.ipc.open_file(self._source).read_all()
+        self.table = table
+        # Single-chunk column arrays for scalar access by row number
+        self.arrays = {
+            name: column.combine_chunks() for name, column in zip(table.column_names, table.columns)
+        }
+        self.index = {k: row for row, k in enumerate(self.arrays[key].to_pylist())}
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.table.column_names
+
+    def check_features(self, feature_names: Sequence[str]) -> None:
+        unknown = [f for f in feature_names if f not in self.arrays]
+        if unknown:
+            raise KeyError(f"Unknown features for {self.name}: {unknown}")
+
+    def get_one(self, key: str, feature_names: Sequence[str]) -> Optional[dict]:
+        row = self.index.get(key)
+        if row is None:
+            return None
+        return {f: self.arrays[f][row].as_py() for f in feature_names}
+
+    def get(self, keys: Sequence[str], feature_names: Sequence[str]) -> List[Optional[dict]]:
+        rows = [self.index.get(k) for k in keys]
+        found = [r for r in rows if r is not None]
+        if not found:
+            return [None] * len(rows)
+        # Converted column by column (much cheaper than row dicts from Arrow), then zipped
+        columns = self.table.select(list(feature_names)).take(pa.array(found)).to_pydict()
+        values = iter(zip(*columns.values()))
+        return [None if r is None else dict(zip(feature_names, next(values))) for r in rows]
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """The tables of one Gold run, as loaded together."""
+    version: int
+    tables: Dict[str, FeatureTable]
+    run: GoldRun
+    loaded_at: float
+
+
+class LatencyStats:
+    """Lookup latencies over a sliding window of the most recent calls."""
+
+    def __init__(self, window: int = 10_000):
+        self._samples = deque(maxlen=window)
+        self.lookups = 0
+        self.keys = 0
+
+    def record(self, elapsed_ns: int, keys: int) -> None:
+        self._samples.append(elapsed_ns)
+        self.lookups += 1
+        self.keys += keys
+
+    def summary(self) -> dict:
+        samples = sorted(self._samples)
+        summary = {"lookups": self.lookups, "keys": self.keys, "window": len(samples)}
+        if samples:
+            for label, q in (("p50_us", 0.50), ("p95_us", 0.95), ("p99_us", 0.99)):
+                summary[label] = samples[min(len(samples) - 1, int(q * len(samples)))] / 1000
+            summary["max_us"] = samples[-1] / 1000
+        return summary
+
+
+class FeatureStore:
+    """
+    Key-indexed, hot-swappable view of the Gold feature tables.
+
+    Args:
+        gold_dir: Directory of the Gold exports (``<table>.arrow``)
+        tables: Feature tables to serve and their entity key column
+        latency_window: Number of recent lookups kept for latency metrics
+    """
+
+    def __init__(
+        self,
+        gold_dir: Path,
+        tables: Optional[Dict[str, str]] = None,
+        latency_window: int = 10_000,
+    ):
+        self.gold_dir = Path(gold_dir)
+        self.tables = dict(tables or SERVING_TABLES)
+        self.latency = LatencyStats(latency_window)
+        self.logger = logger.bind(component="FeatureStore")
+        self._reload_lock = threading.Lock()
+        self._snapshot: Optional[Snapshot] = None
+        self.load()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _run(self) -> GoldRun:
+        run = read_run_marker(self.gold_dir)
+        if run is None:
+            raise FileNotFoundError(f"No finished Gold run in {self.gold_dir} (run the Gold layer)")
+        return run
+
+    def _paths(self, run: GoldRun) -> Dict[str, Path]:
+        paths = {name: self.gold_dir / f"{name}.arrow" for name in self.tables}
+        missing = [str(p) for p in paths.values() if p.name not in run.files or not p.exists()]
+        if missing:
+            raise FileNotFoundError(
+                f"Gold Arrow exports not found: {missing} (is 'arrow' in duckdb.export_formats?)"
+            )
+        return paths
+
+    def load(self) -> int:
+        """
+        Load every table of the last finished Gold run into a new snapshot.
+
+        Raises:
+            RuntimeError: If an export was replaced since the run marker was
+                written, i.e. a newer Gold run is in progress.
+
+        Returns:
+            The version of the snapshot swapped in.
+        """
+        with self._reload_lock:
+            run = self._run()
+            paths = self._paths(run)
+            tables = {
+                name: FeatureTable(name, self.tables[name], path) for name, path in paths.items()
+            }
+            # Checked after mapping: a file replaced before it was opened shows up here
+            changed = run.changed_files(self.gold_dir, [p.name for p in paths.values()])
+            if changed:
+                raise RuntimeError(
+                    f"Gold run {run.version} exports changed while loading ({', '.join(changed)}); "
+                    "a new run is in progress"
+                )
+            version = (self._snapshot.version + 1) if self._snapshot else 1
+            self._snapshot = Snapshot(version, tables, run, time.time())
+        rows = sum(t.table.num_rows for t in tables.values())
+        self.logger.info(
+            f"Feature store v{version}: Gold run {run.version}, {len(tables)} tables, {rows} rows"
+        )
+        return version
+
+    def refresh(self) -> bool:
+        """Reload if a Gold run finished since the current snapshot was loaded."""
+        if self._run() == self._snapshot.run:
+            return False
+        try:
+            self.load()
+        except RuntimeError as e:
+            # The next finished run writes a new marker; keep serving this one
+            self.logger.warning(f"Not reloading: {e}")
+            return False
+        return True
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _table(self, snapshot: Snapshot, table: str) -> FeatureTable:
+        if table not in snapshot.tables:
+            raise KeyError(f"Unknown feature table {table}. Served: {list(snapshot.tables)}")
+        return snapshot.tables[table]
+
+    def get_one(
+        self, table: str, key: str, feature_names: Optional[Sequence[str]] = None
+    ) -> Optional[dict]:
+        """Features of one entity, or None if the key is unknown."""
+        start = time.perf_counter_ns()
+        features = self._table(self._snapshot, table)
+        feature_names = feature_names or features.feature_names
+        features.check_features(feature_names)
+        row = features.get_one(key, feature_names)
+        self.latency.record(time.perf_counter_ns() - start, 1)
+        return row
+
+    def get(
+        self, table: str, keys: Sequence[str], feature_names: Optional[Sequence[str]] = None
+    ) -> List[Optional[dict]]:
+        """Features of several entities, in key order; None for unknown keys."""
+        start = time.perf_counter_ns()
+        features = self._table(self._snapshot, table)
+        feature_names = feature_names or features.feature_names
+        features.check_features(feature_names)
+        rows = features.get(keys, feature_names)
+        self.latency.record(time.perf_counter_ns() - start, len(keys))
+        return rows
+
+    def metrics(self) -> dict:
+        """Snapshot version, table sizes and lookup latency percentiles."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "loaded_at": snapshot.loaded_at,
+            "tables": {name: t.table.num_rows for name, t in snapshot.tables.items()},
+            "latency": self.latency.summary(),
+        }
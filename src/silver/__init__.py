@@ -2,11 +2,13 @@
 Silver Layer - Data Cleaning and Validation with Polars + Pydantic.
 """
 
+from .circuit_breaker import QuarantineRateExceeded
 from .cleaner import SilverCleaner
 from .processor import SilverProcessor
 from .schemas import get_pydantic_schema
 
 __all__ = [
+    "QuarantineRateExceeded",
     "SilverCleaner",
     "SilverProcessor",
     "get_pydantic_schema",
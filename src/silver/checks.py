@@ -0,0 +1,114 @@
+"""
+Cross-Field Consistency Checks.
+
+Declarative arithmetic rules from schemas.yaml, evaluated as vectorized
+Polars expressions over the whole frame:
+
+    checks:
+      - name: line_extension
+        expr: "abs(quantity * unit_price)"
+        equals: "abs(subtotal)"
+        tolerance: 0.01            # absolute, default 0.01
+        relative_tolerance: 0.0    # fraction of |equals|, default 0
+        action: flag               # flag (default) | quarantine
+
+``expr`` and ``equals`` are SQL expressions (``pl.sql_expr``). Referenced
+columns are cast to Float64 before evaluation; rows where any operand is
+null are not considered violations.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import polars as pl
+from loguru import logger
+
+
+CHECK_ACTIONS = ("flag", "quarantine")
+
+
+@dataclass
+class ConsistencyCheck:
+    """A single cross-field rule: ``expr`` must equal ``equals`` within tolerance."""
+    name: str
+    expr: str
+    equals: str
+    tolerance: float = 0.01
+    relative_tolerance: float = 0.0
+    action: str = "flag"
+
+    @classmethod
+    def from_config(cls, spec: Dict[str, Any]) -> "ConsistencyCheck":
+        """
+        Build a check from its schemas.yaml definition.
+
+        Raises:
+            ValueError: If required keys are missing or the action is unknown.
+        """
+        missing = [k for k in ("name", "expr", "equals") if not spec.get(k)]
+        if missing:
+            raise ValueError(f"Consistency check missing {missing}: {spec}")
+        action = spec.get("action", "flag")
+        if action not in CHECK_ACTIONS:
+            raise ValueError(
+                f"Invalid action '{action}' for check '{spec['name']}'. "
+                f"Expected one of {CHECK_ACTIONS}"
+            )
+        return cls(
+            name=spec["name"],
+            expr=str(spec["expr"]),
+            equals=str(spec["equals"]),
+            tolerance=float(spec.get("tolerance", 0.01)),
+            relative_tolerance=float(spec.get("relative_tolerance", 0.0)),
+            action=action,
+        )
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns referenced by both sides of the rule."""
+        names = pl.sql_expr(self.expr).meta.root_names()
+        names += pl.sql_expr(self.equals).meta.root_names()
+        return sorted(set(names))
+
+    def violation_expr(self) -> pl.Expr:
+        """Boolean expression, True where the rule is violated."""
+        lhs = pl.sql_expr(self.expr)
+        rhs = pl.sql_expr(self.equals)
+        allowed = pl.max_horizontal(
+            pl.lit(self.tolerance),
+            rhs.abs() * self.relative_tolerance,
+        )
+        return ((lhs - rhs).abs() > allowed).fill_null(False).alias(self.name)
+
+
+def parse_checks(schema_def: Dict[str, Any]) -> List[ConsistencyCheck]:
+    """Parse the ``checks`` list of a schema definition."""
+    return [ConsistencyCheck.from_config(spec) for spec in schema_def.get("checks", [])]
+
+
+def evaluate_checks(df: pl.DataFrame, checks: List[ConsistencyCheck]) -> pl.DataFrame:
+    """
+    Evaluate all checks in one pass over ``df``.
+
+    Returns:
+        DataFrame with one boolean column per applicable check (same row
+        order as ``df``). Checks referencing absent columns are skipped.
+    """
+    applicable = []
+    for check in checks:
+        missing = [c for c in check.columns if c not in df.columns]
+        if missing:
+            logger.warning(f"Skipping check '{check.name}': missing columns {missing}")
+            continue
+        applicable.append(check)
+
+    if not applicable:
+        return pl.DataFrame()
+
+    referenced = sorted({c for check in applicable for c in check.columns})
+    return (
+        df.lazy()
+        .select([pl.col(c).cast(pl.Float64, strict=False) for c in referenced])
+        .select([check.violation_expr() for check in applicable])
+        .collect()
+    )
@@ -0,0 +1,75 @@
+"""
+Quarantine-Rate Circuit Breaker.
+
+Stops a corrupted feed from being fully validated, quarantined and pushed
+through Gold and the graph load. Two checkpoints per source, both against
+``validation.max_quarantine_rate`` in pipeline_config.yaml:
+
+- ``preflight``  a seeded random sample of the Bronze rows is cleaned and
+  validated before the full pass
+- ``running``    quarantined rows are counted during the full pass; the
+  breaker trips as soon as the count alone guarantees the final rate is
+  over the limit, so errors clustered at the top of a file cannot trip it
+  early by accident
+
+Sources (or samples) with fewer than ``min_rows`` rows are never judged.
+What happens on a breach is set by ``on_breach``:
+
+- ``warn``  log and keep going (default)
+- ``skip``  abort the source, keep its previous Silver output and skip the
+  sources, Gold tables and graph load that depend on it
+- ``fail``  raise QuarantineRateExceeded and stop the pipeline
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+BREACH_ACTIONS = ("warn", "skip", "fail")
+
+
+class QuarantineRateExceeded(RuntimeError):
+    """Raised when a source breaches the quarantine rate with ``on_breach: fail``."""
+
+
+@dataclass
+class CircuitBreaker:
+    """Quarantine-rate monitor for one pass over ``total_rows`` rows."""
+    max_rate: float
+    total_rows: int
+    min_rows: int = 50
+    checkpoint: str = "running"
+    tripped: bool = False
+    rows_seen: int = 0
+    quarantined: int = 0
+
+    @property
+    def min_rate(self) -> float:
+        """Lowest possible final quarantine rate given the counts so far."""
+        if self.total_rows == 0:
+            return 0.0
+        return self.quarantined / self.total_rows
+
+    def check(self, rows_seen: int, quarantined: int) -> bool:
+        """
+        Update the counts after ``rows_seen`` rows.
+
+        Returns:
+            True once more than ``max_rate`` of all rows are known to be
+            quarantined (and the pass has at least ``min_rows`` rows).
+        """
+        self.rows_seen = rows_seen
+        self.quarantined = quarantined
+        if not self.tripped and self.total_rows >= self.min_rows:
+            self.tripped = self.min_rate > self.max_rate
+        return self.tripped
+
+    def describe(self) -> Optional[str]:
+        """Human-readable breach summary, or None if not tripped."""
+        if not self.tripped:
+            return None
+        progress = f" after {self.rows_seen}" if self.rows_seen < self.total_rows else ""
+        return (
+            f"{self.checkpoint}: {self.quarantined} of {self.total_rows} rows quarantined"
+            f"{progress} ({self.min_rate:.1%}+ > {self.max_rate:.1%})"
+        )
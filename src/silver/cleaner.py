@@ -3,26 +3,50 @@ Silver Layer Cleaner.
 
 Applies cleaning rules from config to standardize data using Polars
 vectorized column operations for high-throughput batch processing.
+
+Each rule definition in cleaning_rules.yaml is compiled once into a Polars
+expression (cached per rule and column), so new rules of an existing type
+can be added in YAML without touching Python and still run natively.
 """
 
-from typing import Dict, Any
-from datetime import datetime
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from dateutil import parser as date_parser
 
 import polars as pl
 from loguru import logger
 
 
+# Defaults used when a rule omits its configuration keys
+DEFAULT_TRUE_VALUES = ["true", "yes", "1", "y"]
+DEFAULT_FALSE_VALUES = ["false", "no", "0", "n"]
+DEFAULT_PHONE_REMOVE_CHARS = "()- .+"
+
+
+@dataclass
+class RuleProfile:
+    """Exact effect and cost of one cleaning rule applied to one column."""
+    rule: str
+    field: str
+    cells_changed: int = 0
+    seconds: float = 0.0
+
+
 class SilverCleaner:
     """
     Applies cleaning rules to standardize data via Polars vectorized expressions.
 
     Supports:
-    - Date normalization (ISO format)
-    - Boolean normalization
+    - Date normalization (ISO format, configurable ``input_formats``)
+    - Boolean normalization (configurable ``true_values`` / ``false_values``,
+      matched case-insensitively)
     - Case normalization (lower / upper / title)
-    - Phone normalization (strip formatting characters)
+    - Phone normalization (strip configurable ``remove_chars``; a space
+      strips any whitespace)
     - String trimming / whitespace normalization
+    - Regex replacement (``pattern`` / ``replacement``)
     """
 
     def __init__(self, cleaning_rules: Dict[str, Any]):
@@ -34,6 +58,16 @@ class SilverCleaner:
         """
         self.rules = cleaning_rules.get("cleaners", {})
         self.logger = logger.bind(component="SilverCleaner")
+        self._compilers: Dict[str, Callable[[str, Dict[str, Any]], Optional[pl.Expr]]] = {
+            "case": self._compile_case,
+            "phone": self._compile_phone,
+            "boolean": self._compile_boolean,
+            "date": self._compile_date,
+            "string": self._compile_string,
+            "regex": self._compile_regex,
+        }
+        # Compiled expressions keyed by (rule_name, column)
+        self._compiled: Dict[Tuple[str, str], Optional[pl.Expr]] = {}
 
     # ------------------------------------------------------------------
     # Public interface
@@ -55,134 +89,187 @@ class SilverCleaner:
             rule_name: Key in ``self.rules`` (e.g. "lowercase", "date_iso").
 
         Returns:
-            Tuple of (transformed DataFrame, whether the column was changed).
+            Tuple of (transformed DataFrame, whether the rule was applied).
         """
-        rule = self.rules.get(rule_name)
-        if not rule:
-            self.logger.warning(f"Unknown cleaning rule '{rule_name}' for {field_name}")
-            return df, False
+        df, profile = self.apply_rule(df, field_name, rule_name)
+        return df, profile is not None
 
-        rule_type = rule.get("type")
+    def apply_rule(
+        self,
+        df: pl.DataFrame,
+        field_name: str,
+        rule_name: str,
+    ) -> tuple[pl.DataFrame, Optional[RuleProfile]]:
+        """
+        Apply a compiled cleaning rule and profile it.
+
+        The number of changed cells is computed vectorized by comparing the
+        string form of the column before and after the rule (null-aware).
+
+        Returns:
+            Tuple of (transformed DataFrame, RuleProfile or None if the rule
+            was not applicable to the column).
+        """
+        if field_name not in df.columns:
+            return df, None
+        if df[field_name].dtype not in (pl.String, pl.Utf8):
+            return df, None
+
+        start = time.perf_counter()
+        expr = self.compile_rule(rule_name, field_name)
+        if expr is None:
+            return df, None
 
         try:
-            if rule_type == "case":
-                return self._clean_column_case(df, field_name, rule)
-            elif rule_type == "phone":
-                return self._clean_column_phone(df, field_name, rule)
-            elif rule_type == "boolean":
-                return self._clean_column_boolean(df, field_name, rule)
-            elif rule_type == "date":
-                return self._clean_column_date(df, field_name, rule)
-            elif rule_type == "string":
-                return self._clean_column_string(df, field_name, rule)
-            else:
-                self.logger.warning(
-                    f"Unsupported rule type '{rule_type}' for {field_name}"
-                )
-                return df, False
+            before = df[field_name]
+            df = df.with_columns(expr.alias(field_name))
+            after = df[field_name]
+            changed = before.ne_missing(after.cast(pl.String)).sum()
         except Exception as e:
             self.logger.warning(
                 f"Cleaning column {field_name} with {rule_name} failed: {e}"
             )
-            return df, False
+            return df, None
+
+        return df, RuleProfile(
+            rule=rule_name,
+            field=field_name,
+            cells_changed=int(changed),
+            seconds=time.perf_counter() - start,
+        )
+
+    def compile_rule(self, rule_name: str, column: str) -> Optional[pl.Expr]:
+        """
+        Compile a rule definition into a Polars expression over ``column``.
+
+        Compiled expressions are cached, so each (rule, column) pair is built
+        once per cleaner instance.
+        """
+        key = (rule_name, column)
+        if key in self._compiled:
+            return self._compiled[key]
+
+        rule = self.rules.get(rule_name)
+        if not rule:
+            self.logger.warning(f"Unknown cleaning rule '{rule_name}' for {column}")
+            expr = None
+        else:
+            compiler = self._compilers.get(rule.get("type"))
+            if compiler is None:
+                self.logger.warning(
+                    f"Unsupported rule type '{rule.get('type')}' for {column}"
+                )
+                expr = None
+            else:
+                expr = compiler(column, rule)
+
+        self._compiled[key] = expr
+        return expr
 
     # ------------------------------------------------------------------
-    # Internal helpers (one per rule type)
+    # Rule compilers (one per rule type)
     # ------------------------------------------------------------------
 
-    def _clean_column_case(
-        self, df: pl.DataFrame, col: str, rule: Dict[str, Any],
-    ) -> tuple[pl.DataFrame, bool]:
-        if df[col].dtype not in (pl.String, pl.Utf8):
-            return df, False
+    def _compile_case(self, col: str, rule: Dict[str, Any]) -> Optional[pl.Expr]:
         case = rule.get("case", "lower")
         if case == "lower":
-            df = df.with_columns(pl.col(col).str.to_lowercase().alias(col))
-        elif case == "upper":
-            df = df.with_columns(pl.col(col).str.to_uppercase().alias(col))
-        elif case == "title":
-            df = df.with_columns(pl.col(col).str.to_titlecase().alias(col))
-        else:
-            return df, False
-        return df, True
+            return pl.col(col).str.to_lowercase()
+        if case == "upper":
+            return pl.col(col).str.to_uppercase()
+        if case == "title":
+            return pl.col(col).str.to_titlecase()
+        return None
 
-    def _clean_column_phone(
-        self, df: pl.DataFrame, col: str, rule: Dict[str, Any],
-    ) -> tuple[pl.DataFrame, bool]:
-        if df[col].dtype not in (pl.String, pl.Utf8):
-            return df, False
-        df = df.with_columns(
-            pl.col(col)
-            .str.replace_all(r"[\(\)\-\s\.+]", "")
-            .alias(col)
-        )
-        return df, True
+    def _compile_phone(self, col: str, rule: Dict[str, Any]) -> Optional[pl.Expr]:
+        remove_chars = rule.get("remove_chars", DEFAULT_PHONE_REMOVE_CHARS)
+        if not remove_chars:
+            return None
+        pattern = "[" + "".join(r"\s" if c.isspace() else re.escape(c) for c in remove_chars) + "]"
+        return pl.col(col).str.replace_all(pattern, "")
 
-    def _clean_column_boolean(
-        self, df: pl.DataFrame, col: str, rule: Dict[str, Any],
-    ) -> tuple[pl.DataFrame, bool]:
-        if df[col].dtype not in (pl.String, pl.Utf8):
-            return df, False
-        df = df.with_columns(
-            pl.when(
-                pl.col(col).str.to_lowercase().is_in(
-                    ["true", "yes", "1", "y"]
-                )
-            )
+    def _compile_boolean(self, col: str, rule: Dict[str, Any]) -> Optional[pl.Expr]:
+        true_values = self._as_strings(rule.get("true_values", DEFAULT_TRUE_VALUES), lower=True)
+        false_values = self._as_strings(rule.get("false_values", DEFAULT_FALSE_VALUES), lower=True)
+        value = pl.col(col).str.strip_chars().str.to_lowercase()
+        return (
+            pl.when(value.is_in(true_values))
             .then(pl.lit(True))
-            .when(
-                pl.col(col).str.to_lowercase().is_in(
-                    ["false", "no", "0", "n"]
-                )
-            )
+            .when(value.is_in(false_values))
             .then(pl.lit(False))
-            .otherwise(pl.lit(None))
-            .alias(col)
+            .otherwise(pl.lit(None, dtype=pl.Boolean))
         )
-        return df, True
 
-    def _clean_column_date(
-        self, df: pl.DataFrame, col: str, rule: Dict[str, Any],
-    ) -> tuple[pl.DataFrame, bool]:
-        if df[col].dtype not in (pl.String, pl.Utf8):
-            return df, False
-
-        def _normalize_date(val):
-            if val is None or val == "":
-                return val
-            try:
-                if str(val).replace(".", "", 1).isdigit():
-                    ts = float(val)
-                    if 0 <= ts <= 4102444800:
-                        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-            except (ValueError, TypeError):
-                pass
-            try:
-                parsed = date_parser.parse(str(val), dayfirst=False, fuzzy=False)
-                return parsed.strftime("%Y-%m-%d")
-            except (ValueError, TypeError, OverflowError):
-                return val
-
-        df = df.with_columns(
-            pl.col(col)
-            .map_elements(_normalize_date, return_dtype=pl.String)
-            .alias(col)
+    def _compile_date(self, col: str, rule: Dict[str, Any]) -> Optional[pl.Expr]:
+        output_format = rule.get("output_format", "%Y-%m-%d")
+        input_formats: List[str] = rule.get("input_formats", [])
+
+        # Native parsing: configured formats first, then unix epoch seconds
+        candidates = [
+            pl.col(col).str.strptime(pl.Datetime, fmt, strict=False)
+            for fmt in input_formats
+        ]
+        epoch = pl.col(col).cast(pl.Float64, strict=False)
+        candidates.append(
+            pl.when((epoch >= 0) & (epoch <= 4102444800))
+            .then(pl.from_epoch((epoch * 1000).cast(pl.Int64), time_unit="ms"))
         )
-        return df, True
+        native = pl.coalesce(candidates).dt.strftime(output_format)
 
-    def _clean_column_string(
-        self, df: pl.DataFrame, col: str, rule: Dict[str, Any],
-    ) -> tuple[pl.DataFrame, bool]:
-        if df[col].dtype not in (pl.String, pl.Utf8):
-            return df, False
+        # Only values no native format understood fall back to dateutil,
+        # and each distinct leftover value is parsed once.
+        def _fallback(s: pl.Series) -> pl.Series:
+            leftovers = s.filter(s.is_not_null() & (s != "")).unique()
+            mapping = {
+                v: self._parse_date_fallback(v, output_format)
+                for v in leftovers.to_list()
+            }
+            return s.replace_strict(mapping, default=s, return_dtype=pl.String)
+
+        fallback = (
+            pl.when(native.is_null())
+            .then(pl.col(col))
+            .map_batches(_fallback, return_dtype=pl.String)
+        )
+        return pl.coalesce([native, fallback])
+
+    def _compile_string(self, col: str, rule: Dict[str, Any]) -> Optional[pl.Expr]:
         operations = rule.get("operations", [])
-        changed = False
+        expr = pl.col(col)
+        applied = False
         if "trim" in operations:
-            df = df.with_columns(pl.col(col).str.strip_chars().alias(col))
-            changed = True
+            expr = expr.str.strip_chars()
+            applied = True
         if "normalize_whitespace" in operations:
-            df = df.with_columns(
-                pl.col(col).str.replace_all(r"\s+", " ").alias(col)
-            )
-            changed = True
-        return df, changed
+            expr = expr.str.replace_all(r"\s+", " ")
+            applied = True
+        return expr if applied else None
+
+    def _compile_regex(self, col: str, rule: Dict[str, Any]) -> Optional[pl.Expr]:
+        pattern = rule.get("pattern")
+        if not pattern:
+            return None
+        return pl.col(col).str.replace_all(pattern, rule.get("replacement", ""))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _as_strings(values: List[Any], lower: bool = False) -> List[str]:
+        """Render YAML scalars the way they appear in Bronze CSV columns."""
+        rendered = []
+        for v in values:
+            if isinstance(v, bool):
+                rendered.append("true" if v else "false")
+            else:
+                rendered.append(str(v).lower() if lower else str(v))
+        return sorted(set(rendered))
+
+    @staticmethod
+    def _parse_date_fallback(val: str, output_format: str) -> str:
+        """Slow-path date parsing for values no configured format matched."""
+        try:
+            parsed = date_parser.parse(str(val), dayfirst=False, fuzzy=False)
+            return parsed.strftime(output_format)
+        except (ValueError, TypeError, OverflowError):
+            return val
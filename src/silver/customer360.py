@@ -0,0 +1,164 @@
+"""
+Clustered Silver Tables and the Customer-360 Lookup.
+
+Fact tables that declare ``cluster_by`` in schemas.yaml are written sorted
+by those columns in small Parquet row groups. For every column listed in
+``index`` a sidecar ``silver/_index/<source>__<column>.parquet`` maps each
+key to the row runs that hold it:
+
+    key | row_group | offset | length
+
+``offset`` is relative to the row group, so a lookup reads only the row
+groups that contain the key and slices them; nothing else is scanned.
+Clustering on the first ``cluster_by`` column makes each key a single run.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import polars as pl
+import pyarrow.parquet as pq
+from loguru import logger
+
+
+INDEX_DIR = "_index"
+DEFAULT_ROW_GROUP_SIZE = 512
+
+
+def index_path(silver_dir: Path, source_name: str, column: str) -> Path:
+    """Location of the sidecar index of ``source_name`` on ``column``."""
+    return Path(silver_dir) / INDEX_DIR / f"{source_name}__{column}.parquet"
+
+
+def write_clustered_parquet(
+    df: pl.DataFrame,
+    path: Path,
+    cluster_by: List[str],
+    index_columns: List[str],
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> pl.DataFrame:
+    """
+    Sort ``df`` by ``cluster_by``, write it to ``path`` and build sidecar indexes.
+
+    Returns:
+        The sorted DataFrame (the row order now stored on disk).
+    """
+    path = Path(path)
+    sort_columns = [c for c in cluster_by if c in df.columns]
+    if sort_columns:
+        df = df.sort(sort_columns, nulls_last=True, maintain_order=True)
+    df.write_parquet(path, row_group_size=row_group_size)
+
+    # Row-group boundaries as actually written
+    metadata = pq.ParquetFile(path).metadata
+    sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    starts = pl.Series("start", [sum(sizes[:i]) for i in range(len(sizes))], dtype=pl.Int64)
+    groups = pl.DataFrame({
+        "row_group": pl.Series(range(len(sizes)), dtype=pl.Int32),
+        "start": starts,
+    })
+
+    source_name = path.stem
+    for column in index_columns:
+        if column not in df.columns:
+            continue
+        key = pl.col(column).cast(pl.String)
+        runs = (
+            df.select(key.alias("key"))
+            .with_row_index("row", offset=0)
+            .with_columns(pl.col("row").cast(pl.Int64))
+            .join_asof(groups, left_on="row", right_on="start", strategy="backward")
+            .filter(pl.col("key").is_not_null())
+            .with_columns(
+                ((pl.col("key") != pl.col("key").shift())
+                 | (pl.col("row_group") != pl.col("row_group").shift())
+                 | (pl.col("row") != pl.col("row").shift() + 1))
+                .fill_null(True)
+                .cum_sum()
+                .alias("run")
+            )
+            .group_by("run")
+            .agg(
+                pl.col("key").first(),
+                pl.col("row_group").first(),
+                (pl.col("row").min() - pl.col("start").first()).cast(pl.Int32).alias("offset"),
+                pl.len().cast(pl.Int32).alias("length"),
+            )
+            .drop("run")
+            .sort("key", "row_group", "offset")
+        )
+        target = index_path(path.parent, source_name, column)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        runs.write_parquet(target)
+    return df
+
+
+class ClusteredTable:
+    """Reads key slices of one clustered Silver Parquet table via its index."""
+
+    def __init__(self, silver_dir: Path, source_name: str, column: str):
+        self.source_name = source_name
+        self.column = column
+        self.index = pl.read_parquet(index_path(silver_dir, source_name, column))
+        self.file = pq.ParquetFile(
+            Path(silver_dir) / f"{source_name}.parquet", memory_map=True
+        )
+
+    def lookup(self, key: str) -> pl.DataFrame:
+        """
+        Rows whose ``column`` equals ``key``, reading only matching row groups.
+
+        Each indexed run holds only ``key``, so the slices need no filtering.
+        """
+        runs = self.index.filter(pl.col("key") == key)
+        slices = []
+        for row_group, group_runs in runs.group_by("row_group", maintain_order=True):
+            table = self.file.read_row_group(int(row_group[0]), use_threads=False)
+            for offset, length in group_runs.select("offset", "length").iter_rows():
+                slices.append(table.slice(offset, length))
+        if not slices:
+            return pl.from_arrow(self.file.schema_arrow.empty_table())
+        return pl.concat([pl.from_arrow(s) for s in slices], how="vertical_relaxed")
+
+
+class Customer360:
+    """
+    "Everything about customer X" from the clustered Silver tables.
+
+    Every Silver table with a ``customer_id`` index takes part (customers,
+    transactions, reviews, support tickets, call transcripts). Invoices are
+    vendor-side documents with no customer reference, so they are not part
+    of the view.
+    """
+
+    def __init__(self, silver_dir: Union[str, Path], key_column: str = "customer_id"):
+        self.silver_dir = Path(silver_dir)
+        self.key_column = key_column
+        self.logger = logger.bind(component="Customer360")
+        self.tables: Dict[str, ClusteredTable] = {}
+        for path in sorted((self.silver_dir / INDEX_DIR).glob(f"*__{key_column}.parquet")):
+            source_name = path.stem[: -len(f"__{key_column}")]
+            if (self.silver_dir / f"{source_name}.parquet").exists():
+                self.tables[source_name] = ClusteredTable(self.silver_dir, source_name, key_column)
+        if not self.tables:
+            self.logger.warning(f"No Silver tables indexed on {key_column} in {self.silver_dir}")
+
+    def lookup(self, key: str) -> Dict[str, pl.DataFrame]:
+        """Return one DataFrame per indexed source (possibly empty)."""
+        return {name: table.lookup(key) for name, table in self.tables.items()}
+
+
+def customer_360(
+    customer_id: str,
+    silver_dir: Union[str, Path] = Path("outputs/processed/silver"),
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Convenience lookup returning plain records per source.
+
+    For repeated lookups keep a ``Customer360`` instance instead, so the
+    indexes and Parquet footers are only read once.
+    """
+    return {
+        name: rows.to_dicts()
+        for name, rows in Customer360(silver_dir).lookup(customer_id).items()
+    }
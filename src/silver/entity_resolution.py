@@ -0,0 +1,289 @@
+"""
+Customer Entity Resolution.
+
+Finds customer records that describe the same person even though their
+``customer_id`` differs. To avoid comparing all pairs, candidates are only
+generated inside blocks that share a blocking key:
+
+- ``email``        lower-cased, trimmed email
+- ``phone``        phone digits (last 10, so a leading country code is ignored)
+- ``name_postal``  normalized full name + postal code
+
+Blocks larger than ``max_block_size`` are skipped (placeholder values such
+as a shared support mailbox), which bounds the candidate pairs to roughly
+``n * max_block_size``. Pairs are scored with vectorized Polars expressions
+(name bigram Jaccard similarity, exact email / phone / postal agreement)
+and matched pairs are clustered with label propagation.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import polars as pl
+from loguru import logger
+
+
+BLOCKING_KEYS = ("email", "phone", "name_postal")
+
+DEFAULT_WEIGHTS = {
+    "full_name": 0.4,
+    "email": 0.3,
+    "phone": 0.2,
+    "address_postal_code": 0.1,
+}
+
+
+@dataclass
+class MatchResult:
+    """Outcome of an entity-resolution run."""
+    mapping: pl.DataFrame
+    candidate_pairs: int = 0
+    matched_pairs: int = 0
+    skipped_blocks: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def merged_records(self) -> int:
+        """Records mapped onto a different canonical customer."""
+        return self.mapping.filter(
+            pl.col("customer_id") != pl.col("canonical_customer_id")
+        ).height
+
+
+class CustomerMatcher:
+    """
+    Blocked, vectorized duplicate detection for Silver customers.
+
+    Configured from the ``entity_resolution`` block of the customer schema
+    in schemas.yaml (``blocking``, ``weights``, ``threshold``,
+    ``max_block_size``, ``min_evidence``). A pair is only scored when the
+    fields present on both records carry at least ``min_evidence`` weight,
+    so sparse records cannot chain unrelated customers together.
+    """
+
+    def __init__(self, config: Dict[str, Any], id_column: str = "customer_id"):
+        self.id_column = id_column
+        self.blocking: List[str] = list(config.get("blocking", BLOCKING_KEYS))
+        unknown = [k for k in self.blocking if k not in BLOCKING_KEYS]
+        if unknown:
+            raise ValueError(
+                f"Unknown blocking key(s) {unknown}. Expected {list(BLOCKING_KEYS)}"
+            )
+        self.weights: Dict[str, float] = dict(config.get("weights", DEFAULT_WEIGHTS))
+        self.threshold = float(config.get("threshold", 0.8))
+        self.max_block_size = int(config.get("max_block_size", 50))
+        self.min_evidence = float(config.get("min_evidence", 0.6))
+        self.logger = logger.bind(component="CustomerMatcher")
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+
+    def match(self, customers: pl.DataFrame) -> MatchResult:
+        """
+        Resolve duplicate customers.
+
+        Args:
+            customers: Silver customers (must contain the id column).
+
+        Returns:
+            MatchResult whose ``mapping`` has one row per customer:
+            (customer_id, canonical_customer_id, match_score, match_rule).
+            Unmatched customers map onto themselves with a null score.
+        """
+        prepared = self._prepare(customers)
+        pairs, skipped = self._candidate_pairs(prepared)
+        scored = self._score_pairs(prepared, pairs)
+        matched = scored.filter(pl.col("score") >= self.threshold)
+        mapping = self._cluster(prepared.select("id"), matched)
+
+        result = MatchResult(
+            mapping=mapping,
+            candidate_pairs=len(pairs),
+            matched_pairs=len(matched),
+            skipped_blocks=skipped,
+        )
+        self.logger.info(
+            f"{result.candidate_pairs} candidate pairs, {result.matched_pairs} matched, "
+            f"{result.merged_records} customers merged"
+        )
+        return result
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _prepare(self, customers: pl.DataFrame) -> pl.DataFrame:
+        """Normalize comparison fields and precompute name bigram sets."""
+        def text(col: str) -> pl.Expr:
+            if col not in customers.columns:
+                return pl.lit(None, dtype=pl.String)
+            value = pl.col(col).cast(pl.String).str.strip_chars()
+            return pl.when(value != "").then(value)
+
+        name = (
+            text("full_name").str.to_lowercase()
+            .str.replace_all(r"[^a-z0-9 ]", "")
+            .str.replace_all(r"\s+", " ")
+        )
+        phone = text("phone").str.replace_all(r"\D", "")
+        prepared = customers.select(
+            pl.col(self.id_column).cast(pl.String).alias("id"),
+            name.alias("name"),
+            text("email").str.to_lowercase().alias("email"),
+            pl.when(phone.str.len_chars() >= 7).then(phone.str.slice(-10)).alias("phone"),
+            text("address_postal_code").str.to_uppercase()
+            .str.replace_all(r"\s", "").alias("postal"),
+        ).unique(subset="id", keep="first")
+
+        # Character bigrams of the padded name, once per customer
+        bigrams = (
+            prepared.select("id", (pl.lit(" ") + pl.col("name") + pl.lit(" ")).alias("padded"))
+            .filter(pl.col("padded").is_not_null())
+            .with_columns(pl.int_ranges(0, pl.col("padded").str.len_chars() - 1).alias("pos"))
+            .explode("pos")
+            .select("id", pl.col("padded").str.slice(pl.col("pos"), 2).alias("bigram"))
+            .group_by("id")
+            .agg(pl.col("bigram").unique())
+        )
+        return prepared.join(bigrams, on="id", how="left")
+
+    def _blocking_expr(self, key: str) -> pl.Expr:
+        if key == "email":
+            return pl.col("email")
+        if key == "phone":
+            return pl.col("phone")
+        return pl.when(pl.col("postal").is_not_null()).then(
+            pl.concat_str([pl.col("name"), pl.col("postal")], separator="|")
+        )
+
+    def _candidate_pairs(self, prepared: pl.DataFrame) -> tuple[pl.DataFrame, Dict[str, int]]:
+        """Self-join each block on its key; returns unique (id_l, id_r, rule) pairs."""
+        frames = []
+        skipped: Dict[str, int] = {}
+        for key in self.blocking:
+            blocked = (
+                prepared.select("id", self._blocking_expr(key).alias("block"))
+                .filter(pl.col("block").is_not_null())
+                .with_columns(pl.len().over("block").alias("block_size"))
+            )
+            oversized = blocked.filter(pl.col("block_size") > self.max_block_size)
+            if len(oversized):
+                skipped[key] = oversized["block"].n_unique()
+                self.logger.warning(
+                    f"Skipped {skipped[key]} {key} blocks larger than {self.max_block_size}"
+                )
+            blocked = blocked.filter(
+                (pl.col("block_size") > 1) & (pl.col("block_size") <= self.max_block_size)
+            ).select("id", "block")
+            pairs = (
+                blocked.join(blocked, on="block", suffix="_r")
+                .filter(pl.col("id") < pl.col("id_r"))
+                .select(
+                    pl.col("id").alias("id_l"),
+                    "id_r",
+                    pl.lit(key).alias("rule"),
+                )
+            )
+            frames.append(pairs)
+
+        if not frames:
+            empty = pl.DataFrame(schema={"id_l": pl.String, "id_r": pl.String, "rule": pl.String})
+            return empty, skipped
+
+        pairs = (
+            pl.concat(frames)
+            .group_by("id_l", "id_r")
+            .agg(pl.col("rule").unique().sort().str.join("+"))
+            .sort("id_l", "id_r")
+        )
+        return pairs, skipped
+
+    def _score_pairs(self, prepared: pl.DataFrame, pairs: pl.DataFrame) -> pl.DataFrame:
+        """Weighted similarity over the fields both records have."""
+        right = prepared.rename({c: f"{c}_r" for c in prepared.columns})
+        joined = (
+            pairs
+            .join(prepared.rename({"id": "id_l"}), on="id_l", how="left")
+            .join(right, on="id_r", how="left")
+        )
+
+        def exact(col: str) -> pl.Expr:
+            return (pl.col(col) == pl.col(f"{col}_r")).cast(pl.Float64)
+
+        name_sim = (
+            pl.col("bigram").list.set_intersection("bigram_r").list.len()
+            / pl.col("bigram").list.set_union("bigram_r").list.len()
+        )
+        components = {
+            "full_name": name_sim,
+            "email": exact("email"),
+            "phone": exact("phone"),
+            "address_postal_code": exact("postal"),
+        }
+        weighted = [
+            (components[f] * w, pl.when(components[f].is_not_null()).then(pl.lit(w)))
+            for f, w in self.weights.items() if f in components and w > 0
+        ]
+        total = pl.sum_horizontal([s for s, _ in weighted])
+        available = pl.sum_horizontal([w for _, w in weighted])
+        return joined.select(
+            "id_l",
+            "id_r",
+            "rule",
+            pl.when(available >= self.min_evidence)
+            .then(total / available)
+            .otherwise(0.0)
+            .alias("score"),
+        )
+
+    def _cluster(self, ids: pl.DataFrame, matched: pl.DataFrame) -> pl.DataFrame:
+        """
+        Connected components by min-label propagation.
+
+        Each customer's label converges to the smallest id in its component,
+        which becomes the canonical customer.
+        """
+        edges = pl.concat([
+            matched.select(pl.col("id_l").alias("src"), pl.col("id_r").alias("dst")),
+            matched.select(pl.col("id_r").alias("src"), pl.col("id_l").alias("dst")),
+        ])
+        labels = ids.with_columns(pl.col("id").alias("label"))
+
+        while True:
+            proposed = (
+                edges.join(labels, left_on="dst", right_on="id")
+                .group_by("src")
+                .agg(pl.col("label").min().alias("neighbour"))
+            )
+            updated = (
+                labels.join(proposed, left_on="id", right_on="src", how="left")
+                .select("id", pl.min_horizontal("label", "neighbour").alias("label"))
+            )
+            changed = updated.join(labels, on="id", suffix="_old").filter(
+                pl.col("label") != pl.col("label_old")
+            )
+            labels = updated
+            if changed.is_empty():
+                break
+
+        # Best-scoring edge per non-canonical record explains the match
+        best = (
+            pl.concat([
+                matched.select(pl.col("id_l").alias("id"), "score", "rule"),
+                matched.select(pl.col("id_r").alias("id"), "score", "rule"),
+            ])
+            .sort("score", descending=True)
+            .unique(subset="id", keep="first")
+        )
+        return (
+            labels.join(best, on="id", how="left")
+            .select(
+                pl.col("id").alias("customer_id"),
+                pl.col("label").alias("canonical_customer_id"),
+                pl.when(pl.col("id") != pl.col("label")).then(pl.col("score").round(4))
+                .alias("match_score"),
+                pl.when(pl.col("id") != pl.col("label")).then(pl.col("rule"))
+                .alias("match_rule"),
+            )
+            .sort("customer_id")
+        )
@@ -16,8 +16,25 @@ import yaml
 from pydantic import ValidationError
 from loguru import logger
 
-from .cleaner import SilverCleaner
+from .checks import evaluate_checks, parse_checks
+from .circuit_breaker import CircuitBreaker, QuarantineRateExceeded
+from .cleaner import SilverCleaner, RuleProfile
+from .customer360 import DEFAULT_ROW_GROUP_SIZE, write_clustered_parquet
+from .entity_resolution import CustomerMatcher
+from .quarantine import QuarantineCollector, QuarantinePolicy
 from .schemas import get_pydantic_schema
+from .surrogate_keys import KeyDictionary, surrogate_column
+from ..utils.config import ValidationConfig
+
+
+# Storage dtypes selectable per field via ``dtype:`` in schemas.yaml
+SILVER_DTYPES: Dict[str, pl.DataType] = {
+    "categorical": pl.Categorical,
+    "int8": pl.Int8,
+    "int16": pl.Int16,
+    "int32": pl.Int32,
+    "float32": pl.Float32,
+}
 
 
 @dataclass
@@ -30,7 +47,13 @@ class ProcessingResult:
     duplicates_removed: int = 0
     orphaned_records: int = 0
     fields_cleaned: Dict[str, int] = field(default_factory=dict)
+    rule_profiles: List[RuleProfile] = field(default_factory=list)
     error_counts: Dict[str, int] = field(default_factory=dict)
+    check_violations: Dict[str, int] = field(default_factory=dict)
+    memory_bytes_before: int = 0
+    memory_bytes_after: int = 0
+    breach: Optional[str] = None
+    skipped: bool = False
     
     @property
     def pass_rate(self) -> float:
@@ -48,8 +71,14 @@ class SilverProcessor:
     2. Apply Polars-based cleaning (case, phone, boolean normalization)
     3. Deduplicate on primary key
     4. Validate referential integrity (foreign keys)
-    5. Validate each row with Pydantic schemas
-    6. Write valid records to Silver, quarantine invalid
+    5. Evaluate cross-field consistency checks (flag or quarantine)
+    6. Validate each row with Pydantic schemas
+    7. Apply the schema dtype policy and write valid records to Silver
+       (CSV + Parquet), quarantine invalid
+    
+    Steps 2-6 run on a sampled pre-flight pass first, and the quarantine
+    rate is tracked while validating; a source over
+    ``validation.max_quarantine_rate`` is handled per ``on_breach``.
     """
     
     def __init__(
@@ -59,6 +88,7 @@ class SilverProcessor:
         cleaning_rules: Dict[str, Any],
         bronze_dir: Path,
         output_dir: Path,
+        validation: Optional[ValidationConfig] = None,
     ):
         self.sources = sources_config.get("sources", {})
         self.schemas_config = schemas_config.get("schemas", {})
@@ -68,17 +98,32 @@ class SilverProcessor:
         self.quarantine_dir = Path(output_dir).parent / "quarantine"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+        self.validation = validation or ValidationConfig()
         self.logger = logger.bind(component="SilverProcessor")
         
         # Cache of valid primary keys per entity for referential integrity
         self._valid_keys: Dict[str, Set[str]] = {}
+        # Persistent natural key → surrogate dictionaries, one per entity
+        self._key_dictionaries: Dict[str, KeyDictionary] = {}
     
-    def process_all(self) -> Dict[str, ProcessingResult]:
+    def process_all(
+        self,
+        sources: Optional[List[str]] = None,
+        revalidate_children: bool = False,
+    ) -> Dict[str, ProcessingResult]:
         """
         Process all sources from Bronze to Silver.
         
         Processing order matters for referential integrity:
         vendors → products → customers → transactions → invoices → reviews → tickets → calls
+        
+        Args:
+            sources: Optional subset of source names to process. FK parents
+                are resolved through schemas.yaml: their persisted Silver key
+                sets are reused when fresh, and they are reprocessed only when
+                missing or stale.
+            revalidate_children: Also reprocess sources whose foreign keys
+                point (directly or transitively) at the selected sources.
         """
         self.logger.info("=" * 60)
         self.logger.info("SILVER LAYER: Cleaning and validating (Polars + Pydantic)")
@@ -86,6 +131,10 @@ class SilverProcessor:
         
         # Process in dependency order so FK lookups work
         ordered_sources = self._get_processing_order()
+        if sources is not None:
+            selected = self._resolve_source_scope(sources, revalidate_children)
+            ordered_sources = [s for s in ordered_sources if s in selected]
+            self.logger.info(f"Source scope: {', '.join(ordered_sources)}")
         
         results = {}
         
@@ -94,8 +143,27 @@ class SilverProcessor:
                 continue
             config = self.sources[source_name]
             schema_name = config.get("schema", source_name)
+            
+            # FK lookups against a skipped parent would be meaningless
+            skipped_parents = sorted(
+                p for p in self._parent_sources(source_name)
+                if p in results and results[p].skipped
+            )
+            if skipped_parents:
+                results[source_name] = ProcessingResult(
+                    source_name=source_name,
+                    breach=f"parent {', '.join(skipped_parents)} skipped",
+                    skipped=True,
+                )
+                self.logger.warning(
+                    f"⊘ {source_name}: skipped, depends on {', '.join(skipped_parents)}"
+                )
+                continue
+            
             result = self._process_source(source_name, schema_name)
             results[source_name] = result
+            if result.skipped:
+                continue
             
             status = "✓" if result.valid_records > 0 else "✗"
             extras = []
@@ -110,9 +178,7 @@ class SilverProcessor:
                 f"valid ({result.pass_rate:.1%}){extra_str}"
             )
         
-        # Post-processing: parse line_items_json from invoices
-        if "invoices" in results and results["invoices"].valid_records > 0:
-            self._parse_invoice_line_items()
+        self._run_post_processing(results)
         
         # Summary
         total_valid = sum(r.valid_records for r in results.values())
@@ -120,14 +186,187 @@ class SilverProcessor:
         total_deduped = sum(r.duplicates_removed for r in results.values())
         total_orphaned = sum(r.orphaned_records for r in results.values())
         total_cleaned = sum(sum(r.fields_cleaned.values()) for r in results.values())
+        cleaning_seconds = sum(
+            p.seconds for r in results.values() for p in r.rule_profiles
+        )
+        skipped = [name for name, r in results.items() if r.skipped]
         
         self.logger.info(
             f"Silver complete: {total_valid} valid, {total_quarantined} quarantined, "
-            f"{total_deduped} deduped, {total_orphaned} orphaned, {total_cleaned} fields cleaned"
+            f"{total_deduped} deduped, {total_orphaned} orphaned, "
+            f"{total_cleaned} cells cleaned in {cleaning_seconds:.3f}s"
         )
+        if skipped:
+            self.logger.warning(f"Skipped by circuit breaker: {', '.join(skipped)}")
         
         return results
     
+    def replay_quarantine(self, sources: List[str]) -> Dict[str, ProcessingResult]:
+        """
+        Re-validate only the quarantined rows of ``sources`` under the current rules.
+
+        Each stored quarantine record goes through the same cleaning and
+        validation as a Bronze row. Rows that now pass are merged into the
+        Silver table by primary key (replacing any row with the same key);
+        the quarantine store is rewritten with the rows that still fail.
+        Bronze is not read. Sources with a ``sample:N`` or ``counts_only``
+        policy only have their stored records replayed.
+
+        Raises:
+            ValueError: If a source is unknown or an FK parent has no Silver output.
+        """
+        unknown = [s for s in sources if s not in self.sources]
+        if unknown:
+            raise ValueError(
+                f"Unknown source(s): {unknown}. Available: {list(self.sources)}"
+            )
+
+        self.logger.info("=" * 60)
+        self.logger.info("SILVER LAYER: Replaying quarantined records")
+        self.logger.info("=" * 60)
+
+        results = {}
+        for source_name in [s for s in self._get_processing_order() if s in sources]:
+            result = self._replay_source(source_name, self._schema_for_source(source_name))
+            results[source_name] = result
+            self.logger.info(
+                f"↻ {source_name}: {result.valid_records}/{result.total_records} "
+                f"quarantined records rescued, {result.quarantined_records} remain"
+            )
+
+        self._run_post_processing(results)
+        return results
+
+    def _replay_source(self, source_name: str, schema_name: str) -> ProcessingResult:
+        """Replay one source's quarantine store and merge rescued rows into Silver."""
+        result = ProcessingResult(source_name=source_name)
+        quarantine_path = self.quarantine_dir / f"{source_name}_quarantine.json"
+        if not quarantine_path.exists():
+            self.logger.info(f"No quarantine store for {source_name}, nothing to replay")
+            return result
+
+        with open(quarantine_path) as f:
+            entries = json.load(f)
+        if not entries:
+            return result
+
+        # FK parents must come from Silver as it is now, not from Bronze
+        for parent in sorted(self._parent_sources(source_name)):
+            parent_schema = self._schema_for_source(parent)
+            if parent_schema not in self._valid_keys and not self._load_silver_keys(parent):
+                raise ValueError(
+                    f"Cannot replay {source_name}: parent {parent} has no Silver output"
+                )
+
+        records = [entry["record"] for entry in entries]
+        df = self._restore_bronze_types(
+            source_name,
+            pl.DataFrame(records, schema={c: pl.String for c in records[0]}),
+        )
+        result.total_records = len(df)
+
+        # No dedup here: it would drop null-key entries for good and shift the
+        # positions used to map quarantined rows back to their entries
+        valid_df, quarantine = self._validate_frame(
+            source_name, schema_name, df, result, deduplicate=False
+        )
+
+        primary_key = self.schemas_config.get(schema_name, {}).get("primary_key")
+        if valid_df is not None:
+            if primary_key and primary_key in valid_df.columns:
+                before = len(valid_df)
+                valid_df = valid_df.unique(subset=[primary_key], keep="first", maintain_order=True)
+                result.duplicates_removed = before - len(valid_df)
+            merged = self._merge_into_silver(source_name, primary_key, valid_df)
+            merged = self._write_silver(source_name, schema_name, merged, result)
+            self._cache_valid_keys(schema_name, primary_key, merged)
+
+        # Row indices keep pointing at the original Bronze rows
+        remaining = quarantine.records
+        for record in remaining:
+            record["row_index"] = entries[record["row_index"]].get("row_index")
+        self._save_quarantine(source_name, remaining)
+        return result
+
+    def _restore_bronze_types(self, source_name: str, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Cast stringified quarantine records back to the Bronze column types.
+
+        Columns whose values no longer fit (e.g. dates already rewritten by
+        cleaning) stay strings, which Pydantic coerces as usual.
+        """
+        bronze_path = self.bronze_dir / f"{source_name}.csv"
+        if not bronze_path.exists():
+            return df
+        bronze_schema = pl.scan_csv(bronze_path, infer_schema_length=None).collect_schema()
+        for col, dtype in bronze_schema.items():
+            if col not in df.columns or dtype == pl.String:
+                continue
+            try:
+                df = df.with_columns(pl.col(col).cast(dtype))
+            except pl.exceptions.InvalidOperationError:
+                self.logger.debug(f"Replaying {source_name}.{col} as strings")
+        return df
+
+    def _load_silver_keys(self, source_name: str) -> bool:
+        """Cache primary keys from the current Silver output, stale or not."""
+        schema_name = self._schema_for_source(source_name)
+        primary_key = self.schemas_config.get(schema_name, {}).get("primary_key")
+        silver_path = self.output_dir / f"{source_name}.csv"
+        if not primary_key or not silver_path.exists():
+            return False
+        keys = pl.read_csv(silver_path, columns=[primary_key], infer_schema_length=0)
+        self._cache_valid_keys(schema_name, primary_key, keys)
+        return True
+
+    def _merge_into_silver(
+        self,
+        source_name: str,
+        primary_key: Optional[str],
+        rescued: pl.DataFrame,
+    ) -> pl.DataFrame:
+        """Upsert ``rescued`` rows into the existing Silver table by primary key."""
+        parquet_path = self.output_dir / f"{source_name}.parquet"
+        csv_path = self.output_dir / f"{source_name}.csv"
+        if parquet_path.exists():
+            existing = pl.read_parquet(parquet_path)
+        elif csv_path.exists():
+            existing = pl.read_csv(csv_path, infer_schema_length=None)
+        else:
+            return rescued
+
+        # Storage dtypes, surrogates and decoded JSON columns are re-derived
+        # when the table is written, so go back to the plain Silver types
+        existing = existing.with_columns(
+            pl.col(pl.Categorical, pl.Enum).cast(pl.String)
+        ).drop([c for c in existing.columns if c.endswith("_sk")])
+        for col, dtype in existing.schema.items():
+            if dtype.is_nested():
+                existing = existing.with_columns(pl.Series(col, [
+                    json.dumps(v) if v is not None else None for v in existing[col].to_list()
+                ], dtype=pl.String))
+        if primary_key and primary_key in existing.columns and primary_key in rescued.columns:
+            existing = existing.filter(
+                ~pl.col(primary_key).cast(pl.String).is_in(
+                    rescued[primary_key].cast(pl.String).implode()
+                )
+            )
+        return pl.concat([existing, rescued], how="diagonal_relaxed")
+
+    def _run_post_processing(self, results: Dict[str, ProcessingResult]) -> None:
+        """Rebuild tables derived from sources that produced valid rows."""
+        # Post-processing: resolve duplicate customer identities
+        if "customers" in results and results["customers"].valid_records > 0:
+            self._resolve_customer_entities()
+        
+        # Post-processing: parse line_items_json from invoices
+        if "invoices" in results and results["invoices"].valid_records > 0:
+            self._parse_invoice_line_items()
+        
+        # Post-processing: explode call transcript utterances
+        if "call_transcripts" in results and results["call_transcripts"].valid_records > 0:
+            self._build_call_utterances()
+
     def _get_processing_order(self) -> List[str]:
         """Return sources in dependency order for FK validation."""
         return [
@@ -141,12 +380,121 @@ class SilverProcessor:
             "call_transcripts", # FK: customer_id, ticket_id
         ]
     
+    # ------------------------------------------------------------------
+    # Source scoping (FK dependency closure)
+    # ------------------------------------------------------------------
+
+    def _schema_for_source(self, source_name: str) -> str:
+        """Return the schema name a source is validated against."""
+        return self.sources.get(source_name, {}).get("schema", source_name)
+
+    def _source_for_schema(self, schema_name: str) -> Optional[str]:
+        """Return the source that produces a schema, if any."""
+        for source_name in self.sources:
+            if self._schema_for_source(source_name) == schema_name:
+                return source_name
+        return None
+
+    def _parent_sources(self, source_name: str) -> Set[str]:
+        """Sources referenced by this source's foreign keys in schemas.yaml."""
+        fields = self.schemas_config.get(
+            self._schema_for_source(source_name), {}
+        ).get("fields", {})
+        parents = set()
+        for field_def in fields.values():
+            target = field_def.get("foreign_key")
+            parent = self._source_for_schema(target) if target else None
+            if parent and parent != source_name:
+                parents.add(parent)
+        return parents
+
+    def _child_sources(self, source_name: str) -> Set[str]:
+        """Sources whose foreign keys reference this source."""
+        return {
+            name for name in self.sources
+            if source_name in self._parent_sources(name)
+        }
+
+    def _resolve_source_scope(
+        self,
+        sources: List[str],
+        revalidate_children: bool = False,
+    ) -> Set[str]:
+        """
+        Expand a requested source subset into the set that must be processed.
+
+        Children are added transitively when ``revalidate_children`` is set.
+        Parents are walked transitively; a parent whose Silver output is
+        present and not older than its Bronze input only contributes its
+        persisted key set, otherwise it is reprocessed as well.
+        """
+        unknown = [s for s in sources if s not in self.sources]
+        if unknown:
+            raise ValueError(
+                f"Unknown source(s): {unknown}. Available: {list(self.sources)}"
+            )
+
+        selected = set(sources)
+        if revalidate_children:
+            pending = list(selected)
+            while pending:
+                for child in self._child_sources(pending.pop()):
+                    if child not in selected:
+                        selected.add(child)
+                        pending.append(child)
+
+        visited: Set[str] = set()
+        pending = list(selected)
+        while pending:
+            for parent in self._parent_sources(pending.pop()):
+                if parent in selected or parent in visited:
+                    continue
+                visited.add(parent)
+                if self._load_persisted_keys(parent):
+                    continue
+                self.logger.info(f"Parent {parent} missing or stale in Silver, reprocessing")
+                selected.add(parent)
+                pending.append(parent)
+
+        return selected
+
+    def _is_silver_stale(self, source_name: str) -> bool:
+        """True if the Silver output is missing or older than its Bronze input."""
+        silver_path = self.output_dir / f"{source_name}.csv"
+        bronze_path = self.bronze_dir / f"{source_name}.csv"
+        if not silver_path.exists():
+            return True
+        if bronze_path.exists():
+            return bronze_path.stat().st_mtime > silver_path.stat().st_mtime
+        return False
+
+    def _load_persisted_keys(self, source_name: str) -> bool:
+        """
+        Cache primary keys from an existing Silver output for FK checks.
+
+        Returns:
+            True if a fresh Silver key set was loaded, False otherwise.
+        """
+        schema_name = self._schema_for_source(source_name)
+        primary_key = self.schemas_config.get(schema_name, {}).get("primary_key")
+        if not primary_key or self._is_silver_stale(source_name):
+            return False
+
+        lf = pl.scan_csv(self.output_dir / f"{source_name}.csv", infer_schema_length=0)
+        if primary_key not in lf.collect_schema().names():
+            return False
+        self._cache_valid_keys(schema_name, primary_key, lf.select(primary_key).collect())
+        self.logger.info(
+            f"Reused {len(self._valid_keys[schema_name])} persisted keys for {schema_name}"
+        )
+        return True
+
     def _process_source(
         self,
         source_name: str,
         schema_name: str,
     ) -> ProcessingResult:
-        """Process a single source: clean → dedup → FK check → validate."""
+        """Process a single source: clean → dedup → FK check → checks → validate."""
         result = ProcessingResult(source_name=source_name)
         
         # Read Bronze CSV
@@ -157,20 +505,80 @@ class SilverProcessor:
         
         df = pl.read_csv(bronze_path, infer_schema_length=None)
         result.total_records = len(df)
+        primary_key = self.schemas_config.get(schema_name, {}).get("primary_key")
+        
+        # Circuit breaker: sampled pre-flight pass, then the running rate
+        preflight = self._preflight(source_name, schema_name, df)
+        if preflight.tripped and self._handle_breach(result, preflight):
+            return result
+        
+        breaker = CircuitBreaker(
+            max_rate=self.validation.max_quarantine_rate,
+            total_rows=len(df),
+            min_rows=self.validation.min_rows,
+        )
+        valid_df, quarantine = self._validate_frame(
+            source_name, schema_name, df, result, breaker=breaker
+        )
+        if breaker.tripped and self._handle_breach(result, breaker):
+            return result
+        
+        # Write valid records
+        if valid_df is not None:
+            valid_df = self._write_silver(source_name, schema_name, valid_df, result)
+            # Cache valid primary keys for FK lookups by downstream sources
+            self._cache_valid_keys(schema_name, primary_key, valid_df)
+        
+        # Write quarantine (kept records only; exact counts are in error_counts)
+        if quarantine.total:
+            self._save_quarantine(source_name, quarantine.records)
+            if quarantine.policy.mode != "full":
+                self.logger.debug(
+                    f"{source_name}: kept {len(quarantine.records)}/{quarantine.total} "
+                    f"quarantined records ({quarantine.policy.mode})"
+                )
         
+        return result
+    
+    def _validate_frame(
+        self,
+        source_name: str,
+        schema_name: str,
+        df: pl.DataFrame,
+        result: ProcessingResult,
+        breaker: Optional[CircuitBreaker] = None,
+        deduplicate: bool = True,
+    ) -> tuple[Optional[pl.DataFrame], QuarantineCollector]:
+        """
+        Run cleaning, dedup, FK, consistency and Pydantic checks on ``df``.
+
+        Shared by Bronze processing, the pre-flight sample and quarantine
+        replay. Counters are accumulated on ``result``. When ``breaker``
+        trips and ``on_breach`` is not ``warn``, validation stops early.
+        With ``deduplicate`` off, quarantined ``row_index`` values stay
+        positions in ``df``.
+
+        Returns:
+            (valid rows or None if no row passed, collector of quarantined rows)
+        """
         # Get schema definition
         schema_def = self.schemas_config.get(schema_name, {})
         fields = schema_def.get("fields", {})
         primary_key = schema_def.get("primary_key")
+        quarantine = QuarantineCollector(
+            QuarantinePolicy.parse(self.sources.get(source_name, {}).get("quarantine")),
+            seed=source_name,
+        )
         
         # Step 1: Apply Polars-based cleaning
-        df, cleaning_stats = self._apply_cleaning(df, fields)
-        result.fields_cleaned = cleaning_stats
+        df, profiles = self._apply_cleaning(df, fields)
+        result.rule_profiles = profiles
+        result.fields_cleaned = {p.field: p.cells_changed for p in profiles}
         
         # Step 2: Deduplicate on primary key
-        if primary_key and primary_key in df.columns:
+        if deduplicate and primary_key and primary_key in df.columns:
             before = len(df)
-            df = df.unique(subset=[primary_key], keep="first")
+            df = df.unique(subset=[primary_key], keep="first", maintain_order=True)
             result.duplicates_removed = before - len(df)
         
         # Step 3: Validate referential integrity
@@ -203,42 +611,64 @@ class SilverProcessor:
         
         result.orphaned_records = len(orphan_indices)
         
-        # Step 4: Validate with Pydantic
+        # Step 4: Cross-field consistency checks (one vectorized pass)
+        check_errors, check_flags = self._evaluate_consistency(df, schema_def, result)
+        
+        # Step 5: Validate with Pydantic
         try:
             pydantic_schema = get_pydantic_schema(schema_name)
         except ValueError:
             self.logger.warning(f"No Pydantic schema for {schema_name}, skipping validation")
-            df.write_csv(self.output_dir / f"{source_name}.csv")
             result.valid_records = len(df)
-            self._cache_valid_keys(schema_name, primary_key, df)
-            return result
+            return df, quarantine
         
         valid_records = []
-        quarantined_records = []
+        stop_on_breach = self.validation.on_breach != "warn"
         
         for row_idx, row in enumerate(df.iter_rows(named=True)):
+            if breaker is not None and breaker.check(row_idx, result.quarantined_records):
+                if stop_on_breach:
+                    break
+            
             # Check FK violations first
             if row_idx in orphan_indices:
                 result.quarantined_records += 1
                 result.error_counts["referential_integrity"] = (
                     result.error_counts.get("referential_integrity", 0) + 1
                 )
-                quarantined_records.append({
+                quarantine.add("referential_integrity", lambda: {
                     "row_index": row_idx,
                     "record": {k: str(v) if v is not None else None for k, v in row.items()},
                     "errors": fk_errors.get(row_idx, []),
                 })
                 continue
             
+            if row_idx in check_errors:
+                result.quarantined_records += 1
+                result.error_counts["consistency"] = (
+                    result.error_counts.get("consistency", 0) + 1
+                )
+                quarantine.add("consistency", lambda: {
+                    "row_index": row_idx,
+                    "record": {k: str(v) if v is not None else None for k, v in row.items()},
+                    "errors": check_errors[row_idx],
+                })
+                continue
+            
             try:
                 validated = pydantic_schema.model_validate(row)
-                valid_records.append(validated.model_dump())
+                record = validated.model_dump()
+                if check_flags is not None:
+                    record["consistency_flags"] = check_flags[row_idx] or None
+                valid_records.append(record)
             except ValidationError as e:
                 result.quarantined_records += 1
-                for err in e.errors():
+                errors = e.errors()
+                for err in errors:
                     err_type = err.get("type", "unknown")
                     result.error_counts[err_type] = result.error_counts.get(err_type, 0) + 1
-                quarantined_records.append({
+                first_type = errors[0].get("type", "unknown") if errors else "unknown"
+                quarantine.add(first_type, lambda: {
                     "row_index": row_idx,
                     "record": {k: str(v) if v is not None else None for k, v in row.items()},
                     "errors": [
@@ -247,25 +677,223 @@ class SilverProcessor:
                             "type": err["type"],
                             "msg": err["msg"],
                         }
-                        for err in e.errors()
+                        for err in errors
                     ],
                 })
         
-        result.valid_records = len(valid_records)
+        if breaker is not None and not (breaker.tripped and stop_on_breach):
+            breaker.check(len(df), result.quarantined_records)
         
-        # Write valid records
-        if valid_records:
-            valid_df = pl.DataFrame(valid_records)
-            valid_df.write_csv(self.output_dir / f"{source_name}.csv")
-            # Cache valid primary keys for FK lookups by downstream sources
-            self._cache_valid_keys(schema_name, primary_key, valid_df)
+        result.valid_records = len(valid_records)
+        if not valid_records:
+            return None, quarantine
+        return pl.DataFrame(valid_records, infer_schema_length=None), quarantine
+    
+    def _preflight(
+        self,
+        source_name: str,
+        schema_name: str,
+        df: pl.DataFrame,
+    ) -> CircuitBreaker:
+        """Validate a seeded random sample of ``df`` without writing anything."""
+        size = min(self.validation.preflight_sample, len(df))
+        breaker = CircuitBreaker(
+            max_rate=self.validation.max_quarantine_rate,
+            total_rows=size,
+            min_rows=self.validation.min_rows,
+            checkpoint="preflight",
+        )
+        if size < self.validation.min_rows:
+            return breaker
         
-        # Write quarantine
-        if quarantined_records:
-            self._save_quarantine(source_name, quarantined_records)
+        sample = df.sample(n=size, seed=0)
+        probe = ProcessingResult(source_name=source_name)
+        self._validate_frame(source_name, schema_name, sample, probe)
+        breaker.check(size, probe.quarantined_records)
+        return breaker
+    
+    def _handle_breach(self, result: ProcessingResult, breaker: CircuitBreaker) -> bool:
+        """
+        Apply ``validation.on_breach`` to a tripped breaker.
+
+        Returns:
+            True if the source is aborted (its previous Silver output and
+            quarantine store are left untouched).
+
+        Raises:
+            QuarantineRateExceeded: If ``on_breach`` is ``fail``.
+        """
+        result.breach = breaker.describe()
+        message = f"{result.source_name}: quarantine rate breached ({result.breach})"
+        if self.validation.on_breach == "fail":
+            raise QuarantineRateExceeded(message)
+        if self.validation.on_breach == "warn":
+            self.logger.warning(message)
+            return False
         
-        return result
+        result.skipped = True
+        result.valid_records = 0
+        self.logger.error(f"⊘ {message}, source skipped")
+        return True
     
+    def _write_silver(
+        self,
+        source_name: str,
+        schema_name: str,
+        df: pl.DataFrame,
+        result: ProcessingResult,
+    ) -> pl.DataFrame:
+        """
+        Add surrogate keys, apply the dtype policy and write the Silver table
+        as CSV and Parquet (clustered by ``cluster_by`` when configured).
+
+        The Parquet copy keeps the compact dtypes (CSV cannot); the in-memory
+        footprint before and after the policy is recorded on ``result``.
+        """
+        df = self._add_surrogate_keys(df, self._key_columns(schema_name))
+        result.memory_bytes_before = int(df.estimated_size())
+        df = self._apply_dtypes(df, self.schemas_config.get(schema_name, {}).get("fields", {}))
+        result.memory_bytes_after = int(df.estimated_size())
+
+        df = self._write_parquet(source_name, schema_name, df)
+        df.write_csv(self.output_dir / f"{source_name}.csv")
+        return df
+
+    def _write_parquet(self, source_name: str, schema_name: str, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Write the Parquet copy; clustered and indexed if the schema says so.
+
+        Returns:
+            ``df`` in the row order stored on disk.
+        """
+        schema_def = self.schemas_config.get(schema_name, {})
+        cluster_by = schema_def.get("cluster_by", [])
+        index_columns = schema_def.get("index", [])
+        path = self.output_dir / f"{source_name}.parquet"
+        if not cluster_by and not index_columns:
+            df.write_parquet(path)
+            return df
+        return write_clustered_parquet(
+            df, path, cluster_by, index_columns,
+            row_group_size=schema_def.get("row_group_size", DEFAULT_ROW_GROUP_SIZE),
+        )
+
+    def _key_columns(self, schema_name: str) -> Dict[str, str]:
+        """Natural key columns of a schema mapped to the entity they identify."""
+        schema_def = self.schemas_config.get(schema_name, {})
+        columns = {}
+        primary_key = schema_def.get("primary_key")
+        if primary_key:
+            columns[primary_key] = schema_name
+        for field_name, field_def in schema_def.get("fields", {}).items():
+            if field_def.get("foreign_key"):
+                columns[field_name] = field_def["foreign_key"]
+        return columns
+
+    def _add_surrogate_keys(
+        self,
+        df: pl.DataFrame,
+        key_columns: Dict[str, str],
+    ) -> pl.DataFrame:
+        """
+        Append an Int32 ``<name>_sk`` column for each natural key column.
+
+        Foreign keys are encoded with the referenced entity's dictionary, so
+        ``transactions.customer_sk`` joins ``customers.customer_sk``.
+        """
+        encoded = []
+        for column, entity in key_columns.items():
+            if column not in df.columns:
+                continue
+            if entity not in self._key_dictionaries:
+                self._key_dictionaries[entity] = KeyDictionary(
+                    self.output_dir / "_keys", entity
+                )
+            dictionary = self._key_dictionaries[entity]
+            encoded.append(dictionary.encode(df[column]).alias(surrogate_column(column)))
+            dictionary.save()
+        return df.with_columns(encoded) if encoded else df
+
+    def _apply_dtypes(self, df: pl.DataFrame, fields: Dict[str, Any]) -> pl.DataFrame:
+        """
+        Cast fields to the ``dtype`` declared in schemas.yaml.
+
+        ``enum`` uses the field's ``categories`` list. A cast that would lose
+        values (out of range, unknown category) is skipped with a warning.
+        """
+        casts = []
+        for field_name, field_def in fields.items():
+            dtype_name = field_def.get("dtype")
+            if not dtype_name or field_name not in df.columns:
+                continue
+            if dtype_name == "enum":
+                target = pl.Enum(field_def.get("categories", []))
+            elif dtype_name in SILVER_DTYPES:
+                target = SILVER_DTYPES[dtype_name]
+            else:
+                self.logger.warning(f"Unknown dtype '{dtype_name}' for {field_name}")
+                continue
+            try:
+                df[field_name].cast(target, strict=True)
+            except (pl.exceptions.InvalidOperationError, pl.exceptions.ComputeError) as e:
+                self.logger.warning(f"Keeping {field_name} as {df[field_name].dtype}: {e}")
+                continue
+            casts.append(pl.col(field_name).cast(target))
+        return df.with_columns(casts) if casts else df
+
+    def _evaluate_consistency(
+        self,
+        df: pl.DataFrame,
+        schema_def: Dict[str, Any],
+        result: ProcessingResult,
+    ) -> tuple[Dict[int, List[Dict]], Optional[List[Optional[str]]]]:
+        """
+        Evaluate the schema's cross-field checks over the whole frame.
+
+        Returns:
+            Tuple of (errors per row index for ``quarantine`` checks,
+            comma-separated failing ``flag`` check names per row or None if
+            the schema has no flag checks).
+        """
+        checks = parse_checks(schema_def)
+        if not checks:
+            return {}, None
+
+        violations = evaluate_checks(df, checks)
+        by_name = {check.name: check for check in checks}
+        check_errors: Dict[int, List[Dict]] = {}
+        flag_columns = []
+
+        for name in violations.columns:
+            check = by_name[name]
+            count = int(violations[name].sum())
+            result.check_violations[name] = count
+            if check.action == "flag":
+                flag_columns.append(name)
+                continue
+            indices = violations.with_row_index().filter(pl.col(name))["index"]
+            for idx in indices.to_list():
+                check_errors.setdefault(idx, []).append({
+                    "field": name,
+                    "type": "consistency",
+                    "msg": (
+                        f"{check.expr} != {check.equals} "
+                        f"(tolerance {check.tolerance}, relative {check.relative_tolerance})"
+                    ),
+                })
+
+        if not flag_columns:
+            return check_errors, None
+
+        flags = violations.select(
+            pl.concat_str(
+                [pl.when(pl.col(n)).then(pl.lit(n)) for n in flag_columns],
+                separator=",",
+                ignore_nulls=True,
+            )
+        ).to_series()
+        return check_errors, flags.to_list()
+
     def _cache_valid_keys(
         self,
         schema_name: str,
@@ -282,9 +910,14 @@ class SilverProcessor:
         self,
         df: pl.DataFrame,
         fields: Dict[str, Any],
-    ) -> tuple[pl.DataFrame, Dict[str, int]]:
-        """Apply cleaning transformations via SilverCleaner (Polars vectorized)."""
-        stats = {}
+    ) -> tuple[pl.DataFrame, List[RuleProfile]]:
+        """
+        Apply cleaning transformations via SilverCleaner (Polars vectorized).
+
+        Returns one RuleProfile per applied rule with the exact number of
+        changed cells and the time spent.
+        """
+        profiles = []
 
         for field_name, field_def in fields.items():
             if field_name not in df.columns:
@@ -294,23 +927,50 @@ class SilverProcessor:
             if not rule_name:
                 continue
 
-            df, changed = self.cleaner.clean_column(df, field_name, rule_name)
-            if changed:
-                stats[field_name] = stats.get(field_name, 0) + 1
+            df, profile = self.cleaner.apply_rule(df, field_name, rule_name)
+            if profile is not None:
+                profiles.append(profile)
 
-        return df, stats
+        return df, profiles
     
     def _save_quarantine(
         self,
         source_name: str,
         records: List[Dict[str, Any]],
     ) -> None:
-        """Save quarantined records to JSON."""
+        """Save quarantined records to JSON (removes the file if none are kept)."""
         output_path = self.quarantine_dir / f"{source_name}_quarantine.json"
+        if not records:
+            output_path.unlink(missing_ok=True)
+            return
         with open(output_path, 'w') as f:
             json.dump(records, f, indent=2, default=str)
         self.logger.debug(f"Saved {len(records)} quarantined → {output_path.name}")
     
+    def _resolve_customer_entities(self) -> None:
+        """
+        Write the ``customer_match`` mapping (customer_id → canonical_customer_id).
+
+        Runs only when the customer schema has an ``entity_resolution`` block.
+        ``customer_sk`` comes from the customer key dictionary, like every
+        other Silver table holding ``customer_id``.
+        """
+        schema_name = self._schema_for_source("customers")
+        config = self.schemas_config.get(schema_name, {}).get("entity_resolution")
+        silver_path = self.output_dir / "customers.csv"
+        if config is None or not silver_path.exists():
+            return
+
+        primary_key = self.schemas_config[schema_name].get("primary_key", "customer_id")
+        customers = pl.read_csv(silver_path, infer_schema_length=0)
+        match = CustomerMatcher(config, id_column=primary_key).match(customers)
+        mapping = self._add_surrogate_keys(match.mapping, {primary_key: schema_name})
+        mapping.write_csv(self.output_dir / "customer_match.csv")
+        self.logger.info(
+            f"✓ customer_match: {match.merged_records} of {len(match.mapping)} "
+            f"customers mapped to another identity"
+        )
+
     def _parse_invoice_line_items(self) -> None:
         """
         Parse line_items_json from Bronze invoices into a separate Silver table.
@@ -416,7 +1076,10 @@ class SilverProcessor:
                 continue
         
         if all_line_items:
-            line_items_df = pl.DataFrame(all_line_items)
+            line_items_df = self._add_surrogate_keys(
+                pl.DataFrame(all_line_items),
+                {"invoice_id": self._schema_for_source("invoices"), "product_id": "product"},
+            )
             output_path = self.output_dir / "invoice_line_items.csv"
             line_items_df.write_csv(output_path)
             self.logger.info(
@@ -427,3 +1090,106 @@ class SilverProcessor:
         if quarantined:
             self._save_quarantine("invoice_line_items", quarantined)
 
+    def _build_call_utterances(self) -> None:
+        """
+        Explode call transcript JSON columns into typed, columnar Silver data.
+
+        - ``call_utterances.csv``: one row per utterance with
+          (call_id, seq, offset_seconds, speaker, text)
+        - ``call_transcripts.parquet``: the Silver call transcripts with
+          ``keywords_detected`` / ``action_items`` as native List[String]
+
+        Decoding and explode are vectorized; rows whose JSON cannot be
+        decoded are skipped.
+        """
+        silver_path = self.output_dir / "call_transcripts.csv"
+        parquet_path = self.output_dir / "call_transcripts.parquet"
+        if parquet_path.exists():
+            calls = pl.read_parquet(parquet_path)
+        elif silver_path.exists():
+            calls = pl.read_csv(silver_path, infer_schema_length=None)
+        else:
+            return
+
+        if "utterances" not in calls.columns:
+            self.logger.debug("No utterances column in call_transcripts")
+            return
+
+        utterance_dtype = pl.List(pl.Struct({
+            "timestamp": pl.String,
+            "speaker": pl.String,
+            "text": pl.String,
+        }))
+        decoded = self._decode_json_column(
+            calls.select("call_id", "utterances"), "utterances", utterance_dtype
+        ).filter(pl.col("utterances").list.len() > 0)
+
+        utterances = (
+            decoded
+            .with_columns(
+                pl.int_ranges(1, pl.col("utterances").list.len() + 1, dtype=pl.Int32)
+                .alias("seq")
+            )
+            .explode(["utterances", "seq"])
+            .unnest("utterances")
+        )
+        # "HH:MM:SS" or "MM:SS" (fractional seconds allowed) → seconds
+        parts = pl.col("timestamp").str.extract_groups(
+            r"^(?:(?<h>\d+):)?(?<m>\d+):(?<s>\d+(?:\.\d+)?)$"
+        )
+        utterances = utterances.select(
+            "call_id",
+            "seq",
+            (
+                parts.struct.field("h").cast(pl.Float64).fill_null(0) * 3600
+                + parts.struct.field("m").cast(pl.Float64) * 60
+                + parts.struct.field("s").cast(pl.Float64)
+            ).alias("offset_seconds"),
+            "speaker",
+            "text",
+        )
+
+        if len(utterances):
+            utterances.write_csv(self.output_dir / "call_utterances.csv")
+            self.logger.info(
+                f"✓ call_utterances: {len(utterances)} utterances "
+                f"from {decoded.height} calls"
+            )
+
+        # Native list columns for keyword / action-item arrays
+        list_columns = [
+            c for c in ("keywords_detected", "action_items")
+            if c in calls.columns and calls[c].dtype == pl.String
+        ]
+        typed = calls
+        for col in list_columns:
+            typed = self._decode_json_column(typed, col, pl.List(pl.String))
+        self._write_parquet("call_transcripts", self._schema_for_source("call_transcripts"), typed)
+
+    def _decode_json_column(
+        self,
+        df: pl.DataFrame,
+        col: str,
+        dtype: pl.DataType,
+    ) -> pl.DataFrame:
+        """
+        Vectorized JSON decode of ``col`` into ``dtype``.
+
+        Malformed values become null; they are located with a per-value check
+        only when the vectorized decode fails.
+        """
+        try:
+            return df.with_columns(pl.col(col).str.json_decode(dtype))
+        except pl.exceptions.ComputeError:
+            def _is_valid(value: str) -> bool:
+                try:
+                    json.loads(value)
+                    return True
+                except (json.JSONDecodeError, TypeError):
+                    return False
+
+            is_valid = pl.col(col).map_elements(_is_valid, return_dtype=pl.Boolean)
+            cleaned = df.with_columns(pl.when(is_valid).then(pl.col(col)).alias(col))
+            skipped = cleaned[col].null_count() - df[col].null_count()
+            self.logger.warning(f"Skipped {skipped} malformed {col} values")
+            return cleaned.with_columns(pl.col(col).str.json_decode(dtype))
@@ -0,0 +1,93 @@
+"""
+Quarantine Collection Policies.
+
+Bounds the memory spent on quarantined records. Each source declares a
+policy in sources.yaml:
+
+- ``full``        keep every quarantined record (default)
+- ``sample:N``    keep up to N records per error type (reservoir sampling)
+- ``counts_only`` keep no records, only exact counts per error type
+
+Records are built lazily: the stringified copy of a row is only created
+when the policy actually keeps it.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class QuarantinePolicy:
+    """Parsed quarantine policy for a source."""
+    mode: str = "full"
+    sample_size: int = 0
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "QuarantinePolicy":
+        """
+        Parse a policy string from sources.yaml.
+
+        Raises:
+            ValueError: If the spec is not ``full``, ``counts_only`` or ``sample:N``.
+        """
+        if spec is None or str(spec).strip() == "full":
+            return cls()
+        spec = str(spec).strip()
+        if spec == "counts_only":
+            return cls(mode="counts_only")
+        if spec.startswith("sample:"):
+            try:
+                size = int(spec.split(":", 1)[1])
+            except ValueError:
+                size = -1
+            if size > 0:
+                return cls(mode="sample", sample_size=size)
+        raise ValueError(
+            f"Invalid quarantine policy '{spec}'. "
+            "Expected 'full', 'sample:N' (N > 0) or 'counts_only'"
+        )
+
+
+class QuarantineCollector:
+    """
+    Collects quarantined records under a QuarantinePolicy.
+
+    In ``sample`` mode each error type has its own reservoir (Algorithm R),
+    so rare error types are still represented next to a flood of common
+    ones. ``counts`` is always exact.
+    """
+
+    def __init__(self, policy: QuarantinePolicy, seed: Any = 0):
+        self.policy = policy
+        self.counts: Dict[str, int] = {}
+        self._reservoirs: Dict[str, List[Dict[str, Any]]] = {}
+        self._rng = random.Random(seed)
+
+    def add(self, error_type: str, make_record: Callable[[], Dict[str, Any]]) -> None:
+        """Register a quarantined row; ``make_record`` is called only if kept."""
+        seen = self.counts.get(error_type, 0) + 1
+        self.counts[error_type] = seen
+
+        if self.policy.mode == "counts_only":
+            return
+
+        reservoir = self._reservoirs.setdefault(error_type, [])
+        if self.policy.mode == "full" or len(reservoir) < self.policy.sample_size:
+            reservoir.append(make_record())
+            return
+
+        slot = self._rng.randrange(seen)
+        if slot < self.policy.sample_size:
+            reservoir[slot] = make_record()
+
+    @property
+    def total(self) -> int:
+        """Exact number of quarantined rows seen."""
+        return sum(self.counts.values())
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """Kept records in original row order."""
+        kept = [r for reservoir in self._reservoirs.values() for r in reservoir]
+        return sorted(kept, key=lambda r: r.get("row_index", 0))
@@ -0,0 +1,74 @@
+"""
+Surrogate Key Dictionaries.
+
+Maps natural keys (``CUS-00000045``, ``TXN-ABCDEF``) to dense Int32
+surrogates so fact tables can be joined and aggregated on integers. One
+dictionary per entity is persisted under ``silver/_keys/<entity>.parquet``:
+existing assignments never change between runs, and new keys are appended
+after the current maximum in sorted order.
+"""
+
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+
+KEY_SCHEMA = {"key": pl.String, "sk": pl.Int32}
+
+
+def surrogate_column(natural_key: str) -> str:
+    """Name of the surrogate column for a natural key column (customer_id → customer_sk)."""
+    base = natural_key[:-3] if natural_key.endswith("_id") else natural_key
+    return f"{base}_sk"
+
+
+class KeyDictionary:
+    """Persistent natural key → Int32 surrogate mapping for one entity."""
+
+    def __init__(self, keys_dir: Path, entity: str):
+        self.entity = entity
+        self.path = Path(keys_dir) / f"{entity}.parquet"
+        if self.path.exists():
+            self.mapping = pl.read_parquet(self.path).cast(KEY_SCHEMA)
+        else:
+            self.mapping = pl.DataFrame(schema=KEY_SCHEMA)
+        self._dirty = False
+        self.logger = logger.bind(component="KeyDictionary")
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def encode(self, values: pl.Series) -> pl.Series:
+        """
+        Return the surrogate for each value, assigning new ones as needed.
+
+        Nulls and empty strings stay null. Row order is preserved.
+        """
+        keys = values.cast(pl.String)
+        keys = pl.select(pl.when(keys != "").then(keys)).to_series()
+        distinct = keys.drop_nulls().unique()
+        new_keys = distinct.filter(~distinct.is_in(self.mapping["key"].implode())).sort()
+        if len(new_keys):
+            start = int(self.mapping["sk"].max() or 0) + 1
+            self.mapping = pl.concat([
+                self.mapping,
+                pl.DataFrame({
+                    "key": new_keys,
+                    "sk": pl.int_range(start, start + len(new_keys), dtype=pl.Int32, eager=True),
+                }),
+            ])
+            self._dirty = True
+
+        return keys.replace_strict(
+            self.mapping["key"], self.mapping["sk"], default=None, return_dtype=pl.Int32
+        )
+
+    def save(self) -> None:
+        """Persist the dictionary if new keys were assigned."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mapping.write_parquet(self.path)
+        self._dirty = False
+        self.logger.debug(f"Saved {len(self.mapping)} {self.entity} keys → {self.path.name}")
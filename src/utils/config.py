@@ -6,7 +6,7 @@ and environment variable overrides.
 """
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import date
 
 import yaml
@@ -20,12 +20,36 @@ class DataConfig(BaseModel):
     output_dir: Path = Field(default=Path("./outputs"))
 
 
+class SketchConfig(BaseModel):
+    """Mergeable sketches behind the approximate Gold features."""
+    enabled: bool = Field(default=False)
+    hll_precision: int = Field(
+        default=12,
+        ge=4,
+        le=18,
+        description="HyperLogLog registers = 2**precision; standard error 1.04 / sqrt(registers)"
+    )
+    relative_accuracy: float = Field(
+        default=0.01,
+        gt=0.0,
+        lt=1.0,
+        description="Relative error bound of the order value quantiles"
+    )
+    quantiles: List[float] = Field(default_factory=lambda: [0.5, 0.9])
+
+
 class FeatureEngineeringConfig(BaseModel):
     """Feature engineering configuration."""
-    reference_date: date = Field(
+    reference_date: Optional[date] = Field(
         default=date(2026, 2, 1),
-        description="Fixed reference date for reproducible time-based calculations"
+        description="Fixed reference date for reproducible time-based calculations; "
+                    "None opts in to the run date (CURRENT_DATE)"
     )
+    rolling_windows: List[int] = Field(
+        default_factory=lambda: [7, 30, 90, 365],
+        description="Trailing windows (days) of the Gold rolling feature tables"
+    )
+    sketches: SketchConfig = Field(default_factory=SketchConfig)
 
 
 class ValidationConfig(BaseModel):
@@ -33,7 +57,23 @@ class ValidationConfig(BaseModel):
     strict_mode: bool = Field(default=False)
     max_quarantine_rate: float = Field(
         default=0.2,
-        description="Maximum acceptable quarantine rate before warning"
+        ge=0.0,
+        le=1.0,
+        description="Maximum acceptable quarantine rate per Silver source"
+    )
+    on_breach: Literal["warn", "skip", "fail"] = Field(
+        default="warn",
+        description="Action when a source breaches max_quarantine_rate"
+    )
+    preflight_sample: int = Field(
+        default=200,
+        ge=0,
+        description="Rows sampled and validated before the full pass (0 disables)"
+    )
+    min_rows: int = Field(
+        default=50,
+        ge=1,
+        description="Rows seen before the quarantine rate is enforced"
     )
 
 
@@ -116,14 +116,40 @@ def generate_quality_report(
     # --- Cleaning Rules Applied ---
     lines.append("### Cleaning Rules Applied")
     lines.append("")
-    lines.append("| Source | Fields Cleaned |")
-    lines.append("|--------|---------------|")
+    lines.append("| Source | Fields Cleaned (cells changed) |")
+    lines.append("|--------|-------------------------------|")
     for source, result in silver_results.items():
         if result.fields_cleaned:
-            fields = ", ".join(result.fields_cleaned.keys())
+            fields = ", ".join(
+                f"{name} ({count:,})" for name, count in result.fields_cleaned.items()
+            )
             lines.append(f"| {source} | {fields} |")
     lines.append("")
     
+    # --- Cleaning Rule Profile ---
+    rule_stats: Dict[str, Dict[str, float]] = {}
+    for result in silver_results.values():
+        for profile in getattr(result, "rule_profiles", []):
+            stats = rule_stats.setdefault(
+                profile.rule, {"fields": 0, "cells": 0, "seconds": 0.0}
+            )
+            stats["fields"] += 1
+            stats["cells"] += profile.cells_changed
+            stats["seconds"] += profile.seconds
+    
+    if rule_stats:
+        total_seconds = sum(s["seconds"] for s in rule_stats.values()) or 1.0
+        lines.append("### Cleaning Rule Profile")
+        lines.append("")
+        lines.append("| Rule | Fields | Cells Changed | Time (ms) | Share |")
+        lines.append("|------|--------|---------------|-----------|-------|")
+        for rule, stats in sorted(rule_stats.items(), key=lambda x: -x[1]["seconds"]):
+            lines.append(
+                f"| {rule} | {stats['fields']} | {stats['cells']:,} | "
+                f"{stats['seconds'] * 1000:.1f} | {stats['seconds'] / total_seconds:.0%} |"
+            )
+        lines.append("")
+    
     # --- Deduplication Details ---
     if total_deduped > 0:
         lines.append("### Deduplication")
@@ -149,6 +175,55 @@ def generate_quality_report(
                 )
         lines.append("")
     
+    # --- Memory Footprint (dtype policy) ---
+    memory_rows = [
+        (source, result.memory_bytes_before, result.memory_bytes_after)
+        for source, result in silver_results.items()
+        if getattr(result, "memory_bytes_before", 0) > 0
+    ]
+    if memory_rows:
+        lines.append("### Silver Memory Footprint")
+        lines.append("")
+        lines.append("| Source | Before (KB) | After (KB) | Saved |")
+        lines.append("|--------|-------------|------------|-------|")
+        for source, before, after in memory_rows:
+            saved = 1 - after / before
+            lines.append(
+                f"| {source} | {before / 1024:.1f} | {after / 1024:.1f} | {saved:.1%} |"
+            )
+        lines.append("")
+    
+    # --- Cross-field Consistency ---
+    check_rows = [
+        (source, name, count)
+        for source, result in silver_results.items()
+        for name, count in getattr(result, "check_violations", {}).items()
+        if count > 0
+    ]
+    if check_rows:
+        lines.append("### Consistency Check Violations")
+        lines.append("")
+        lines.append("| Source | Check | Violations |")
+        lines.append("|--------|-------|------------|")
+        for source, name, count in check_rows:
+            lines.append(f"| {source} | {name} | {count} |")
+        lines.append("")
+    
+    # --- Circuit Breaker ---
+    breaches = [
+        (source, result.breach, "skipped" if result.skipped else "warned")
+        for source, result in silver_results.items()
+        if getattr(result, "breach", None)
+    ]
+    if breaches:
+        lines.append("### Quarantine Rate Breaches")
+        lines.append("")
+        lines.append("| Source | Breach | Action |")
+        lines.append("|--------|--------|--------|")
+        for source, breach, action in breaches:
+            lines.append(f"| {source} | {breach} | {action} |")
+        lines.append("")
+    
     # --- Gold Summary ---
     lines.append("---")
     lines.append("\n## Gold Layer (Feature Engineering)")
@@ -165,6 +240,29 @@ def generate_quality_report(
     lines.append(f"| **Total** | | **{total_features}** |")
     lines.append("")
     
+    # --- Gold Query Profiles ---
+    profiles = [
+        r.profile for r in gold_results.values() if getattr(r, "profile", None) is not None
+    ]
+    if profiles:
+        lines.append("### Gold Query Profiles")
+        lines.append("")
+        lines.append("| Feature Table | Latency (ms) | CPU (ms) | Rows Scanned | Peak Memory (MB) | Spill (MB) | Slowest Operator |")
+        lines.append("|---------------|--------------|----------|--------------|------------------|------------|------------------|")
+        for p in profiles:
+            slowest = "-"
+            if p.top_operators:
+                name, seconds, rows = p.top_operators[0]
+                slowest = f"{name} {seconds * 1000:.1f} ms ({rows:,} rows)"
+            lines.append(
+                f"| {p.feature_table} | {p.latency_s * 1000:.1f} | {p.cpu_time_s * 1000:.1f} "
+                f"| {p.rows_scanned:,} | {p.peak_memory_bytes / 2**20:.1f} "
+                f"| {p.spill_bytes / 2**20:.1f} | {slowest} |"
+            )
+        lines.append("")
+        lines.append(f"Full profiles: `{profiles[0].path.parent}/<table>.json`")
+        lines.append("")
+    
     # --- Known Issues Detected ---
     lines.append("---")
     lines.append("\n## Data Quality Issues Detected")
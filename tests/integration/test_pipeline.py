@@ -52,10 +52,11 @@ class TestPipelineIntegration:
         for source, result in silver.items():
             assert result["pass_rate"] > 0, f"Silver pass rate 0 for {source}"
         
-        # Gold: all 4 feature tables
+        # Gold: all 6 feature tables
         gold = results["layers"]["gold"]
-        assert len(gold) == 4
-        for table in ["customer_features", "product_features", "vendor_features", "invoice_features"]:
+        assert len(gold) == 6
+        for table in ["customer_features", "product_features", "vendor_features", "invoice_features",
+                      "customer_rolling_features", "product_rolling_features"]:
             assert table in gold, f"Missing gold table: {table}"
             assert gold[table]["rows"] > 0
             assert gold[table]["features"] > 0
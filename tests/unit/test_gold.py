@@ -2,13 +2,31 @@
 Unit tests for Gold layer feature computation.
 """
 
+import json
+import shutil
+from datetime import date
+
 import pytest
 from pathlib import Path
 
 import polars as pl
 import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+from polars.testing import assert_frame_equal
 
-from src.gold.processor import GoldProcessor
+from src.gold import manifest as gold_manifest
+from src.gold.manifest import FeatureSpec, GoldManifest
+from src.gold import incremental
+from src.gold.incremental import IncrementalState
+from src.gold.interactions import InteractionMatrix
+from src.gold.processor import OOM_FALLBACK, GoldProcessor
+from src.gold.runs import read_run_marker
+from src.gold.sketches import HyperLogLog, QuantileSketch, quantile_column
+from src.serving import FeatureStore
+from src.utils.quality_report import generate_quality_report
 
 
 class TestGoldProcessor:
@@ -84,6 +102,7 @@ class TestGoldProcessor:
             "product_id": ["PRD-001", "PRD-002", "PRD-001"],
             "customer_id": ["CUS-001", "CUS-002", "CUS-003"],
             "rating": [5, 3, 4],
+            "review_date": ["2025-01-20", "2025-02-15", "2025-03-10"],
             "sentiment": ["positive", "neutral", "positive"],
             "verified_purchase": [True, True, False],
         })
@@ -194,10 +213,597 @@ class TestGoldProcessor:
         
         gold_dir = tmp_path / "outputs" / "processed" / "gold"
         csv_files = list(gold_dir.glob("*.csv"))
-        assert len(csv_files) == 4
+        assert len(csv_files) == 6
         
         gold_processor.close()
     
+    def test_gold_export_formats_from_one_scan(self, silver_dir, tmp_path):
+        """Parquet, Arrow IPC and CSV hold the same rows as the in-memory Arrow table."""
+        processor = GoldProcessor(
+            silver_dir, tmp_path / "out", db_path=None,
+            parquet_row_group_size=2, keep_arrow=True,
+        )
+        result = processor.process_all()["customer_features"]
+        table = result.table
+        assert isinstance(table, pa.Table)
+        assert result.row_count == table.num_rows == 3
+        assert result.columns == table.schema.names
+        assert set(result.files) == {"csv", "parquet", "arrow"}
+
+        parquet = pq.ParquetFile(result.files["parquet"])
+        assert parquet.metadata.num_rows == 3
+        assert parquet.metadata.num_row_groups == 2
+        assert parquet.metadata.row_group(0).column(0).compression == "ZSTD"
+        assert parquet.read().equals(table)
+        with pa.memory_map(str(result.files["arrow"])) as source:
+            assert pa.ipc.open_file(source).read_all().equals(table)
+        assert pl.read_csv(result.files["csv"]).height == 3
+        processor.close()
+
+    def test_gold_export_formats_validated(self, silver_dir, tmp_path):
+        """Unknown export formats are rejected up front."""
+        with pytest.raises(ValueError, match="export format"):
+            GoldProcessor(silver_dir, tmp_path / "out", export_formats=["csv", "xlsx"])
+
+    def test_gold_arrow_exports_served_by_key(self, gold_processor):
+        """The feature store serves the Arrow files Gold writes."""
+        gold_processor.process_all()
+        store = FeatureStore(gold_processor.output_dir)
+
+        row = store.get_one("customer_features", "CUS-002", ["total_orders", "total_revenue"])
+        assert row == {"total_orders": 3, "total_revenue": pytest.approx(219.94)}
+        assert not list(gold_processor.output_dir.glob(".*.tmp"))
+        gold_processor.close()
+
+    def test_gold_run_marker_lists_exports(self, gold_processor):
+        """Each finished run replaces the marker listing every export."""
+        gold_processor.process_all()
+        first = read_run_marker(gold_processor.output_dir)
+        assert first == gold_processor.run
+        assert "customer_features.arrow" in first.files
+        assert first.changed_files(gold_processor.output_dir, first.files) == []
+
+        gold_processor.process_all()
+        second = read_run_marker(gold_processor.output_dir)
+        assert second.version == first.version + 1
+        gold_processor.close()
+
+    def test_gold_profiling_writes_plans(self, silver_dir, tmp_path):
+        """With a profile_dir each feature query's DuckDB profile is written and summarized."""
+        profile_dir = tmp_path / "profiles"
+        processor = GoldProcessor(silver_dir, tmp_path / "out", db_path=None, profile_dir=profile_dir)
+        results = processor.process_all()
+        processor.close()
+
+        for table, result in results.items():
+            profile = result.profile
+            assert profile.path == profile_dir / f"{table}.json"
+            plan = json.loads(profile.path.read_text())
+            assert plan["children"] and "system_peak_buffer_memory" in plan
+            assert profile.latency_s > 0 and profile.rows_scanned > 0
+            assert profile.top_operators
+        report = generate_quality_report({}, {}, results, tmp_path / "quality_report.md")
+        assert "### Gold Query Profiles" in report.read_text()
+
+        unprofiled = GoldProcessor(silver_dir, tmp_path / "plain", db_path=None)
+        assert all(r.profile is None for r in unprofiled.process_all().values())
+        unprofiled.close()
+
+    def test_silver_parquet_preferred(self, silver_dir, gold_processor):
+        """Views read the typed Parquet copy when Silver wrote one."""
+        vendors = pl.read_csv(silver_dir / "vendors.csv").with_columns(
+            pl.col("status").cast(pl.Categorical),
+            pl.lit("parquet").alias("origin"),
+        )
+        vendors.write_parquet(silver_dir / "vendors.parquet")
+        gold_processor._load_silver_data()
+
+        origin = gold_processor.conn.execute(
+            "SELECT DISTINCT origin FROM vendors"
+        ).fetchall()
+        assert origin == [("parquet",)]
+        # Categorical columns come back as plain strings for the SQL layer
+        status = gold_processor.conn.execute(
+            "SELECT COUNT(*) FROM vendors WHERE status = 'active'"
+        ).fetchone()[0]
+        assert status == 2
+        gold_processor.close()
+
+    def test_silver_tables_reimported_on_fingerprint_change(self, silver_dir, tmp_path):
+        """Unchanged Silver files are not re-imported into a persistent database."""
+        db_path = tmp_path / "gold.duckdb"
+        first = GoldProcessor(silver_dir=silver_dir, output_dir=tmp_path / "out", db_path=db_path)
+        first._load_silver_data()
+        assert first._object_type("vendors") == "BASE TABLE"
+        before = dict(first.conn.execute(
+            "SELECT table_name, imported_at FROM _silver_fingerprints"
+        ).fetchall())
+        first.close()
+
+        vendors = pl.read_csv(silver_dir / "vendors.csv")
+        pl.concat([vendors, vendors.head(1).with_columns(pl.lit("VND-999").alias("vendor_id"))]
+                  ).write_csv(silver_dir / "vendors.csv")
+        (silver_dir / "reviews.csv").unlink()
+
+        second = GoldProcessor(silver_dir=silver_dir, output_dir=tmp_path / "out", db_path=db_path)
+        second._load_silver_data()
+        imported = dict(second.conn.execute(
+            "SELECT table_name, imported_at FROM _silver_fingerprints"
+        ).fetchall())
+        assert second.conn.execute("SELECT COUNT(*) FROM vendors").fetchone()[0] == len(vendors) + 1
+        assert imported["customers"] == before["customers"]
+        assert imported["vendors"] > before["vendors"]
+        assert "reviews" not in imported
+        assert second._object_type("reviews") is None
+        second.close()
+
+    def _features(self, processor, table):
+        return processor.conn.execute(f"SELECT * FROM {table}").pl().sort(pl.first())
+
+    def test_incremental_matches_full_recompute(self, silver_dir, tmp_path):
+        """Folding appended transactions gives the same features as a full run."""
+        transactions = pl.read_csv(silver_dir / "transactions.csv")
+        transactions.head(6).write_csv(silver_dir / "transactions.csv")
+        db_path = tmp_path / "incremental.duckdb"
+        first = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True)
+        first.process_all()
+        first.close()
+
+        appended = pl.concat([
+            transactions,
+            transactions.head(1).with_columns(pl.lit("TXN-00FF").alias("transaction_id")),
+        ])
+        appended.write_csv(silver_dir / "transactions.csv")
+        incremental = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True)
+        incremental.process_all()
+        full = GoldProcessor(silver_dir, tmp_path / "full", db_path=None)
+        full.process_all()
+
+        assert incremental.conn.execute(
+            "SELECT COUNT(*) FROM gold_ledger_transactions"
+        ).fetchone()[0] == len(appended)
+        assert incremental.conn.execute("SELECT COUNT(*) FROM _delta_transactions").fetchone()[0] == 5
+        for table in (
+            "customer_features", "product_features", "vendor_features",
+            "customer_rolling_features", "product_rolling_features",
+        ):
+            assert_frame_equal(self._features(incremental, table), self._features(full, table))
+        # The full-history intermediate was merged, not rebuilt: one row per customer x product x day
+        history = "SELECT * FROM txn_daily ORDER BY ALL"
+        assert incremental.conn.execute(history).fetchall() == full.conn.execute(history).fetchall()
+        assert incremental._object_type("txn_daily") == "BASE TABLE"
+        incremental.close()
+        full.close()
+
+    def test_unchanged_tables_are_reused_from_the_database(self, silver_dir, tmp_path):
+        """A table is recomputed only when its SQL, inputs or reference date change."""
+        sql_dir = tmp_path / "sql"
+        shutil.copytree(Path(gold_manifest.__file__).parent / "sql", sql_dir)
+
+        def run(reference_date=date(2025, 4, 1), **kwargs):
+            processor = GoldProcessor(
+                silver_dir, tmp_path / "out", db_path=tmp_path / "gold.duckdb",
+                manifest=GoldManifest.load(sql_dir / "manifest.yaml"),
+                reference_date=reference_date, **kwargs,
+            )
+            results = processor.process_all()
+            processor.close()
+            return {table for table, r in results.items() if r.cached}, results
+
+        cached, first = run()
+        assert cached == set()
+        cached, again = run()
+        assert cached == set(first)
+        for table, result in again.items():
+            assert (result.row_count, result.columns) == (first[table].row_count, first[table].columns)
+
+        # Only the tables reading the reference date are recomputed for a new one
+        cached, _ = run(reference_date=date(2025, 5, 1))
+        assert cached == {"product_features", "vendor_features"}
+        sql_file = sql_dir / "vendor_features.sql"
+        sql_file.write_text(sql_file.read_text() + "\n-- edited\n")
+        cached, _ = run(reference_date=date(2025, 5, 1))
+        assert cached == set(first) - {"vendor_features"}
+        pl.read_csv(silver_dir / "reviews.csv").head(2).write_csv(silver_dir / "reviews.csv")
+        cached, _ = run(reference_date=date(2025, 5, 1))
+        assert cached == set(first) - {"product_features"}
+
+        # A missing export is rewritten from the persisted table
+        csv = tmp_path / "out" / "gold" / "customer_features.csv"
+        csv.unlink()
+        cached, _ = run(reference_date=date(2025, 5, 1))
+        assert cached == set(first) and csv.exists()
+        cached, _ = run(reference_date=date(2025, 5, 1), memoize=False)
+        assert cached == set()
+
+    def test_state_not_folded_when_every_table_cached(self, silver_dir, tmp_path, monkeypatch):
+        """Cache keys are checked before the fold, which is skipped when nothing misses."""
+        folds = []
+        fold = IncrementalState.fold
+        monkeypatch.setattr(
+            IncrementalState, "fold", lambda state, full=False: folds.append(full) or fold(state, full)
+        )
+
+        def run():
+            processor = GoldProcessor(
+                silver_dir, tmp_path / "out", db_path=tmp_path / "gold.duckdb", sketches={},
+            )
+            results = processor.process_all()
+            processor.close()
+            return {table for table, r in results.items() if r.cached}, results
+
+        cached, first = run()
+        assert cached == set() and "segment_features" in first
+        cached, _ = run()
+        assert cached == set(first) and len(folds) == 1
+
+        pl.read_csv(silver_dir / "reviews.csv").head(2).write_csv(silver_dir / "reviews.csv")
+        cached, _ = run()
+        assert cached == set(first) - {"product_features"} and len(folds) == 2
+
+    def test_state_sql_keys_only_the_tables_reading_it(self, silver_dir, tmp_path, monkeypatch):
+        """Editing one state's SQL invalidates the tables declaring that state, no others."""
+        state_dir = tmp_path / "state"
+        shutil.copytree(incremental.STATE_SQL_DIR, state_dir)
+        monkeypatch.setattr(incremental, "STATE_SQL_DIR", state_dir)
+
+        def run():
+            processor = GoldProcessor(silver_dir, tmp_path / "out", db_path=tmp_path / "gold.duckdb")
+            results = processor.process_all()
+            processor.close()
+            return {table for table, r in results.items() if r.cached}, results
+
+        _, first = run()
+        sql_file = state_dir / "vendor_invoices.sql"
+        sql_file.write_text(sql_file.read_text() + "\n-- edited\n")
+        cached, _ = run()
+        assert cached == set(first) - {"vendor_features"}
+
+        with pytest.raises(ValueError, match="Unknown Gold state table"):
+            GoldProcessor(
+                silver_dir, tmp_path / "bad", db_path=None,
+                manifest=GoldManifest({"t": FeatureSpec("t", "t.sql", [], state=["nope"])}),
+            )
+
+    def _key_with_silver_dictionaries(self, silver_dir):
+        """Add Silver key dictionaries (keys in reverse ID order) and their _sk columns."""
+        keys_dir = silver_dir / "_keys"
+        keys_dir.mkdir()
+        tables = {path.stem: pl.read_csv(path) for path in silver_dir.glob("*.csv")}
+        for natural_key in ("customer_id", "product_id", "vendor_id", "invoice_id"):
+            ids = sorted(
+                {v for df in tables.values() if natural_key in df.columns for v in df[natural_key]},
+                reverse=True,
+            )
+            dictionary = pl.DataFrame({"key": ids, "sk": list(range(1, len(ids) + 1))},
+                                      schema={"key": pl.String, "sk": pl.Int32})
+            dictionary.write_parquet(keys_dir / f"{natural_key[:-3]}.parquet")
+            sk = natural_key.replace("_id", "_sk")
+            for name, df in tables.items():
+                if natural_key in df.columns:
+                    tables[name] = df.with_columns(
+                        pl.col(natural_key).replace_strict(dictionary["key"], dictionary["sk"]).alias(sk)
+                    )
+        for name, df in tables.items():
+            df.write_csv(silver_dir / f"{name}.csv")
+
+    def test_surrogate_keys_come_from_silver_dictionaries(self, silver_dir, tmp_path):
+        """A table without an _sk column is keyed from Silver's dictionary, never re-keyed."""
+        self._key_with_silver_dictionaries(silver_dir)
+        # Derived output written without customer_sk (older Silver)
+        pl.DataFrame({
+            "customer_id": ["CUS-001", "CUS-002", "CUS-003"],
+            "canonical_customer_id": ["CUS-001", "CUS-002", "CUS-001"],
+        }).write_csv(silver_dir / "customer_match.csv")
+        db_path = tmp_path / "gold.duckdb"
+        first = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True)
+        first.process_all()
+        first.close()
+
+        # Only customers is re-imported
+        customers = pl.read_csv(silver_dir / "customers.csv")
+        customers.write_csv(silver_dir / "customers.csv")
+        incremental = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True)
+        incremental.process_all()
+        full = GoldProcessor(silver_dir, tmp_path / "full", db_path=None)
+        full.process_all()
+
+        match = incremental.conn.execute(
+            "SELECT customer_sk FROM customer_match ORDER BY customer_id"
+        ).fetchall()
+        assert match == [(3,), (2,), (1,)]
+        assert_frame_equal(
+            self._features(incremental, "customer_features"), self._features(full, "customer_features")
+        )
+        incremental.close()
+        full.close()
+
+        # Silver keys without their dictionary cannot be completed from DuckDB
+        (silver_dir / "_keys" / "customer.parquet").unlink()
+        with pytest.raises(ValueError, match="customer_sk"):
+            GoldProcessor(silver_dir, tmp_path / "mixed", db_path=None).process_all()
+
+    def test_rolling_window_features(self, silver_dir, tmp_path):
+        """Each configured window covers the N days ending on the reference date."""
+        processor = GoldProcessor(
+            silver_dir, tmp_path / "out", db_path=None,
+            reference_date=date(2025, 3, 15), rolling_windows=[30, 7],
+        )
+        results = processor.process_all()
+
+        customers = self._features(processor, "customer_rolling_features")
+        assert customers.columns == [
+            "customer_id",
+            "orders_7d", "spend_7d", "returns_7d", "distinct_products_7d",
+            "orders_30d", "spend_30d", "returns_30d", "distinct_products_30d",
+        ]
+        # CUS-001 bought on 03-05 and 03-15 within 30 days, 03-15 within 7
+        assert customers.select("orders_7d", "orders_30d", "distinct_products_30d").rows() == [
+            (1, 2, 2), (0, 2, 2), (0, 1, 1),
+        ]
+        assert customers["spend_30d"].to_list() == pytest.approx([429.97, 169.95, 59.98])
+        products = self._features(processor, "product_rolling_features")
+        assert products.select("orders_7d", "orders_30d", "distinct_customers_30d").rows() == [
+            (0, 1, 1), (1, 1, 1), (0, 3, 3),
+        ]
+        assert products["revenue_30d"].to_list() == pytest.approx([49.99, 399.98, 209.93])
+        assert results["customer_rolling_features"].row_count == 3
+        processor.close()
+
+        with pytest.raises(ValueError, match="Rolling windows"):
+            GoldProcessor(silver_dir, tmp_path / "bad", db_path=None, rolling_windows=[7, 7])
+
+    def test_interaction_matrix_export(self, silver_dir, tmp_path):
+        """The customer x product matrix is written as memory-mappable CSR arrays."""
+        processor = GoldProcessor(silver_dir, tmp_path / "out", db_path=None, export_interactions=True)
+        processor.process_all()
+        processor.close()
+        assert set(processor.interaction_files) == {
+            "indptr", "indices", "counts", "quantity", "revenue", "customer_ids", "product_ids",
+        }
+
+        matrix = InteractionMatrix.load(tmp_path / "out" / "gold" / "interactions")
+        assert isinstance(matrix.indptr, np.memmap) and isinstance(matrix.customer_ids, np.memmap)
+        assert matrix.shape == (3, 3) and matrix.nnz == 7
+        assert matrix.customer_ids.tolist() == ["CUS-001", "CUS-002", "CUS-003"]
+        assert matrix.product_ids.tolist() == ["PRD-001", "PRD-002", "PRD-003"]
+        assert matrix.indptr.tolist() == [0, 3, 5, 7]
+        # CUS-001 bought PRD-001 twice (2 + 3 units), PRD-002 twice (1 + 2), PRD-003 once
+        assert matrix.indices[:3].tolist() == [0, 1, 2]
+        assert matrix.values["counts"][:3].tolist() == [2, 2, 1]
+        assert matrix.values["quantity"][:3].tolist() == [5, 3, 1]
+        assert matrix.values["revenue"][:3].tolist() == pytest.approx([249.95, 599.97, 29.99])
+        assert matrix.values["counts"].sum() == 10
+
+    def test_sketch_features(self, silver_dir, tmp_path):
+        """With sketches on, product, vendor and segment features carry sketch estimates."""
+        processor = GoldProcessor(silver_dir, tmp_path / "out", db_path=None, sketches={})
+        results = processor.process_all()
+
+        products = self._features(processor, "product_features")
+        # Small counts are exact: every customer lands in its own register
+        assert products["approx_unique_customers"].to_list() == products["unique_customers"].to_list()
+        prd001 = products.filter(pl.col("product_id") == "PRD-001")
+        # PRD-001 orders: 99.98, 149.97, 49.99, 49.99 -> lower median 49.99
+        assert prd001["order_value_p50"][0] == pytest.approx(49.99, rel=0.01)
+        assert prd001["order_value_p90"][0] == pytest.approx(99.98, rel=0.01)
+        vendors = self._features(processor, "vendor_features")
+        assert vendors["approx_unique_customers"].to_list() == [3, 3]
+        segments = self._features(processor, "segment_features")
+        assert segments.select("segment", "customer_count", "approx_unique_customers").rows() == [
+            ("premium", 2, 2), ("standard", 1, 1),
+        ]
+        assert "segment_features" in results
+        processor.close()
+
+        plain = GoldProcessor(silver_dir, tmp_path / "plain", db_path=None)
+        results = plain.process_all()
+        assert "segment_features" not in results
+        assert "approx_unique_customers" not in results["product_features"].columns
+        plain.close()
+
+    def test_sketches_merge_across_incremental_runs(self, silver_dir, tmp_path):
+        """Sketches folded batch by batch equal the sketches of one full run."""
+        transactions = pl.read_csv(silver_dir / "transactions.csv")
+        transactions.head(6).write_csv(silver_dir / "transactions.csv")
+        db_path = tmp_path / "incremental.duckdb"
+        first = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True, sketches={})
+        first.process_all()
+        first.close()
+
+        transactions.write_csv(silver_dir / "transactions.csv")
+        incremental = GoldProcessor(
+            silver_dir, tmp_path / "inc", db_path=db_path, incremental=True, sketches={}
+        )
+        incremental.process_all()
+        full = GoldProcessor(silver_dir, tmp_path / "full", db_path=None, sketches={})
+        full.process_all()
+
+        assert incremental.conn.execute("SELECT COUNT(*) FROM _delta_transactions").fetchone()[0] == 4
+        for table in ("gold_sketch_products", "gold_sketch_vendors", "gold_sketch_segments"):
+            assert_frame_equal(self._features(incremental, table), self._features(full, table))
+        for table in ("product_features", "vendor_features"):
+            assert_frame_equal(self._features(incremental, table), self._features(full, table))
+        incremental.close()
+        full.close()
+
+        # Turning sketches off drops them and their columns
+        off = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True)
+        results = off.process_all()
+        assert off._object_type("gold_sketch_products") is None
+        assert "order_value_p50" not in results["vendor_features"].columns
+        off.close()
+
+    def test_incremental_rebuilds_state_on_changed_row(self, silver_dir, tmp_path):
+        """A folded transaction that changed in place forces a state rebuild."""
+        db_path = tmp_path / "incremental.duckdb"
+        first = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True)
+        first.process_all()
+        first.close()
+
+        transactions = pl.read_csv(silver_dir / "transactions.csv")
+        transactions.with_columns(
+            pl.when(pl.col("transaction_id") == "TXN-0001")
+            .then(1099.98).otherwise(pl.col("total_amount")).alias("total_amount")
+        ).write_csv(silver_dir / "transactions.csv")
+        second = GoldProcessor(silver_dir, tmp_path / "inc", db_path=db_path, incremental=True)
+        second.process_all()
+
+        revenue = second.conn.execute(
+            "SELECT total_revenue FROM customer_features WHERE customer_id = 'CUS-001'"
+        ).fetchone()[0]
+        assert revenue == pytest.approx(99.98 + 199.99 + 149.97 + 29.99 + 399.98 + 1000)
+        assert second.conn.execute("SELECT fact FROM _rebuilt_facts").fetchall() == [("transactions",)]
+        second.close()
+
+    def test_shared_txn_daily_intermediate(self, silver_dir, gold_processor):
+        """Transactions are rolled up once into txn_daily and every state reads it."""
+        transactions = pl.read_csv(silver_dir / "transactions.csv")
+        pl.concat([
+            transactions,
+            transactions.head(1).with_columns(pl.lit("TXN-00FF").alias("transaction_id")),
+        ]).write_csv(silver_dir / "transactions.csv")
+        gold_processor.process_all()
+        conn = gold_processor.conn
+
+        daily = conn.execute(
+            "SELECT COUNT(*), SUM(transactions), SUM(quantity) FROM txn_daily"
+        ).fetchone()
+        assert daily == (10, 11, sum(transactions["quantity"]) + 2)
+        orders = conn.execute(
+            "SELECT total_orders FROM customer_features WHERE customer_id = 'CUS-001'"
+        ).fetchone()[0]
+        assert orders == 6
+        # Invoice fallback (no line items): products sold per vendor, from the product state
+        diversity = conn.execute(
+            "SELECT line_item_diversity FROM invoice_features WHERE invoice_id = 'INV-001'"
+        ).fetchone()[0]
+        assert diversity == 2
+        gold_processor.close()
+
+    def test_manifest_schedules_gold_on_gold_tables(self, silver_dir, tmp_path):
+        """A table added to the manifest runs after the Gold tables it reads."""
+        sql_dir = tmp_path / "sql"
+        shutil.copytree(Path(gold_manifest.__file__).parent / "sql", sql_dir)
+        (sql_dir / "segment_summary.sql").write_text(
+            "CREATE OR REPLACE TABLE segment_summary AS "
+            "SELECT segment, COUNT(*) as customers, SUM(total_revenue) as revenue "
+            "FROM customer_features GROUP BY segment"
+        )
+        manifest = yaml.safe_load((sql_dir / "manifest.yaml").read_text())
+        manifest["tables"]["segment_summary"] = {"inputs": ["customer_features"]}
+        (sql_dir / "manifest.yaml").write_text(yaml.safe_dump(manifest, sort_keys=False))
+        loaded = GoldManifest.load(sql_dir / "manifest.yaml")
+        assert loaded.silver_inputs("segment_summary") == {"customers", "transactions"}
+
+        processor = GoldProcessor(
+            silver_dir, tmp_path / "out", db_path=None,
+            max_concurrent_queries=2, threads_per_query=1, manifest=loaded,
+        )
+        results = processor.process_all()
+        # Fails with a missing table if it ran before customer_features
+        assert results["segment_summary"].row_count == 2
+        assert (processor.output_dir / "segment_summary.csv").exists()
+
+        skipped = processor.process_all(skip_sources={"customers"})
+        assert "segment_summary" not in skipped and "customer_features" not in skipped
+        processor.close()
+
+    def test_manifest_rejects_dependency_cycle(self):
+        """Gold tables cannot depend on each other in a cycle."""
+        tables = {
+            "a": FeatureSpec(name="a", sql="a.sql", inputs=["b"]),
+            "b": FeatureSpec(name="b", sql="b.sql", inputs=["transactions", "a"]),
+        }
+        with pytest.raises(ValueError, match="cycle"):
+            GoldManifest(tables)
+
+    def test_reference_date_replaces_current_date(self, silver_dir, tmp_path):
+        """Recency and overdue features are computed as of the configured reference date."""
+        processor = GoldProcessor(
+            silver_dir, tmp_path / "out", db_path=None, reference_date=date(2025, 4, 1)
+        )
+        processor.process_all()
+        conn = processor.conn
+
+        days = conn.execute(
+            "SELECT days_since_last_purchase FROM customer_features WHERE customer_id = 'CUS-001'"
+        ).fetchone()[0]
+        assert days == 17  # last purchase 2025-03-15
+        overdue = conn.execute(
+            "SELECT days_overdue FROM invoice_features WHERE invoice_id = 'INV-002'"
+        ).fetchone()[0]
+        assert overdue == 31  # due 2025-03-01
+        processor.close()
+
+    def test_backfill_at_reference_date_matches_features(self, silver_dir, tmp_path):
+        """A backfill as of the reference date reproduces the published features."""
+        reference_date = date(2025, 4, 1)
+        processor = GoldProcessor(
+            silver_dir, tmp_path / "out", db_path=None, reference_date=reference_date
+        )
+        processor.process_all()
+        results = processor.backfill(dates=[reference_date])
+
+        backfillable = {t for t, spec in processor.manifest.tables.items() if spec.backfill}
+        assert backfillable >= {"customer_features", "product_features", "vendor_features", "invoice_features"}
+        assert set(results) == backfillable
+        for table, result in results.items():
+            assert result.columns[0] == "as_of"
+            features = self._features(processor, table)
+            backfilled = pl.read_parquet(
+                result.files["parquet"] / f"as_of={reference_date}" / "*.parquet"
+            )
+            assert_frame_equal(
+                backfilled.select(features.columns).sort(pl.first()), features,
+                check_dtypes=False,
+            )
+        # The working tables are dropped once their partitions are written
+        assert processor.conn.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE ends_with(table_name, '_backfill')"
+        ).fetchall() == []
+        processor.close()
+
+    def test_backfill_date_range_is_point_in_time(self, silver_dir, tmp_path):
+        """Each as-of date only sees the events and payments known on that date."""
+        processor = GoldProcessor(silver_dir, tmp_path / "out", db_path=None)
+        results = processor.backfill(start=date(2025, 1, 1), end=date(2025, 3, 1))
+        customers = results["customer_features"].files["parquet"]
+        assert sorted(p.name for p in customers.iterdir()) == [
+            "as_of=2025-01-01", "as_of=2025-02-01", "as_of=2025-03-01",
+        ]
+
+        def rows(table, key):
+            return pl.read_parquet(
+                results[table].files["parquet"] / "**" / "*.parquet", hive_partitioning=True
+            ).filter(pl.first() == key).sort("as_of")
+
+        assert rows("customer_features", "CUS-001")["total_orders"].to_list() == [0, 2, 3]
+        invoice = rows("invoice_features", "INV-001")  # paid 2025-01-25
+        assert invoice["payment_status"].to_list() == ["pending", "paid", "paid"]
+        assert invoice["payment_date"].null_count() == 1
+        assert len(rows("invoice_features", "INV-003")) == 2  # issued 2025-01-15
+
+        # Re-running one date replaces its partition and keeps the others
+        processor.backfill(dates=[date(2025, 2, 1)])
+        assert len(list(customers.iterdir())) == 3
+        assert rows("customer_features", "CUS-001")["total_orders"].to_list() == [0, 2, 3]
+        with pytest.raises(ValueError, match="together"):
+            processor.backfill(start=date(2025, 1, 1))
+        processor.close()
+
+    def test_skipped_sources_block_dependent_tables(self, gold_processor):
+        """Feature tables reading a skipped Silver source are not recomputed."""
+        results = gold_processor.process_all(skip_sources={"reviews"})
+
+        assert "product_features" not in results
+        assert set(results) == {
+            "customer_features", "vendor_features", "invoice_features",
+            "customer_rolling_features", "product_rolling_features",
+        }
+        assert not (gold_processor.output_dir / "product_features.csv").exists()
+        gold_processor.close()
+
     def test_vendor_outstanding_balance(self, gold_processor):
         """Test outstanding balance is correctly computed."""
         results = gold_processor.process_all()
@@ -490,3 +1096,179 @@ class TestReturnTransactions:
         assert cus["return_amount"][0] == pytest.approx(-49.99, abs=0.01)
 
         processor.close()
+
+
+class TestGoldMemorySettings:
+    """DuckDB memory settings, spilling and the out-of-memory fallback."""
+
+    TRANSACTIONS = 100_000
+    MEMORY_LIMIT = "192MB"
+
+    @pytest.fixture
+    def scaled_silver_dir(self, tmp_path):
+        """Silver data with enough transactions to exceed a small memory_limit."""
+        silver = tmp_path / "silver"
+        silver.mkdir()
+        n, customers, products = self.TRANSACTIONS, self.TRANSACTIONS // 20, 500
+        pl.DataFrame({"i": pl.int_range(0, customers, eager=True)}).select(
+            customer_id=pl.format("CUS-{}", pl.col("i").cast(pl.Utf8).str.zfill(6)),
+            full_name=pl.lit("Customer"),
+            email=pl.lit("c@test.com"),
+            segment=pl.lit("standard"),
+            total_spend=pl.lit(100.0),
+            registration_date=pl.lit("2024-01-15"),
+            is_active=pl.lit(True),
+        ).write_csv(silver / "customers.csv")
+        pl.DataFrame({
+            "vendor_id": ["VND-001", "VND-002"],
+            "vendor_name": ["Acme", "Global"],
+            "country": ["US", "UK"],
+            "region": ["NA", "EU"],
+            "reliability_score": [95.0, 80.0],
+            "status": ["active", "active"],
+        }).write_csv(silver / "vendors.csv")
+        pl.DataFrame({"i": pl.int_range(0, products, eager=True)}).select(
+            product_id=pl.format("PRD-{}", pl.col("i").cast(pl.Utf8).str.zfill(4)),
+            vendor_id=pl.format("VND-00{}", pl.col("i") % 2 + 1),
+            sku=pl.format("SKU-{}", pl.col("i")),
+            product_name=pl.lit("Widget"),
+            category=pl.lit("Electronics"),
+            price=pl.lit(10.0),
+            cost=pl.lit(5.0),
+            stock_quantity=pl.lit(100),
+            rating=pl.lit(4.0),
+            is_active=pl.lit(True),
+        ).write_csv(silver / "products.csv")
+        pl.DataFrame({"i": pl.int_range(0, n, eager=True)}).select(
+            transaction_id=pl.format("TXN-{}", pl.col("i")),
+            customer_id=pl.format(
+                "CUS-{}", (pl.col("i") * 7919 % customers).cast(pl.Utf8).str.zfill(6)
+            ),
+            product_id=pl.format("PRD-{}", (pl.col("i") * 31 % products).cast(pl.Utf8).str.zfill(4)),
+            transaction_date=pl.format(
+                "202{}-{}-{}",
+                pl.col("i") % 2 + 4,
+                (pl.col("i") % 12 + 1).cast(pl.Utf8).str.zfill(2),
+                (pl.col("i") % 28 + 1).cast(pl.Utf8).str.zfill(2),
+            ),
+            quantity=pl.col("i") % 5 + 1,
+            total_amount=(pl.col("i") % 300 + 10).cast(pl.Float64),
+            order_status=pl.lit("COMPLETED"),
+        ).write_csv(silver / "transactions.csv")
+        pl.DataFrame({
+            "review_id": ["REV-001"],
+            "product_id": ["PRD-0001"],
+            "customer_id": ["CUS-000001"],
+            "rating": [5],
+            "review_date": ["2025-01-20"],
+            "sentiment": ["positive"],
+            "verified_purchase": [True],
+        }).write_csv(silver / "reviews.csv")
+        pl.DataFrame({
+            "invoice_id": ["INV-001"],
+            "vendor_id": ["VND-001"],
+            "invoice_date": ["2025-01-01"],
+            "due_date": ["2025-02-01"],
+            "payment_date": ["2025-01-25"],
+            "total_amount": [5000.0],
+            "payment_status": ["paid"],
+            "payment_terms": ["NET30"],
+        }).write_csv(silver / "invoices.csv")
+        return silver
+
+    @pytest.fixture
+    def heavy_manifest(self, tmp_path):
+        """The Gold manifest plus a table whose query needs far more memory than the others."""
+        sql_dir = tmp_path / "sql"
+        shutil.copytree(Path(gold_manifest.__file__).parent / "sql", sql_dir)
+        (sql_dir / "customer_pair_counts.sql").write_text(
+            "CREATE OR REPLACE TABLE customer_pair_counts AS "
+            "SELECT a.customer_id, COUNT(DISTINCT md5(a.transaction_id || b.transaction_id)) as pairs "
+            "FROM transactions a JOIN transactions b USING (customer_id) GROUP BY a.customer_id"
+        )
+        manifest = yaml.safe_load((sql_dir / "manifest.yaml").read_text())
+        manifest["tables"]["customer_pair_counts"] = {"inputs": ["transactions"]}
+        (sql_dir / "manifest.yaml").write_text(yaml.safe_dump(manifest, sort_keys=False))
+        return GoldManifest.load(sql_dir / "manifest.yaml")
+
+    def _run(self, silver_dir, out, manifest, oom_fallback=OOM_FALLBACK, **settings):
+        processor = GoldProcessor(
+            silver_dir, out, db_path=out / "gold.duckdb", manifest=manifest, oom_fallback=oom_fallback,
+            max_concurrent_queries=1, profile_dir=out / "profiles",
+            reference_date=date(2026, 1, 1), duckdb_settings={"threads": 1, **settings},
+        )
+        try:
+            return processor, processor.process_all()
+        finally:
+            processor.close()
+
+    def test_queries_spill_under_memory_limit(self, scaled_silver_dir, heavy_manifest, tmp_path):
+        """With a small memory_limit and a temp_directory the heavy query spills."""
+        processor, results = self._run(
+            scaled_silver_dir, tmp_path / "out", heavy_manifest,
+            memory_limit=self.MEMORY_LIMIT, temp_directory=tmp_path / "spill",
+            preserve_insertion_order=False,
+        )
+
+        assert processor.oom_retries == []
+        assert results["customer_pair_counts"].row_count == self.TRANSACTIONS // 20
+        assert results["customer_pair_counts"].profile.spill_bytes > 0
+
+    def test_out_of_memory_query_retried_out_of_core(self, scaled_silver_dir, heavy_manifest, tmp_path):
+        """A query that runs out of memory without spilling is retried with spilling on."""
+        with pytest.raises(duckdb.OutOfMemoryException):
+            self._run(
+                scaled_silver_dir, tmp_path / "strict", heavy_manifest,
+                memory_limit=self.MEMORY_LIMIT, temp_directory="", oom_fallback=None,
+            )
+
+        processor, results = self._run(
+            scaled_silver_dir, tmp_path / "tight", heavy_manifest,
+            memory_limit=self.MEMORY_LIMIT, temp_directory="",
+        )
+        _, expected = self._run(
+            scaled_silver_dir, tmp_path / "spilled", heavy_manifest,
+            memory_limit=self.MEMORY_LIMIT, temp_directory=tmp_path / "spill",
+        )
+
+        assert processor.oom_retries == ["customer_pair_counts"]
+        assert results["customer_pair_counts"].profile.spill_bytes > 0
+        for table, result in expected.items():
+            assert_frame_equal(
+                pl.read_csv(results[table].files["csv"]).sort(pl.first()),
+                pl.read_csv(result.files["csv"]).sort(pl.first()),
+            )
+
+
+class TestSketches:
+    """Tests for the mergeable HyperLogLog and quantile sketches."""
+
+    def test_hyperloglog_merge_and_error_bound(self):
+        ids = np.arange(200_000)
+        whole = HyperLogLog(12).add(ids)
+        merged = HyperLogLog(12).add(ids[:120_000]).merge(HyperLogLog(12).add(ids[80_000:]))
+
+        assert np.array_equal(merged.registers, whole.registers)
+        # Within 3 standard errors
+        assert abs(whole.estimate() / len(ids) - 1) < 3 * whole.relative_error
+        assert HyperLogLog(12).add(ids[:50]).estimate() == pytest.approx(50, abs=1)
+        restored = HyperLogLog.from_bytes(whole.to_bytes())
+        assert np.array_equal(restored.registers, whole.registers)
+        with pytest.raises(ValueError, match="precision"):
+            whole.merge(HyperLogLog(10))
+
+    def test_quantile_sketch_relative_error(self):
+        values = np.random.default_rng(7).lognormal(4, 1.5, 100_000)
+        values[:500] = 0.0
+        sketch = QuantileSketch(0.01).add(values)
+
+        for q in (0.0, 0.05, 0.5, 0.9, 0.99, 1.0):
+            exact = np.quantile(values, q, method="lower")
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.01, abs=1e-9)
+        merged = QuantileSketch(0.01).add(values[:30_000]).merge(QuantileSketch(0.01).add(values[30_000:]))
+        assert merged.quantile(0.9) == sketch.quantile(0.9) and merged.count == len(values)
+        restored = QuantileSketch.from_bytes(sketch.to_bytes())
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+        assert QuantileSketch().quantile(0.5) is None
+        assert quantile_column(0.5) == "order_value_p50"
+        assert quantile_column(0.999) == "order_value_p99_9"
@@ -0,0 +1,316 @@
+"""
+Unit tests for the online feature store and its HTTP endpoint.
+"""
+
+import fnmatch
+import json
+import threading
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pyarrow as pa
+import pytest
+
+from src.gold.runs import write_run_marker
+from src.serving import redis_cache
+from src.serving import FeatureStore, RedisFeatureClient, RedisFeaturePublisher, make_server
+
+
+TABLES = {"customer_features": "customer_id", "product_features": "product_id"}
+
+
+def write_arrow(path, table):
+    """Write an Arrow IPC file the way Gold does (aside, then renamed over)."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    tmp.replace(path)
+
+
+def finish_run(gold):
+    """Write the run marker Gold writes once all of its exports are done."""
+    write_run_marker(gold, gold.glob("*.arrow"))
+
+
+def customers(revenue):
+    return pa.table({
+        "customer_id": ["CUS-001", "CUS-002", "CUS-003"],
+        "total_revenue": revenue,
+        "last_purchase": [date(2025, 3, 15), date(2025, 3, 1), None],
+        "customer_segment_score": pa.array(
+            [Decimal("4.30"), Decimal("2.70"), Decimal("1.00")], pa.decimal128(18, 2)
+        ),
+    })
+
+
+class TestFeatureStore:
+    """Tests for key lookups, hot-swap and metrics."""
+
+    @pytest.fixture
+    def gold_dir(self, tmp_path):
+        gold = tmp_path / "gold"
+        gold.mkdir()
+        write_arrow(gold / "customer_features.arrow", customers([879.91, 219.94, 259.97]))
+        write_arrow(gold / "product_features.arrow", pa.table({
+            "product_id": ["PRD-001", "PRD-002"],
+            "times_sold": [4, 3],
+        }))
+        finish_run(gold)
+        return gold
+
+    def test_get_one_and_batch(self, gold_dir):
+        """Single and batch lookups return the requested features, None for unknown keys."""
+        store = FeatureStore(gold_dir, tables=TABLES)
+
+        row = store.get_one("customer_features", "CUS-002")
+        assert row["total_revenue"] == pytest.approx(219.94)
+        assert row["last_purchase"] == date(2025, 3, 1)
+        assert store.get_one("customer_features", "CUS-999") is None
+
+        rows = store.get(
+            "customer_features", ["CUS-003", "CUS-999", "CUS-001"], ["total_revenue"]
+        )
+        assert rows == [{"total_revenue": 259.97}, None, {"total_revenue": 879.91}]
+        assert store.get("product_features", ["PRD-404"]) == [None]
+
+    def test_unknown_table_or_feature(self, gold_dir):
+        store = FeatureStore(gold_dir, tables=TABLES)
+        with pytest.raises(KeyError, match="Unknown feature table"):
+            store.get_one("vendor_features", "VND-001")
+        with pytest.raises(KeyError, match="Unknown features"):
+            store.get("customer_features", ["CUS-001"], ["no_such_feature"])
+
+    def test_missing_arrow_export(self, gold_dir):
+        (gold_dir / "product_features.arrow").unlink()
+        with pytest.raises(FileNotFoundError, match="arrow"):
+            FeatureStore(gold_dir, tables=TABLES)
+
+    def test_refresh_swaps_snapshot(self, gold_dir):
+        """A new Gold export is picked up by refresh(); rows read earlier stay valid."""
+        store = FeatureStore(gold_dir, tables=TABLES)
+        assert store.refresh() is False
+        old = store._snapshot
+
+        # An export replaced mid-run is not picked up until the run finishes
+        write_arrow(gold_dir / "customer_features.arrow", customers([1.0, 2.0, 3.0]))
+        assert store.refresh() is False
+        finish_run(gold_dir)
+        assert store.refresh() is True
+        assert store.version == 2
+        assert store.get_one("customer_features", "CUS-001")["total_revenue"] == 1.0
+        # The previous snapshot still reads its own (replaced) file
+        assert old.tables["customer_features"].get_one("CUS-001", ["total_revenue"]) == {
+            "total_revenue": 879.91
+        }
+
+    def test_missing_run_marker(self, gold_dir):
+        (gold_dir / "_gold_run.json").unlink()
+        with pytest.raises(FileNotFoundError, match="No finished Gold run"):
+            FeatureStore(gold_dir, tables=TABLES)
+
+    def test_refresh_skips_run_overtaken_by_next(self, gold_dir):
+        """Files replaced after the marker belong to a newer run; the snapshot is kept."""
+        store = FeatureStore(gold_dir, tables=TABLES)
+        write_arrow(gold_dir / "customer_features.arrow", customers([1.0, 2.0, 3.0]))
+        finish_run(gold_dir)
+        write_arrow(gold_dir / "customer_features.arrow", customers([5.0, 6.0, 7.0]))
+
+        assert store.refresh() is False
+        assert store.version == 1
+        assert store.get_one("customer_features", "CUS-001")["total_revenue"] == 879.91
+
+        finish_run(gold_dir)
+        assert store.refresh() is True
+        assert store.get_one("customer_features", "CUS-001")["total_revenue"] == 5.0
+
+    def test_latency_metrics(self, gold_dir):
+        store = FeatureStore(gold_dir, tables=TABLES, latency_window=3)
+        for _ in range(4):
+            store.get_one("customer_features", "CUS-001")
+        store.get("customer_features", ["CUS-001", "CUS-002"])
+
+        metrics = store.metrics()
+        assert metrics["tables"] == {"customer_features": 3, "product_features": 2}
+        latency = metrics["latency"]
+        assert (latency["lookups"], latency["keys"], latency["window"]) == (5, 6, 3)
+        assert 0 < latency["p50_us"] <= latency["p99_us"] <= latency["max_us"]
+
+
+class TestFeatureServer:
+    """Tests for the HTTP endpoint."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        gold = tmp_path / "gold"
+        gold.mkdir()
+        write_arrow(gold / "customer_features.arrow", customers([879.91, 219.94, 259.97]))
+        finish_run(gold)
+        store = FeatureStore(gold, tables={"customer_features": "customer_id"})
+        server = make_server(store, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+        server.url = f"http://{host}:{port}"
+        server.gold = gold
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def fetch(self, url, method="GET"):
+        with urlopen(Request(url, method=method)) as response:
+            return json.loads(response.read())
+
+    def test_feature_lookup(self, server):
+        body = self.fetch(
+            f"{server.url}/features/customer_features"
+            "?key=CUS-001&key=CUS-404&features=last_purchase,customer_segment_score"
+        )
+        assert body["version"] == 1
+        assert body["rows"] == [
+            {"last_purchase": "2025-03-15", "customer_segment_score": 4.3},
+            None,
+        ]
+
+    def test_errors(self, server):
+        with pytest.raises(HTTPError) as missing_key:
+            self.fetch(f"{server.url}/features/customer_features")
+        assert missing_key.value.code == 400
+        with pytest.raises(HTTPError) as unknown_table:
+            self.fetch(f"{server.url}/features/vendor_features?key=VND-001")
+        assert unknown_table.value.code == 404
+
+    def test_reload_and_metrics(self, server):
+        assert self.fetch(f"{server.url}/reload", method="POST") == {"reloaded": False, "version": 1}
+        write_arrow(server.gold / "customer_features.arrow", customers([1.0, 2.0, 3.0]))
+        finish_run(server.gold)
+        assert self.fetch(f"{server.url}/reload", method="POST") == {"reloaded": True, "version": 2}
+
+        self.fetch(f"{server.url}/features/customer_features?key=CUS-001")
+        metrics = self.fetch(f"{server.url}/metrics")
+        assert metrics["version"] == 2
+        assert metrics["latency"]["lookups"] == 1
+        assert self.fetch(f"{server.url}/health") == {"status": "ok", "version": 2}
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis-py calls the cache uses (decode_responses=True)."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def incr(self, name):
+        self.round_trips += 1
+        self.data[name] = str(int(self.data.get(name, 0)) + 1)
+        return int(self.data[name])
+
+    def set(self, name, value):
+        self.round_trips += 1
+        self.data[name] = str(value)
+
+    def get(self, name):
+        self.round_trips += 1
+        return self.data.get(name)
+
+    def scan_iter(self, match="*", count=None):
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, match)]
+
+    def unlink(self, *names):
+        self.round_trips += 1
+        for name in names:
+            self.data.pop(name, None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def hset(self, name, mapping):
+        self.commands.append(lambda: self.redis.data.setdefault(name, {}).update(mapping))
+
+    def hgetall(self, name):
+        self.commands.append(lambda: dict(self.redis.data.get(name, {})))
+
+    def execute(self):
+        self.redis.round_trips += 1
+        results = [command() for command in self.commands]
+        self.commands = []
+        return results
+
+
+class TestRedisFeatureCache:
+    """Tests for the versioned Redis publish and the read-through client."""
+
+    @pytest.fixture
+    def redis(self):
+        return FakeRedis()
+
+    def test_publish_pipelines_rows_and_swaps_version(self, redis):
+        publisher = RedisFeaturePublisher(redis, batch_size=2)
+        version = publisher.publish({"customer_features": ("customer_id", customers([1.5, 2.5, 3.5]))})
+
+        assert version == 1 and redis.data["features:current"] == "1"
+        row = redis.data["features:v1:customer_features:CUS-002"]
+        assert json.loads(row["total_revenue"]) == 2.5
+        assert json.loads(row["customer_segment_score"]) == 2.7
+        # incr + 2 pipelined batches of <= 2 rows + set
+        assert redis.round_trips == 4
+
+    def test_old_versions_dropped(self, redis):
+        publisher = RedisFeaturePublisher(redis, keep_versions=1)
+        for revenue in (1.0, 2.0, 3.0):
+            publisher.publish({"customer_features": ("customer_id", customers([revenue] * 3))})
+
+        versions = {k.split(":")[1] for k in redis.data if k.count(":") == 3}
+        assert versions == {"v2", "v3"}
+        assert redis.data["features:version_seq"] == "3"
+
+    def test_client_reads_through_lru(self, redis):
+        publisher = RedisFeaturePublisher(redis)
+        publisher.publish({"customer_features": ("customer_id", customers([1.5, 2.5, 3.5]))})
+        client = RedisFeatureClient(redis, cache_size=2, version_ttl=60)
+
+        assert client.get("customer_features", ["CUS-001", "CUS-404"], ["total_revenue"]) == [
+            {"total_revenue": 1.5}, None,
+        ]
+        trips = redis.round_trips
+        assert client.get_one("customer_features", "CUS-001")["last_purchase"] == "2025-03-15"
+        assert client.get_one("customer_features", "CUS-404") is None
+        assert redis.round_trips == trips  # both cached, unknown keys included
+        client.get_one("customer_features", "CUS-002")  # evicts CUS-001
+        client.get_one("customer_features", "CUS-001")
+
+        metrics = client.metrics()
+        assert (metrics["hits"], metrics["misses"], metrics["cached_rows"]) == (2, 4, 2)
+
+    def test_client_follows_version_pointer(self, redis):
+        publisher = RedisFeaturePublisher(redis)
+        client = RedisFeatureClient(redis, version_ttl=0)
+        assert client.get_one("customer_features", "CUS-001") is None  # nothing published
+
+        publisher.publish({"customer_features": ("customer_id", customers([1.5, 2.5, 3.5]))})
+        assert client.get_one("customer_features", "CUS-001")["total_revenue"] == 1.5
+        publisher.publish({"customer_features": ("customer_id", customers([9.0, 2.5, 3.5]))})
+        assert client.get_one("customer_features", "CUS-001")["total_revenue"] == 9.0
+
+    def test_publish_results_needs_every_table(self, redis):
+        publisher = RedisFeaturePublisher(redis)
+        results = {
+            "customer_features": SimpleNamespace(table=customers([1.5, 2.5, 3.5])),
+            "product_features": SimpleNamespace(table=None),
+        }
+        assert publisher.publish_results(results, TABLES) is None
+        assert "features:current" not in redis.data
+        assert publisher.publish_results(results, {"customer_features": "customer_id"}) == 1
+
+    def test_connect_requires_redis_package(self, monkeypatch):
+        monkeypatch.setattr(redis_cache, "redis", None)
+        with pytest.raises(ImportError, match="pip install redis"):
+            redis_cache.connect()
@@ -33,12 +33,26 @@ class TestConfigModels:
         cfg = FeatureEngineeringConfig()
         assert cfg.reference_date == date(2026, 2, 1)
 
+    def test_feature_engineering_reference_date_can_be_unset(self):
+        from src.utils.config import FeatureEngineeringConfig
+        assert FeatureEngineeringConfig(reference_date=None).reference_date is None
+
     def test_validation_config_defaults(self):
         from src.utils.config import ValidationConfig
         cfg = ValidationConfig()
         assert cfg.strict_mode is False
         assert cfg.max_quarantine_rate == 0.2
 
+    def test_validation_config_breach_action(self):
+        from pydantic import ValidationError
+        from src.utils.config import ValidationConfig
+        cfg = ValidationConfig(on_breach="skip", preflight_sample=0)
+        assert (cfg.on_breach, cfg.preflight_sample, cfg.min_rows) == ("skip", 0, 50)
+        with pytest.raises(ValidationError):
+            ValidationConfig(on_breach="ignore")
+        with pytest.raises(ValidationError):
+            ValidationConfig(max_quarantine_rate=1.5)
+
     def test_surreal_config_url(self):
         from src.utils.config import SurrealConfig
         cfg = SurrealConfig(host="myhost", port=9000)